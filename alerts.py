@@ -0,0 +1,449 @@
+"""Background alert engine for volatility thresholds, risk flags and P&L limits.
+
+Rules are evaluated incrementally. ``AlertEngine.update`` diffs the new inputs
+against the previous ones and evaluates only the rules subscribed to an input
+that changed. A tick that moves one position's price touches that position's
+rules and nothing else. Inputs are a flat ``{name: value}`` map: ``vix``,
+``spot``, ``predicted_volatility``, ``atm_iv``, ``total_pnl``,
+``pnl:<instrument>`` per position, and ``risk_flags``. They are built from the
+live feed and the snapshots the app already caches (``alert_inputs``), so
+alerting never triggers a backend request.
+
+Three rule kinds exist:
+
+* ``threshold``: the input crosses above or below a level.
+* ``change``: the input moved by at least ``level`` percent within ``window``
+  seconds.
+* ``flag``: a new risk flag containing ``pattern`` appeared. An empty pattern
+  matches any flag that is not an all-clear.
+
+Threshold and change rules fire on the transition into the alert condition and
+re-arm once it clears. Alerts are deduplicated per rule and input
+(``cooldown``) and capped per engine (``MAX_ALERTS_PER_MINUTE``). Delivery goes
+to an ``AlertQueue``, which sessions drain for toasts, and optionally to a
+webhook posted from a background thread.
+
+Rules and webhooks are stored per token (``owner_key``), so one trader's rules
+never evaluate, or post, another trader's positions. Webhooks must point at a
+loopback host (``is_local_url``).
+"""
+import fnmatch
+import hashlib
+import ipaddress
+import itertools
+import queue
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import asdict, dataclass, field
+from urllib.parse import urlparse
+
+import requests
+
+from chain_analytics import analyze_chain, chain_frame
+from risk_engine import evaluate as evaluate_risk, position_frame
+from wire_format import records
+
+THRESHOLD = "threshold"
+CHANGE = "change"
+FLAG = "flag"
+RULE_KINDS = (THRESHOLD, CHANGE, FLAG)
+ALERT_INPUTS = ["vix", "spot", "predicted_volatility", "atm_iv", "total_pnl", "pnl:*", "risk_flags"]
+TICK_SECONDS = 2.0
+DEFAULT_COOLDOWN_SECONDS = 300
+MAX_ALERTS_PER_MINUTE = 20
+QUEUE_SIZE = 200
+WEBHOOK_TIMEOUT = 3
+WATCH_TTL_SECONDS = 15 * 60  # a token no session has rendered for this long stops being evaluated
+ALL_CLEAR_PREFIX = "✅"
+RULES_SETTING = "alert_rules"
+WEBHOOK_SETTING = "alert_webhook"
+
+
+@dataclass
+class AlertRule:
+    """One user-defined rule. ``input`` may be a glob such as ``pnl:*``."""
+
+    kind: str
+    input: str
+    level: float = 0.0
+    above: bool = True  # threshold direction
+    window: float = 300.0  # seconds, change rules
+    pattern: str = ""  # flag rules
+    cooldown: float = DEFAULT_COOLDOWN_SECONDS
+    rule_id: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+
+    def describe(self) -> str:
+        if self.kind == THRESHOLD:
+            return f"{self.input} {'>' if self.above else '<'} {self.level:g}"
+        if self.kind == CHANGE:
+            return f"{self.input} moves {self.level:g}% within {self.window / 60:g} min"
+        return f"new {self.input} flag" + (f" containing '{self.pattern}'" if self.pattern else "")
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AlertRule":
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
+
+def alert_inputs(live: dict = None, seller: dict = None, volatility: dict = None, feed: dict = None,
+                 flags: tuple = None) -> dict:
+    """Flattens cached snapshots (and the live feed, which wins) into alert inputs.
+
+    Position P&L uses streamed LTPs when the feed has them.
+    """
+    live, seller, volatility, feed = live or {}, seller or {}, volatility or {}, feed or {}
+    market = live.get("market_data") or {}
+    inputs = {
+        "vix": feed.get("vix") or seller.get("india_vix") or market.get("india_vix"),
+        "spot": feed.get("spot") or seller.get("nifty_spot") or market.get("nifty_spot"),
+        "predicted_volatility": volatility.get("predicted_volatility"),
+        "atm_iv": volatility.get("atm_iv") or seller.get("avg_iv"),
+    }
+    ltps = feed.get("ltps") or {}
+    total = None
+    for position in records(live.get("positions")):
+        key = position.get("instrument_key")
+        if not key:
+            continue
+        pnl = position.get("unrealized_pnl")
+        if key in ltps and position.get("entry_price") is not None and position.get("quantity") is not None:
+            pnl = (ltps[key] - float(position["entry_price"])) * float(position["quantity"])
+        if pnl is not None:
+            inputs[f"pnl:{key}"] = round(float(pnl), 2)
+            total = (total or 0.0) + float(pnl)
+    if total is not None:
+        inputs["total_pnl"] = round(total, 2)
+    if flags is not None:
+        inputs["risk_flags"] = tuple(flags)
+    return {k: v for k, v in inputs.items() if v is not None}
+
+
+def risk_flags(live: dict, raw_chain=None) -> tuple:
+    """Risk flags for a ``/live/dashboard`` snapshot, as the Risk Evaluation tab computes them.
+
+    ``raw_chain`` is the ``/fetch/option-chain`` payload the tab matches positions against; without it
+    positions are resolved from their trading symbols only.
+    """
+    spot = (live.get("market_data") or {}).get("nifty_spot")
+    chain_df = None
+    if raw_chain:
+        chain_df, _ = analyze_chain(chain_frame(raw_chain))
+        spot = spot or (float(chain_df["spot"].iloc[0]) if not chain_df.empty else None)
+    portfolio, _, _ = evaluate_risk(position_frame(live.get("positions", []), chain_df, spot),
+                                    (live.get("portfolio") or {}).get("total_funds", 0), spot)
+    return tuple(portfolio.get("Flags", []))
+
+
+class AlertEngine:
+    """Rule state for one token; evaluates only rules whose inputs changed."""
+
+    def __init__(self, rules: list = (), max_per_minute: int = MAX_ALERTS_PER_MINUTE):
+        self.max_per_minute = max_per_minute
+        self.values = {}
+        self.evaluations = 0
+        self.suppressed = 0
+        self._history = {}  # input -> deque of (time, value), for change rules
+        self._active = {}  # (rule id, input) -> in alert condition
+        self._last_fired = {}  # (rule id, input) -> time
+        self._fired = deque()
+        self.set_rules(rules)
+
+    def set_rules(self, rules: list):
+        self.rules = list(rules)
+        self._exact, self._globs, self._matches = {}, [], {}
+        for rule in self.rules:
+            if any(ch in rule.input for ch in "*?["):
+                self._globs.append(rule)
+            else:
+                self._exact.setdefault(rule.input, []).append(rule)
+        self._windows = {}
+        for rule in self.rules:
+            if rule.kind == CHANGE:
+                self._windows[rule.input] = max(self._windows.get(rule.input, 0.0), rule.window)
+        live = {rule.rule_id for rule in self.rules}
+        self._active = {k: v for k, v in self._active.items() if k[0] in live}
+
+    def _rules_for(self, name: str) -> list:
+        matched = self._matches.get(name)
+        if matched is None:
+            matched = self._matches[name] = self._exact.get(name, []) + [
+                rule for rule in self._globs if fnmatch.fnmatchcase(name, rule.input)
+            ]
+        return matched
+
+    def _window_for(self, name: str) -> float:
+        if name in self._windows:
+            return self._windows[name]
+        return max((w for pattern, w in self._windows.items() if fnmatch.fnmatchcase(name, pattern)), default=0.0)
+
+    def update(self, inputs: dict, now: float = None) -> list:
+        """Applies new input values and returns the alerts they fired."""
+        now = time.time() if now is None else now
+        alerts = []
+        for name, value in inputs.items():
+            previous = self.values.get(name)
+            if name in self.values and previous == value:
+                continue
+            self.values[name] = value
+            window = self._window_for(name)
+            if window and isinstance(value, (int, float)):
+                history = self._history.setdefault(name, deque())
+                history.append((now, float(value)))
+                while history and history[0][0] < now - window:
+                    history.popleft()
+            for rule in self._rules_for(name):
+                self.evaluations += 1
+                for message in self._evaluate(rule, name, value, previous, now):
+                    alert = self._emit(rule, name, value, message, now)
+                    if alert is not None:
+                        alerts.append(alert)
+        return alerts
+
+    def _evaluate(self, rule: AlertRule, name: str, value, previous, now: float) -> list:
+        if rule.kind == FLAG:
+            before = set(previous or ())
+            pattern = rule.pattern.lower()
+            return [
+                f"Risk flag: {flag}" for flag in value or ()
+                if flag not in before and (pattern in flag.lower() if pattern else not flag.startswith(ALL_CLEAR_PREFIX))
+            ]
+        if not isinstance(value, (int, float)):
+            return []
+        key = (rule.rule_id, name)
+        if rule.kind == THRESHOLD:
+            breached = value > rule.level if rule.above else value < rule.level
+            message = f"{name} at {value:,.2f} is {'above' if rule.above else 'below'} {rule.level:,g}"
+        else:
+            history = [v for t, v in self._history.get(name, ()) if t >= now - rule.window]
+            base = history[0] if history else value
+            change = (value - base) / abs(base) * 100 if base else 0.0
+            breached = abs(change) >= rule.level
+            message = f"{name} moved {change:+.1f}% to {value:,.2f} within {rule.window / 60:g} min"
+        was_active = self._active.get(key, False)
+        self._active[key] = breached
+        return [message] if breached and not was_active else []
+
+    def _emit(self, rule: AlertRule, name: str, value, message: str, now: float):
+        key = (rule.rule_id, name) if rule.kind != FLAG else (rule.rule_id, message)
+        if now - self._last_fired.get(key, float("-inf")) < rule.cooldown:
+            self.suppressed += 1
+            return None
+        while self._fired and self._fired[0] < now - 60:
+            self._fired.popleft()
+        if len(self._fired) >= self.max_per_minute:
+            self.suppressed += 1
+            return None
+        self._last_fired[key] = now
+        self._fired.append(now)
+        return {"rule_id": rule.rule_id, "rule": rule.describe(), "kind": rule.kind, "input": name,
+                "value": value if not isinstance(value, tuple) else None, "message": message, "at": now}
+
+
+class AlertQueue:
+    """Bounded, sequence-numbered alert log; each session reads what it has not seen."""
+
+    def __init__(self, size: int = QUEUE_SIZE):
+        self._alerts = deque(maxlen=size)
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def publish(self, alerts: list):
+        with self._lock:
+            for alert in alerts:
+                self._alerts.append(dict(alert, seq=next(self._seq)))
+
+    def since(self, seq: int) -> list:
+        with self._lock:
+            return [alert for alert in self._alerts if alert["seq"] > seq]
+
+    def recent(self, limit: int = 20) -> list:
+        with self._lock:
+            return list(self._alerts)[-limit:][::-1]
+
+    @property
+    def last_seq(self) -> int:
+        with self._lock:
+            return self._alerts[-1]["seq"] if self._alerts else 0
+
+
+def owner_key(token: str) -> str:
+    """Stable, non-reversible key for a token's stored alert settings."""
+    return hashlib.sha256((token or "").encode("utf-8")).hexdigest()[:16]
+
+
+def is_local_url(url: str) -> bool:
+    """True for http(s) URLs on a loopback host; webhooks are never sent anywhere else."""
+    parsed = urlparse(url or "")
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        return False
+    if parsed.hostname == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(parsed.hostname).is_loopback
+    except ValueError:
+        return False
+
+
+class WebhookSender:
+    """Posts alerts as JSON to webhooks from one background thread; failures are counted per owner, not retried."""
+
+    def __init__(self, timeout: float = WEBHOOK_TIMEOUT):
+        self.timeout = timeout
+        self.sent = Counter()
+        self.failed = Counter()
+        self.last_error = None
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def send(self, url: str, alerts: list, owner: str = None):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="alert-webhook", daemon=True)
+                self._thread.start()
+        for alert in alerts:
+            try:
+                self._queue.put_nowait((url, alert, owner))
+            except queue.Full:
+                self.failed[owner] += 1
+
+    def _run(self):
+        session = requests.Session()
+        while True:
+            url, alert, owner = self._queue.get()
+            try:
+                # no redirects: a local webhook must not bounce the payload to another host
+                session.post(url, json=alert, timeout=self.timeout, allow_redirects=False).raise_for_status()
+                self.sent[owner] += 1
+            except requests.RequestException as e:
+                self.failed[owner] += 1
+                self.last_error = str(e)
+
+
+class AlertService:
+    """Process-wide alert monitor: one thread evaluating every watched token's engine.
+
+    ``collect(token, state)`` returns that token's alert inputs; ``state`` is a
+    per-token dict it may use to remember snapshots between ticks.
+    ``load(token)`` returns the token's stored ``(rules, webhook_url)``. Rules
+    and webhooks belong to one token: a token's alerts go only to its own
+    webhook (or ``default_webhook``, set by the operator), and only loopback
+    webhooks are accepted.
+    """
+
+    def __init__(self, collect, load, default_webhook: str = None, tick: float = TICK_SECONDS):
+        if default_webhook and not is_local_url(default_webhook):
+            raise ValueError(f"alert webhook must be a localhost URL: {default_webhook}")
+        self.collect = collect
+        self.load = load
+        self.tick = tick
+        self.default_webhook = default_webhook
+        self.webhook = WebhookSender()
+        self.errors = 0
+        self.last_error = None
+        self._settings = {}  # token -> (rules, webhook_url)
+        self._watched = {}  # token -> last render time
+        self._engines = {}
+        self._queues = {}
+        self._state = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _settings_for(self, token: str) -> tuple:
+        settings = self._settings.get(token)
+        if settings is None:
+            rules, webhook_url = self.load(token)
+            settings = self._settings[token] = (list(rules), webhook_url)
+        return settings
+
+    def settings(self, token: str) -> tuple:
+        """``token``'s ``(rules, webhook_url)``; the webhook is its own, not the operator default."""
+        with self._lock:
+            rules, webhook_url = self._settings_for(token)
+            return list(rules), webhook_url
+
+    def set_rules(self, token: str, rules: list, webhook_url: str = None):
+        """Replaces ``token``'s rules and webhook; raises ``ValueError`` for a non-local webhook."""
+        if webhook_url and not is_local_url(webhook_url):
+            raise ValueError("the webhook must be a localhost URL, e.g. http://localhost:9000/alerts")
+        with self._lock:
+            self._settings[token] = (list(rules), webhook_url or None)
+            engine = self._engines.get(token)
+            if engine is not None:
+                engine.set_rules(rules)
+
+    def queue(self, token: str) -> AlertQueue:
+        with self._lock:
+            return self._queues.setdefault(token, AlertQueue())
+
+    def watch(self, token: str):
+        """Marks ``token`` as rendered; starts the monitor thread on first use."""
+        with self._lock:
+            self._watched[token] = time.monotonic()
+            if token not in self._engines:
+                self._engines[token] = AlertEngine(self._settings_for(token)[0])
+                self._queues.setdefault(token, AlertQueue())
+                self._state[token] = {}
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="alert-monitor", daemon=True)
+                self._thread.start()
+
+    def unwatch(self, token: str):
+        with self._lock:
+            self._watched.pop(token, None)
+            self._engines.pop(token, None)
+            self._state.pop(token, None)
+            self._queues.pop(token, None)
+            self._settings.pop(token, None)
+
+    def evaluate(self, token: str, now: float = None) -> list:
+        """Runs one evaluation for ``token``; the monitor thread calls this every tick."""
+        with self._lock:
+            engine, state, alerts_queue = self._engines[token], self._state[token], self._queues[token]
+            webhook_url = self._settings_for(token)[1] or self.default_webhook
+        alerts = engine.update(self.collect(token, state), now)
+        if alerts:
+            alerts_queue.publish(alerts)
+            if webhook_url:
+                self.webhook.send(webhook_url, alerts, owner_key(token))
+        return alerts
+
+    def _run(self):
+        while not self._stop.wait(self.tick):
+            now = time.monotonic()
+            with self._lock:
+                for token in [t for t, seen in self._watched.items() if now - seen > WATCH_TTL_SECONDS]:
+                    del self._watched[token]
+                    self._engines.pop(token, None)
+                    self._state.pop(token, None)
+                    self._settings.pop(token, None)
+                    self._queues.pop(token, None)
+                tokens = [t for t in self._watched if self._engines[t].rules]
+            for token in tokens:
+                try:
+                    self.evaluate(token)
+                except Exception as e:  # a bad snapshot must not kill the monitor
+                    self.errors += 1
+                    self.last_error = str(e)
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self, token: str) -> dict:
+        """Counters for ``token``'s own engine and webhook."""
+        with self._lock:
+            engine = self._engines.get(token)
+            rules = self._settings_for(token)[0]
+        owner = owner_key(token)
+        return {
+            "rules": len(rules),
+            "evaluations": engine.evaluations if engine else 0,
+            "suppressed": engine.suppressed if engine else 0,
+            "webhook_sent": self.webhook.sent[owner],
+            "webhook_failed": self.webhook.failed[owner],
+        }
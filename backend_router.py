@@ -0,0 +1,274 @@
+"""Routes API traffic across one or more VoluGuard backends.
+
+Each configured base URL gets its own pooled ``ApiClient``; one health state is
+kept per backend from ``HEAD /`` probes (falling back to ``GET /``). Requests go
+to the fastest healthy backend and fail over to the next one when a backend is
+unreachable or its gateway reports it is still booting. Reads fail over on any
+transport error; writes only when the request provably never left the client.
+
+The hosted backend sleeps after ~15 minutes without traffic and takes tens of
+seconds to boot. A backend with no recent successful contact is treated as
+cold and gets a long read timeout, so the first request after idle waits for
+the boot instead of timing out. A background pinger keeps every backend warm
+during market hours.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as dtime, timedelta, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NameResolutionError, NewConnectionError
+
+from http_client import CONNECT_TIMEOUT, ApiClient, ConnectionStats
+
+HEALTH_ENDPOINT = "/"
+PROBE_TIMEOUT = (CONNECT_TIMEOUT, 5)
+COLD_START_TIMEOUT = 90  # read timeout while a backend may still be booting
+IDLE_SLEEP_SECONDS = 15 * 60  # hosted instances spin down after this long without traffic
+PROBE_INTERVAL_SECONDS = 30  # how often unhealthy backends are re-probed
+WARMUP_INTERVAL_SECONDS = 10 * 60  # keep-alive ping period during market hours
+LATENCY_ALPHA = 0.3  # weight of the newest probe in the latency average
+GATEWAY_STATUSES = (502, 503, 504)
+SAFE_METHODS = ("GET", "HEAD")
+
+IST = timezone(timedelta(hours=5, minutes=30))
+MARKET_WARMUP_START = dtime(8, 45)  # ahead of the 09:15 open so the first login is warm
+MARKET_WARMUP_END = dtime(15, 45)
+
+TOKEN_VALID = "valid"
+TOKEN_INVALID = "invalid"
+BACKEND_UNAVAILABLE = "unavailable"
+
+
+def in_market_hours(now: datetime = None) -> bool:
+    """True on weekdays between ``MARKET_WARMUP_START`` and ``MARKET_WARMUP_END`` IST."""
+    now = (now or datetime.now(IST)).astimezone(IST)
+    return now.weekday() < 5 and MARKET_WARMUP_START <= now.time() <= MARKET_WARMUP_END
+
+
+def _never_sent(error: requests.RequestException) -> bool:
+    """True when the request failed before a connection was established."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, (NewConnectionError, NameResolutionError))
+
+
+class Backend:
+    """Health and latency state for one base URL."""
+
+    def __init__(self, url: str, client: ApiClient):
+        self.url = url
+        self.client = client
+        # probes must fail fast, so they bypass the client's retrying adapter
+        self.probe_session = requests.Session()
+        self.probe_session.mount(url, HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0))
+        self.healthy = None  # unknown until the first probe or request
+        self.latency = None  # smoothed probe round trip, seconds
+        self.last_ok = 0.0
+        self.last_probe = 0.0
+        self.failures = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+
+    @property
+    def cold(self) -> bool:
+        return not self.last_ok or time.monotonic() - self.last_ok > IDLE_SLEEP_SECONDS
+
+    def record_success(self, latency: float = None):
+        with self._lock:
+            self.healthy = True
+            self.failures = 0
+            self.last_ok = time.monotonic()
+            if latency is not None:
+                self.latency = latency if self.latency is None else (
+                    LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * self.latency)
+
+    def record_failure(self, error: str):
+        with self._lock:
+            self.healthy = False
+            self.failures += 1
+            self.last_error = error
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "url": self.url,
+                "healthy": self.healthy,
+                "cold": self.cold,
+                "latency_ms": self.latency * 1000 if self.latency is not None else None,
+                "failures": self.failures,
+                "last_error": self.last_error,
+            }
+
+
+class BackendRouter:
+    """Drop-in for ``ApiClient`` that spreads requests over several backends.
+
+    All backends share one ``ConnectionStats`` so the sidebar numbers stay
+    process-wide.
+    """
+
+    def __init__(self, urls: list, probe_interval: float = PROBE_INTERVAL_SECONDS,
+                 warmup_interval: float = WARMUP_INTERVAL_SECONDS):
+        urls = list(dict.fromkeys(url.rstrip("/") for url in urls if url))
+        if not urls:
+            raise ValueError("At least one backend URL is required")
+        self.stats = ConnectionStats()
+        self.backends = [Backend(url, ApiClient(url, stats=self.stats)) for url in urls]
+        self.probe_interval = probe_interval
+        self.warmup_interval = warmup_interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._waking = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return self.ranked()[0].url
+
+    # --- Health ---
+    def probe(self, backend: Backend, timeout=PROBE_TIMEOUT) -> bool:
+        """Probes ``HEAD /`` (or ``GET /`` where HEAD is refused) and updates the backend's health."""
+        backend.last_probe = time.monotonic()
+        start = time.perf_counter()
+        url = f"{backend.url}{HEALTH_ENDPOINT}"
+        try:
+            response = backend.probe_session.head(url, timeout=timeout)
+            if response.status_code == 405:
+                response = backend.probe_session.get(url, timeout=timeout)
+        except requests.RequestException as e:
+            backend.record_failure(f"Probe failed: {e}")
+            return False
+        if response.status_code >= 500:
+            backend.record_failure(f"Probe returned {response.status_code}")
+            return False
+        backend.record_success(time.perf_counter() - start)
+        return True
+
+    def probe_all(self, backends: list = None, timeout=PROBE_TIMEOUT) -> list:
+        backends = self.backends if backends is None else backends
+        if len(backends) == 1:
+            return [self.probe(backends[0], timeout)]
+        with ThreadPoolExecutor(max_workers=len(backends), thread_name_prefix="backend-probe") as pool:
+            return list(pool.map(lambda b: self.probe(b, timeout), backends))
+
+    def ranked(self) -> list:
+        """Backends in routing order: healthy by probe latency, then unprobed, then failing."""
+        if len(self.backends) > 1 and all(b.healthy is None for b in self.backends):
+            self.probe_all()
+
+        def order(item):
+            index, backend = item
+            if backend.healthy:
+                return 0, backend.latency if backend.latency is not None else float("inf"), index
+            if backend.healthy is None:
+                return 1, 0.0, index
+            return 2, backend.failures, index
+
+        return [backend for _, backend in sorted(enumerate(self.backends), key=order)]
+
+    def wake(self):
+        """Starts booting cold backends in the background (no-op if already waking)."""
+        cold = [b for b in self.backends if b.cold]
+        if not cold or not self._waking.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                self.probe_all(cold, timeout=(CONNECT_TIMEOUT, COLD_START_TIMEOUT))
+            finally:
+                self._waking.release()
+
+        threading.Thread(target=run, name="backend-wake", daemon=True).start()
+
+    # --- Requests ---
+    def timeout_for(self, backend: Backend, endpoint: str):
+        """Endpoint timeout, stretched to ``COLD_START_TIMEOUT`` while the backend may be booting."""
+        connect, read = backend.client.timeout_for(endpoint)
+        return connect, max(read, COLD_START_TIMEOUT) if backend.cold else read
+
+    def request(self, method: str, endpoint: str, params: dict = None, json_data: dict = None,
+                timeout=None, headers: dict = None) -> requests.Response:
+        """Sends to the best backend, failing over on transport errors and gateway 5xx.
+
+        Under the cold-start timeout a read timeout is not retried by the client,
+        so one request waits at most ``COLD_START_TIMEOUT`` per backend.
+        """
+        backends = self.ranked()
+        last_error, last_response = None, None
+        for i, backend in enumerate(backends):
+            has_next = i + 1 < len(backends)
+            cold = timeout is None and backend.cold
+            try:
+                response = backend.client.request(method, endpoint, params=params, json_data=json_data,
+                                                  timeout=timeout or self.timeout_for(backend, endpoint), headers=headers,
+                                                  read_retries=not cold)
+            except requests.RequestException as e:
+                backend.record_failure(str(e))
+                last_error = e
+                if has_next and (method in SAFE_METHODS or _never_sent(e)):
+                    continue
+                raise
+            if response.status_code in GATEWAY_STATUSES:
+                backend.record_failure(f"{endpoint} returned {response.status_code}")
+                last_response = response
+                if has_next and method in SAFE_METHODS:
+                    continue
+                return response
+            backend.record_success()
+            return response
+        if last_response is not None:
+            return last_response
+        raise last_error
+
+    def get(self, endpoint: str, params: dict = None, timeout=None, headers: dict = None) -> requests.Response:
+        return self.request("GET", endpoint, params=params, timeout=timeout, headers=headers)
+
+    def post(self, endpoint: str, params: dict = None, json_data: dict = None, timeout=None,
+             headers: dict = None) -> requests.Response:
+        return self.request("POST", endpoint, params=params, json_data=json_data, timeout=timeout, headers=headers)
+
+    def validate_token(self, token: str, endpoint: str = "/expiries") -> str:
+        """Checks a token, telling a rejected token apart from a backend that is down or booting.
+
+        Returns ``TOKEN_VALID``, ``TOKEN_INVALID`` or ``BACKEND_UNAVAILABLE``.
+        """
+        try:
+            response = self.get(endpoint, params={"access_token": token})
+        except requests.RequestException:
+            return BACKEND_UNAVAILABLE
+        if response.ok:
+            return TOKEN_VALID
+        if response.status_code in GATEWAY_STATUSES:
+            return BACKEND_UNAVAILABLE
+        return TOKEN_INVALID
+
+    # --- Background warmup ---
+    def start(self):
+        """Starts the pinger: keep-alive during market hours, re-probes for failed backends."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="backend-warmup", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(min(self.probe_interval, self.warmup_interval)):
+            now = time.monotonic()
+            due = [
+                b for b in self.backends
+                if (b.healthy is False and now - b.last_probe >= self.probe_interval)
+                or (in_market_hours() and now - max(b.last_ok, b.last_probe) >= self.warmup_interval)
+            ]
+            if due:
+                self.probe_all(due, timeout=(CONNECT_TIMEOUT, COLD_START_TIMEOUT))
+
+    def status(self) -> list:
+        return [backend.snapshot() for backend in self.backends]
+
+    def close(self):
+        self._stop.set()
+        for backend in self.backends:
+            backend.client.close()
+            backend.probe_session.close()
@@ -0,0 +1,388 @@
+"""Offline backtests of ``/suggest/strategy`` suggestions and the regime model.
+
+History is either the recorded snapshots or an imported CSV/Parquet file
+(``read_history``) with one row per strike per sample. Recorded snapshots come
+from the ``SnapshotStore``: ``chain`` IVs, ``metrics`` spot and days to expiry,
+and ``suggestions``. On each trading day the first sample at or after
+``ENTRY_TIME`` is the entry:
+
+* every strategy is opened with the leg structure of its ``/strategy/details``
+  (a template of moneyness, option type and signed quantity per lot, see
+  ``strategy_template``) around that day's ATM strike, the recorded strike
+  nearest spot, on the nearest recorded strikes,
+* legs are priced at their recorded LTP, or from the recorded IV when the chain
+  only has IVs (``/full-chain-table`` does),
+* trades are held to expiry and settled at intrinsic value against the last
+  spot recorded on or before the expiry date. Trades expiring after the end of
+  the history stay open.
+
+Pricing is vectorized across the days of a chunk. The chain is pivoted to a
+days × strikes grid, and every leg of every strategy is priced in one pass.
+Chunks of ``CHUNK_DAYS`` run in a process pool, and each worker reads its own
+day partitions. A multi-year backtest therefore uses every core. The results
+are P&L, hit rate and drawdown per regime and per strategy.
+"""
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, time as dt_time
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from backend_router import IST
+from chain_analytics import MIN_T, bs_price
+from snapshot_store import CHAIN, METRICS, STRATEGY_SEPARATOR, SUGGESTIONS, SnapshotStore
+
+TEMPLATES_SETTING = "strategy_templates"
+HISTORY_TYPES = ["csv", "parquet"]
+ENTRY_TIME = dt_time(10, 0)  # each day's first sample at or after this time is the entry
+DEFAULT_DAYS_TO_EXPIRY = 7
+CHUNK_DAYS = 64
+SAMPLE_TOLERANCE = pd.Timedelta(minutes=30)  # metrics and suggestions are matched to chain samples within this
+UNRECORDED = "Unrecorded"
+HISTORY_COLUMNS = ["ts", "strike", "call_iv", "put_iv", "call_ltp", "put_ltp", "spot", "days_to_expiry",
+                   "regime", "score", "strategies"]
+TRADE_COLUMNS = ["ts", "day", "regime", "score", "strategy", "suggested", "spot", "days_to_expiry", "expiry", "credit"]
+LEG_COLUMNS = ["trade", "strike", "is_call", "quantity", "premium"]
+SUMMARY_COLUMNS = ["Trades", "Hit Rate", "Total P&L", "Avg P&L", "Avg Credit", "Worst Trade", "Max Drawdown"]
+# known spellings (``/full-chain-table``, ``chain_frame``, dashboard fields) -> history column
+_ALIASES = {
+    "timestamp": "ts", "date": "ts",
+    "Strike": "strike", "strike_price": "strike",
+    "Call IV": "call_iv", "Put IV": "put_iv", "call_feed_iv": "call_iv", "put_feed_iv": "put_iv",
+    "Call LTP": "call_ltp", "Put LTP": "put_ltp",
+    "nifty_spot": "spot", "underlying_spot_price": "spot",
+}
+_NUMERIC = ["strike", "call_iv", "put_iv", "call_ltp", "put_ltp", "spot", "days_to_expiry", "score"]
+_CHAIN_SOURCE_COLUMNS = list(dict.fromkeys(list(_ALIASES) + _NUMERIC + ["expiry"]))
+
+
+def strategy_template(legs: pd.DataFrame, atm: float) -> list:
+    """Leg structure of resolved legs (``payoff.strategy_legs``) relative to the ATM strike, as JSON-ready dicts.
+
+    Moneyness is taken against the ATM strike rather than spot, so the template
+    stays the same until the ATM strike moves.
+    """
+    return [
+        {"moneyness": round(float(strike) / atm - 1.0, 4), "is_call": bool(is_call), "quantity": float(quantity)}
+        for strike, is_call, quantity in zip(legs["strike"], legs["is_call"], legs["quantity"])
+    ]
+
+
+def normalize_history(df: pd.DataFrame) -> pd.DataFrame:
+    """Renames known column spellings to ``HISTORY_COLUMNS`` and makes ``ts`` tz-aware (IST).
+
+    Missing optional columns are added empty. With an ``expiry`` column only the
+    nearest expiry of each sample is kept, and ``days_to_expiry`` is derived from
+    it when not given.
+    """
+    df = df.rename(columns={k: v for k, v in _ALIASES.items() if k in df.columns and v not in df.columns})
+    if "ts" not in df or "strike" not in df:
+        raise ValueError("history needs a timestamp (ts) and a strike column")
+    df = df.copy()
+    ts = pd.to_datetime(df["ts"])
+    df["ts"] = (ts.dt.tz_convert(IST) if ts.dt.tz is not None else ts.dt.tz_localize(IST)).dt.as_unit("ns")
+    for column in HISTORY_COLUMNS:
+        if column not in df:
+            df[column] = np.nan
+    df[_NUMERIC] = df[_NUMERIC].apply(pd.to_numeric, errors="coerce")
+    df = df.dropna(subset=["ts", "strike"])
+    if "expiry" in df:
+        expiry = pd.to_datetime(df["expiry"], errors="coerce").dt.date
+        days_left = (pd.to_datetime(expiry) - pd.to_datetime(df["ts"].dt.date)).dt.days
+        nearest = days_left.where(days_left >= 0).groupby(df["ts"]).transform("min")  # expired series excluded
+        df = df[days_left.ge(0) & days_left.eq(nearest)]
+        df["days_to_expiry"] = df["days_to_expiry"].fillna(days_left[df.index])
+    return df[HISTORY_COLUMNS].sort_values(["ts", "strike"], kind="stable", ignore_index=True)
+
+
+def read_history(name: str, data: bytes) -> pd.DataFrame:
+    """Reads an uploaded ``.csv`` or ``.parquet`` history file into ``normalize_history`` form."""
+    if name.lower().endswith(".parquet"):
+        df = pd.read_parquet(io.BytesIO(data))
+    else:
+        df = pd.read_csv(io.BytesIO(data))
+    return normalize_history(df)
+
+
+def entry_samples(df: pd.DataFrame, entry_time: dt_time = ENTRY_TIME) -> pd.DataFrame:
+    """Rows of each day's entry sample: the first at or after ``entry_time``."""
+    stamps = pd.Series(df["ts"].unique())
+    local = stamps.dt.tz_convert(IST)
+    late = stamps[local.dt.time >= entry_time]
+    first = late.groupby(local[late.index].dt.date).min()
+    return df[df["ts"].isin(first)].reset_index(drop=True)
+
+
+def _attach(entries: pd.DataFrame, samples: pd.DataFrame, columns: list, direction: str) -> pd.DataFrame:
+    """Fills empty ``columns`` of the entries from the matching sample (``samples`` indexed by ts)."""
+    present = [c for c in columns if c in samples]
+    if entries.empty or samples.empty or not present:
+        return entries
+    samples = samples[present].reset_index()
+    samples["ts"] = samples["ts"].dt.as_unit("ns")
+    stamps = pd.DataFrame({"ts": entries["ts"].drop_duplicates().sort_values()})
+    matched = pd.merge_asof(stamps, samples.sort_values("ts"), on="ts", direction=direction,
+                            tolerance=SAMPLE_TOLERANCE).set_index("ts")
+    entries = entries.copy()
+    for column in present:
+        entries[column] = entries[column].fillna(entries["ts"].map(matched[column]))
+    return entries
+
+
+def _closes(ts: pd.Series, spot: pd.Series) -> pd.Series:
+    """Last recorded spot of each IST trading date, indexed by ``datetime64[D]``."""
+    frame = pd.DataFrame({"ts": ts.reset_index(drop=True), "spot": spot.reset_index(drop=True)})
+    frame = frame.dropna().sort_values("ts", kind="stable")
+    if frame.empty:
+        return pd.Series(dtype=float)
+    days = frame["ts"].dt.tz_convert(IST).dt.tz_localize(None).to_numpy().astype("datetime64[D]")
+    return frame.groupby(days)["spot"].last()
+
+
+def price_entries(entries: pd.DataFrame, templates: dict, suggested_only: bool = True):
+    """Opens every strategy of ``templates`` at each entry sample; returns ``(trades, legs)``.
+
+    A trade is kept when all of its legs found a strike with a price or IV on
+    that day, and, with ``suggested_only``, when the strategy was among that
+    day's suggestions. ``credit`` is the premium received per lot (negative for
+    a debit). ``legs`` holds each trade's strikes, signed quantities and entry
+    premiums for ``settle``.
+    """
+    names = [name for name, legs in templates.items() if legs]
+    if entries.empty or not names:
+        return pd.DataFrame(columns=TRADE_COLUMNS), pd.DataFrame(columns=LEG_COLUMNS)
+    codes, stamps = pd.factorize(entries["ts"], sort=True)
+    grid, col = np.unique(entries["strike"].to_numpy(float), return_inverse=True)
+    n, m = len(stamps), len(grid)
+
+    def matrix(column):
+        out = np.full((n, m), np.nan)
+        out[codes, col] = entries[column].to_numpy(float)
+        out[~(out > 0)] = np.nan  # zero or missing quotes are not prices
+        return out
+
+    call_ltp, put_ltp, call_iv, put_iv = (matrix(c) for c in ("call_ltp", "put_ltp", "call_iv", "put_iv"))
+    per_day = entries.groupby(codes, sort=True)[["spot", "days_to_expiry", "regime", "score", "strategies"]].first()
+    spot = per_day["spot"].to_numpy(float)
+    dte = per_day["days_to_expiry"].fillna(DEFAULT_DAYS_TO_EXPIRY).clip(lower=0).round().to_numpy(float)
+
+    counts = np.array([len(templates[name]) for name in names])
+    owner = np.repeat(np.arange(len(names)), counts)
+    flat = [leg for name in names for leg in templates[name]]
+    moneyness = np.array([leg["moneyness"] for leg in flat], dtype=float)
+    is_call = np.array([leg["is_call"] for leg in flat], dtype=bool)
+    quantity = np.array([leg["quantity"] for leg in flat], dtype=float)
+
+    # templates are relative to the ATM strike, so moneyness applies to each day's grid strike nearest spot
+    any_quote = ~(np.isnan(call_ltp) & np.isnan(put_ltp) & np.isnan(call_iv) & np.isnan(put_iv))
+    atm_distance = np.where(any_quote, np.abs(grid[None, :] - spot[:, None]), np.inf)
+    atm = np.where(np.isfinite(atm_distance.min(axis=1)), grid[atm_distance.argmin(axis=1)], spot)
+    # nearest strike quoted on that side, for every (day, leg) at once
+    target = atm[:, None] * (1.0 + moneyness)
+    quoted = np.where(is_call[None, :, None], (~np.isnan(call_ltp) | ~np.isnan(call_iv))[:, None, :],
+                      (~np.isnan(put_ltp) | ~np.isnan(put_iv))[:, None, :])
+    distance = np.where(quoted, np.abs(grid - target[:, :, None]), np.inf)
+    pick = distance.argmin(axis=2)
+    found = np.isfinite(distance.min(axis=2))
+    rows = np.arange(n)[:, None]
+    strike = grid[pick]
+    ltp = np.where(is_call, call_ltp[rows, pick], put_ltp[rows, pick])
+    iv = np.where(is_call, call_iv[rows, pick], put_iv[rows, pick])
+    t = np.maximum(dte / 365.0, MIN_T)[:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        model = bs_price(spot[:, None], strike, t, iv / 100.0, is_call)
+    premium = np.where(np.isnan(ltp), model, ltp)
+    priced = found & np.isfinite(premium)
+
+    membership = np.zeros((len(flat), len(names)))
+    membership[np.arange(len(flat)), owner] = 1.0
+    complete = (~priced).astype(float) @ membership == 0
+    credit = -(np.where(priced, premium, 0.0) * quantity) @ membership
+    regime = per_day["regime"].where(per_day["regime"].notna() & per_day["regime"].astype(str).ne(""), UNRECORDED)
+    offered = [set(str(s).split(STRATEGY_SEPARATOR)) if isinstance(s, str) else set() for s in per_day["strategies"]]
+    suggested = np.array([[name in day for name in names] for day in offered], dtype=bool)
+    wanted = complete & np.isfinite(spot)[:, None]
+    if suggested_only:
+        wanted &= suggested
+    d, s = np.nonzero(wanted)
+
+    days = stamps.tz_convert(IST).tz_localize(None).to_numpy().astype("datetime64[D]")
+    trades = pd.DataFrame({
+        "ts": stamps[d],
+        "day": days[d],
+        "regime": regime.to_numpy(object)[d],
+        "score": per_day["score"].to_numpy(float)[d],
+        "strategy": np.array(names, dtype=object)[s],
+        "suggested": suggested[d, s],
+        "spot": spot[d],
+        "days_to_expiry": dte[d],
+        "expiry": days[d] + dte[d].astype("timedelta64[D]"),
+        "credit": credit[d, s],
+    })
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    per_trade = counts[s]
+    trade = np.repeat(np.arange(len(s)), per_trade)
+    leg = np.repeat(starts[s] - np.concatenate([[0], np.cumsum(per_trade)[:-1]]), per_trade) + np.arange(per_trade.sum())
+    legs = pd.DataFrame({
+        "trade": trade,
+        "strike": strike[d[trade], leg],
+        "is_call": is_call[leg],
+        "quantity": quantity[leg],
+        "premium": premium[d[trade], leg],
+    })
+    return trades, legs
+
+
+def settle(trades: pd.DataFrame, legs: pd.DataFrame, closes: pd.Series) -> pd.DataFrame:
+    """Adds ``exit_spot`` and ``pnl`` (per lot, ₹) at expiry; trades expiring after the last close stay NaN."""
+    trades = trades.copy()
+    expiry = trades["expiry"].to_numpy("datetime64[D]")
+    exit_spot = np.full(len(trades), np.nan)
+    if len(closes):
+        days = closes.index.to_numpy().astype("datetime64[D]")
+        pos = np.searchsorted(days, expiry, side="right") - 1
+        settled = (pos >= 0) & (expiry <= days[-1])
+        exit_spot[settled] = closes.to_numpy(float)[pos[settled]]
+    leg_exit = exit_spot[legs["trade"].to_numpy(int)]
+    strike = legs["strike"].to_numpy(float)
+    intrinsic = np.where(legs["is_call"].to_numpy(bool), np.maximum(leg_exit - strike, 0.0), np.maximum(strike - leg_exit, 0.0))
+    leg_pnl = (intrinsic - legs["premium"].to_numpy(float)) * legs["quantity"].to_numpy(float)
+    pnl = np.bincount(legs["trade"].to_numpy(int), weights=leg_pnl, minlength=len(trades))
+    trades["exit_spot"] = exit_spot
+    trades["pnl"] = np.where(np.isnan(exit_spot), np.nan, pnl)
+    return trades
+
+
+def summarize(trades: pd.DataFrame, by=("regime", "strategy")) -> pd.DataFrame:
+    """Settled-trade statistics per group; drawdown is the largest fall of cumulative P&L from its peak."""
+    by = list(by)
+    labels = [column.capitalize() for column in by]
+    done = trades.dropna(subset=["pnl"]).sort_values("expiry", kind="stable")
+    if done.empty:
+        return pd.DataFrame(columns=labels + SUMMARY_COLUMNS)
+    keys = [done[column] for column in by]
+    equity = done["pnl"].groupby(keys).cumsum()
+    peak = np.maximum(equity.groupby(keys).cummax(), 0.0)
+    done = done.assign(win=done["pnl"] > 0, drawdown=peak - equity)
+    out = done.groupby(by, sort=True).agg(**{
+        "Trades": ("pnl", "size"),
+        "Hit Rate": ("win", "mean"),
+        "Total P&L": ("pnl", "sum"),
+        "Avg P&L": ("pnl", "mean"),
+        "Avg Credit": ("credit", "mean"),
+        "Worst Trade": ("pnl", "min"),
+        "Max Drawdown": ("drawdown", "max"),
+    })
+    out["Hit Rate"] *= 100
+    return out.reset_index().rename(columns=dict(zip(by, labels)))
+
+
+def equity_curves(trades: pd.DataFrame, by: str = "regime") -> pd.DataFrame:
+    """Cumulative settled P&L per ``by`` value, indexed by expiry date."""
+    done = trades.dropna(subset=["pnl"])
+    if done.empty:
+        return pd.DataFrame()
+    return done.pivot_table(index="expiry", columns=by, values="pnl", aggfunc="sum").fillna(0.0).cumsum()
+
+
+# --- Chunks (run in worker processes, so module-level and picklable) ---
+def _empty_chunk():
+    return pd.DataFrame(columns=TRADE_COLUMNS), pd.DataFrame(columns=LEG_COLUMNS), pd.Series(dtype=float), 0
+
+
+def _store_chunk(root: str, days: list, templates: dict, suggested_only: bool, entry_time: dt_time):
+    store = SnapshotStore(root)
+    start = datetime.combine(days[0], dt_time.min, tzinfo=IST)
+    end = datetime.combine(days[-1], dt_time.max, tzinfo=IST)
+    chain = store.query(CHAIN, start, end, columns=_CHAIN_SOURCE_COLUMNS)
+    if chain.empty:
+        return _empty_chunk()
+    entries = normalize_history(entry_samples(chain.reset_index(), entry_time))
+    metrics = store.query(METRICS, start, end, columns=["nifty_spot", "days_to_expiry"]).rename(columns={"nifty_spot": "spot"})
+    entries = _attach(entries, metrics, ["spot", "days_to_expiry"], "nearest")
+    entries = _attach(entries, store.query(SUGGESTIONS, start, end), ["regime", "score", "strategies"], "backward")
+    closes = _closes(metrics.index.to_series(), metrics["spot"]) if "spot" in metrics else pd.Series(dtype=float)
+    trades, legs = price_entries(entries, templates, suggested_only)
+    return trades, legs, closes, entries["ts"].nunique()
+
+
+def _frame_chunk(history: pd.DataFrame, templates: dict, suggested_only: bool, entry_time: dt_time):
+    entries = entry_samples(history, entry_time)
+    trades, legs = price_entries(entries, templates, suggested_only)
+    return trades, legs, _closes(history["ts"], history["spot"]), entries["ts"].nunique()
+
+
+def _run_chunks(fn, tasks: list, workers: int, progress=None) -> list:
+    """Runs ``fn(*task)`` for every task, in a spawned process pool when there is more than one."""
+    results = [None] * len(tasks)
+    if workers > 1 and len(tasks) > 1:
+        # spawn, not fork: the app process runs threads (feeds, recorder) that fork would copy mid-flight
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=get_context("spawn")) as pool:
+            futures = {pool.submit(fn, *task): i for i, task in enumerate(tasks)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                results[futures[future]] = future.result()
+                if progress is not None:
+                    progress(done, len(tasks))
+        return results
+    for i, task in enumerate(tasks):
+        results[i] = fn(*task)
+        if progress is not None:
+            progress(i + 1, len(tasks))
+    return results
+
+
+def _combine(results: list, workers: int) -> dict:
+    trades, legs, closes, offset, entry_days = [], [], [], 0, 0
+    for chunk_trades, chunk_legs, chunk_closes, chunk_days in results:
+        if len(chunk_trades):
+            trades.append(chunk_trades)
+            legs.append(chunk_legs.assign(trade=chunk_legs["trade"] + offset))
+            offset += len(chunk_trades)
+        if len(chunk_closes):
+            closes.append(chunk_closes)
+        entry_days += chunk_days
+    trades = pd.concat(trades, ignore_index=True) if trades else pd.DataFrame(columns=TRADE_COLUMNS)
+    legs = pd.concat(legs, ignore_index=True) if legs else pd.DataFrame(columns=LEG_COLUMNS)
+    closes = pd.concat(closes).sort_index() if closes else pd.Series(dtype=float)
+    closes = closes[~closes.index.duplicated(keep="last")]
+    trades = settle(trades, legs, closes)
+    return {
+        "trades": trades,
+        "legs": legs,
+        "by_regime": summarize(trades, ("regime",)),
+        "by_strategy": summarize(trades),
+        "days": entry_days,
+        "open": int(trades["pnl"].isna().sum()),
+        "chunks": len(results),
+        "workers": min(workers, len(results)) if len(results) > 1 else 1,
+    }
+
+
+def backtest_store(root: str, templates: dict, start=None, end=None, suggested_only: bool = True,
+                   workers: int = None, progress=None, entry_time: dt_time = ENTRY_TIME) -> dict:
+    """Backtests over the recorded snapshots under ``root`` between the dates ``start`` and ``end`` (inclusive).
+
+    ``templates`` maps strategy names to ``strategy_template`` lists.
+    ``progress(done, total)`` is called per chunk. Returns ``trades`` (settled P&L
+    in ``pnl``), ``legs``, the ``by_regime`` and ``by_strategy`` summaries, and
+    counts of entry ``days``, ``open`` trades, ``chunks`` and ``workers``.
+    """
+    workers = workers or os.cpu_count() or 1
+    days = SnapshotStore(root).days(CHAIN, start, end)
+    tasks = [(root, days[i:i + CHUNK_DAYS], templates, suggested_only, entry_time) for i in range(0, len(days), CHUNK_DAYS)]
+    return _combine(_run_chunks(_store_chunk, tasks, workers, progress), workers)
+
+
+def backtest_frame(history: pd.DataFrame, templates: dict, suggested_only: bool = True,
+                   workers: int = None, progress=None, entry_time: dt_time = ENTRY_TIME) -> dict:
+    """Like ``backtest_store`` over an imported ``normalize_history`` frame."""
+    workers = workers or os.cpu_count() or 1
+    days = history["ts"].dt.tz_convert(IST).dt.date
+    unique_days = sorted(days.unique())
+    bounds = unique_days[::CHUNK_DAYS]
+    chunk = np.searchsorted(np.array(bounds, dtype="datetime64[D]"), days.to_numpy().astype("datetime64[D]"), side="right") - 1
+    tasks = [(part, templates, suggested_only, entry_time) for _, part in history.groupby(chunk, sort=True)]
+    return _combine(_run_chunks(_frame_chunk, tasks, workers, progress), workers)
@@ -0,0 +1,62 @@
+"""Microbenchmark for incremental alert evaluation.
+
+For each portfolio size it times the first update (every input is new), an
+update where nothing changed, and a tick where only 1% of position prices
+moved, with threshold, rate-of-change and flag rules on every input. Rule
+evaluations per update are reported next to the timings: they should follow
+the number of changed inputs, not the portfolio size.
+
+Run from the repository root:  python -m benchmarks.bench_alerts
+"""
+import argparse
+import random
+import time
+
+from alerts import CHANGE, FLAG, THRESHOLD, AlertEngine, AlertRule
+
+SIZES = [10, 100, 1_000, 5_000]
+
+
+def rules() -> list:
+    return [
+        AlertRule(THRESHOLD, "vix", level=20), AlertRule(CHANGE, "vix", level=10, window=300),
+        AlertRule(THRESHOLD, "pnl:*", level=-5_000, above=False), AlertRule(CHANGE, "pnl:*", level=25, window=300),
+        AlertRule(THRESHOLD, "total_pnl", level=-20_000, above=False), AlertRule(FLAG, "risk_flags"),
+    ]
+
+
+def bench(positions: int) -> dict:
+    rng = random.Random(7)
+    inputs = {f"pnl:NSE_FO|{i:06d}": rng.uniform(-3_000, 3_000) for i in range(positions)}
+    inputs.update(vix=14.0, total_pnl=sum(inputs.values()), risk_flags=("✅ Exposure within limits",))
+    engine = AlertEngine(rules())
+
+    def timed(values, now):
+        before = engine.evaluations
+        start = time.perf_counter()
+        engine.update(values, now=now)
+        return (time.perf_counter() - start) * 1000, engine.evaluations - before
+
+    cold_ms, cold_evals = timed(dict(inputs), 0.0)
+    idle_ms, idle_evals = timed(dict(inputs), 2.0)
+    for key in rng.sample(sorted(k for k in inputs if k.startswith("pnl:")), max(1, positions // 100)):
+        inputs[key] += rng.uniform(-200, 200)
+    inputs["total_pnl"] = sum(v for k, v in inputs.items() if k.startswith("pnl:"))
+    tick_ms, tick_evals = timed(dict(inputs), 4.0)
+    return {"cold_ms": cold_ms, "cold_evals": cold_evals, "idle_ms": idle_ms, "idle_evals": idle_evals,
+            "tick_ms": tick_ms, "tick_evals": tick_evals}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="*", default=SIZES)
+    args = parser.parse_args()
+    print(f"{'positions':>9} {'cold ms':>8} {'evals':>6} {'idle ms':>8} {'evals':>6} {'1% tick ms':>11} {'evals':>6}")
+    for positions in args.sizes:
+        r = bench(positions)
+        print(f"{positions:>9} {r['cold_ms']:>8.2f} {r['cold_evals']:>6} {r['idle_ms']:>8.2f} {r['idle_evals']:>6} "
+              f"{r['tick_ms']:>11.3f} {r['tick_evals']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""End-to-end render benchmark for app.py against the local stand-in API.
+
+Each tab is driven headlessly with Streamlit's AppTest: cold renders (all
+``st.cache_resource``/``st.cache_data`` cleared, the app's own modules
+re-imported and a fresh local store), then warm reruns in the same session.
+Streamlit's installed-component discovery runs once per process, as it does
+when a server starts, so it is not charged to every cold render.
+Reported per tab: best cold and best warm render time, CPU time of a warm
+rerun, API requests per render, and peak Python heap during a cold render
+(tracemalloc, measured in a separate pass so it does not skew timings). The
+login screen is measured the same way as time to first paint.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_app                       # report only
+    python -m benchmarks.bench_app --save-baseline       # record benchmarks/app_baseline.json
+    python -m benchmarks.bench_app --latency 0.05 --strikes 400 --trades 5000
+
+The run fails (exit status 1) if the login paint or any warm rerun's CPU time
+misses its target, and, when a baseline exists, if any tab raises, makes more
+requests than the baseline, or is slower / heavier than the baseline by more
+than ``--tolerance`` (and by more than a small absolute floor, so timer noise
+on fast tabs does not trip it).
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.mock_server import MockConfig, MockServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "app_baseline.json")
+LOGIN = "Login"
+TABS = ["Live Dashboard", "Market Dashboard", "Strategy Suggestions", "Risk Evaluation", "Option Chain", "Trade Log", "Journal"]
+NAV_TAB_KEY = "nav_tab"
+HEALTH_ENDPOINT = "/"  # backend_router probes this; it is warmup traffic, not a page request
+TOKEN = "benchmark-token"
+RENDER_TIMEOUT = 120
+# absolute slack before a relative regression counts, per metric
+MIN_TIME_DELTA_MS = 50.0
+MIN_MEMORY_DELTA_MB = 2.0
+LOGIN_TARGET_MS = 400.0  # cold time to first paint of the login screen
+RERUN_CPU_TARGET_MS = 400.0  # script CPU per warm rerun of any tab
+
+
+def _clear_caches():
+    import streamlit as st
+    from streamlit import logger as st_logger
+    # AppTest re-reads the config on every run, and bare-mode cache clears warn loudly
+    st_logger.set_log_level("error")
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    # a cold start is a fresh process, so the app's own modules are imported again
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None) or ""
+        if path.startswith(ROOT + os.sep) and not name.startswith("benchmarks"):
+            del sys.modules[name]
+
+
+_component_manager = None
+
+
+def _server_components():
+    """Streamlit components discovered once, as a server process does at startup.
+
+    AppTest otherwise rescans every installed distribution on a session's first
+    run, which charges each cold render for the size of site-packages.
+    """
+    global _component_manager
+    if _component_manager is None:
+        from streamlit.components.v2.component_manager import BidiComponentManager
+        _component_manager = BidiComponentManager()
+        _component_manager.discover_and_register_components(start_file_watching=False)
+    return _component_manager
+
+
+def _session(tab: str):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP_PATH, default_timeout=RENDER_TIMEOUT)
+    if hasattr(at, "_bidi_component_manager"):
+        at._bidi_component_manager = _server_components()
+    if tab == LOGIN:
+        return at
+    at.session_state["access_token"] = TOKEN
+    at.session_state["authenticated"] = True
+    at.session_state[NAV_TAB_KEY] = tab
+    return at
+
+
+def _end_session(at):
+    # background prefetch would otherwise leak requests into the next measurement
+    if "prefetcher" in at.session_state:
+        at.session_state["prefetcher"].cancel()
+
+
+def _render(at, server: MockServer):
+    server.reset_hits()
+    start, cpu_start = time.perf_counter(), time.process_time()
+    at.run()
+    elapsed, cpu = (time.perf_counter() - start) * 1000, (time.process_time() - cpu_start) * 1000
+    errors = [str(e.value) for e in at.exception]
+    # the router's wake probe runs in the background and lands in whichever run happens to be timed
+    requests = sum(n for (_, path), n in server.hits().items() if path != HEALTH_ENDPOINT)
+    return elapsed, cpu, requests, errors
+
+
+def _cold_session(tab: str, store_dir: str, run: str):
+    os.environ["VOLUGUARD_STORE_PATH"] = os.path.join(store_dir, f"{tab.replace(' ', '_')}-{run}.sqlite3")
+    _clear_caches()
+    return _session(tab)
+
+
+def bench_tab(tab: str, server: MockServer, cold_runs: int, warm_runs: int, store_dir: str) -> dict:
+    cold_ms, errors = [], []
+    for run in range(cold_runs):
+        at = _cold_session(tab, store_dir, f"cold{run}")
+        elapsed, _, cold_requests, run_errors = _render(at, server)
+        cold_ms.append(elapsed)
+        errors += run_errors
+        if run + 1 < cold_runs:
+            _end_session(at)
+    warm_ms, warm_cpu_ms, warm_requests = [], [], []
+    for _ in range(warm_runs):
+        elapsed, cpu, requests, run_errors = _render(at, server)
+        warm_ms.append(elapsed)
+        warm_cpu_ms.append(cpu)
+        warm_requests.append(requests)
+        errors += run_errors
+    _end_session(at)
+
+    at = _cold_session(tab, store_dir, "memory")
+    tracemalloc.start()
+    try:
+        at.run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        _end_session(at)
+    return {
+        "cold_ms": min(cold_ms),
+        "warm_ms": min(warm_ms) if warm_ms else min(cold_ms),
+        "warm_cpu_ms": min(warm_cpu_ms) if warm_cpu_ms else None,
+        "cold_requests": cold_requests,
+        "warm_requests": max(warm_requests) if warm_requests else cold_requests,
+        "peak_mb": peak / 2 ** 20,
+        "errors": sorted(set(errors)),
+    }
+
+
+def check_targets(results: dict, login_target_ms: float, rerun_cpu_target_ms: float) -> list:
+    """Returns the absolute performance targets that ``results`` misses."""
+    misses = []
+    login = results.get(LOGIN)
+    if login and login["cold_ms"] > login_target_ms:
+        misses.append(f"{LOGIN}: first paint {login['cold_ms']:.1f} ms > {login_target_ms:.0f} ms")
+    for tab, current in results.items():
+        if current["warm_cpu_ms"] is not None and current["warm_cpu_ms"] > rerun_cpu_target_ms:
+            misses.append(f"{tab}: rerun CPU {current['warm_cpu_ms']:.1f} ms > {rerun_cpu_target_ms:.0f} ms")
+    return misses
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Returns human-readable regressions of ``results`` against ``baseline``."""
+    regressions = []
+    for tab, current in results.items():
+        if current["errors"]:
+            regressions.append(f"{tab}: raised {current['errors'][0]}")
+        previous = baseline.get(tab)
+        if not previous:
+            continue
+        for metric in ("cold_requests", "warm_requests"):
+            if current[metric] > previous[metric]:
+                regressions.append(f"{tab}: {metric} {previous[metric]} -> {current[metric]}")
+        for metric, floor in (("cold_ms", MIN_TIME_DELTA_MS), ("warm_ms", MIN_TIME_DELTA_MS),
+                              ("warm_cpu_ms", MIN_TIME_DELTA_MS), ("peak_mb", MIN_MEMORY_DELTA_MB)):
+            if current.get(metric) is None or previous.get(metric) is None:
+                continue
+            limit = max(previous[metric] * (1 + tolerance), previous[metric] + floor)
+            if current[metric] > limit:
+                regressions.append(f"{tab}: {metric} {previous[metric]:.1f} -> {current[metric]:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app.py tabs against the local stand-in API.")
+    parser.add_argument("--tabs", nargs="*", default=[LOGIN] + TABS, help="subset of tab names to run")
+    parser.add_argument("--cold-runs", type=int, default=3)
+    parser.add_argument("--warm-runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every API response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--expiries", type=int, default=2)
+    parser.add_argument("--strikes", type=int, default=100)
+    parser.add_argument("--trades", type=int, default=1000)
+    parser.add_argument("--positions", type=int, default=20)
+    parser.add_argument("--journals", type=int, default=100)
+    parser.add_argument("--json-only", action="store_true", help="serve plain JSON even when columnar is accepted")
+    parser.add_argument("--gzip", action="store_true", help="gzip responses")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative slowdown / growth")
+    parser.add_argument("--login-target-ms", type=float, default=LOGIN_TARGET_MS)
+    parser.add_argument("--rerun-cpu-target-ms", type=float, default=RERUN_CPU_TARGET_MS)
+    args = parser.parse_args()
+
+    config = MockConfig(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        chain_expiries=args.expiries, chain_strikes=args.strikes, trades=args.trades,
+                        positions=args.positions, journals=args.journals, columnar=not args.json_only,
+                        compress=args.gzip)
+    server = MockServer(config).start()
+    os.environ["VOLUGUARD_API_URL"] = server.url
+    # the snapshot recorder and market-state poller sample on their own clock and would skew request counts
+    os.environ["VOLUGUARD_RECORD_SNAPSHOTS"] = "0"
+    os.environ["VOLUGUARD_POLL_MARKET_STATE"] = "0"
+    sys.path.insert(0, ROOT)
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix="voluguard-bench-") as store_dir:
+            os.environ["VOLUGUARD_SNAPSHOT_DIR"] = os.path.join(store_dir, "snapshots")
+            print(f"{'tab':<22} {'cold ms':>9} {'warm ms':>9} {'warm cpu':>9} {'cold req':>9} {'warm req':>9} {'peak MB':>8}")
+            for tab in args.tabs:
+                r = bench_tab(tab, server, args.cold_runs, args.warm_runs, store_dir)
+                results[tab] = r
+                flag = "  !" if r["errors"] else ""
+                print(f"{tab:<22} {r['cold_ms']:>9.1f} {r['warm_ms']:>9.1f} {r['warm_cpu_ms']:>9.1f} {r['cold_requests']:>9} "
+                      f"{r['warm_requests']:>9} {r['peak_mb']:>8.1f}{flag}")
+            _clear_caches()
+    finally:
+        server.stop()
+
+    misses = check_targets(results, args.login_target_ms, args.rerun_cpu_target_ms)
+    for line in misses:
+        print(f"TARGET MISSED {line}")
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(config), "tabs": results}, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        sys.exit(1 if misses else 0)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("config") != vars(config):
+            print("Baseline was recorded with a different server config; comparing anyway.")
+        baseline = saved.get("tabs", {})
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions or misses:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark for the offline backtest over recorded snapshot history.
+
+For each history length it writes synthetic ``metrics``, ``chain`` and
+``suggestions`` partitions (5-minute samples, one file per day and dataset)
+to a temporary ``SnapshotStore``. It then times the backtest of every
+fixture strategy in-process and in a process pool, and reports settled trades
+and the chunk count. Leg templates come from the fixture ``/strategy/details``
+through ``payoff.strategy_legs``, the same path the app takes. Exits non-zero
+when the longest history misses the target.
+
+Run from the repository root:  python -m benchmarks.bench_backtest
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from backtest import backtest_store, strategy_template
+from benchmarks.fixtures import STRATEGIES, synthetic_history, synthetic_option_chain, synthetic_strategy_details
+from payoff import strategy_legs
+from snapshot_store import SnapshotStore
+
+DAYS = [126, 252, 756]  # six months, one and three years of trading days
+TARGET_S = 120.0  # longest history, in-process
+
+
+def templates() -> dict:
+    chain = synthetic_option_chain()
+    return {name: strategy_template(strategy_legs(synthetic_strategy_details(name, chain))[0], 24000.0)
+            for name in STRATEGIES}
+
+
+def bench(days: int, workers: int, root: str) -> dict:
+    store = SnapshotStore(root)
+    start = time.perf_counter()
+    for dataset, rows in synthetic_history(days).items():
+        store.append(dataset, rows)
+    store.flush()
+    write_s = time.perf_counter() - start
+    legs = templates()
+    start = time.perf_counter()
+    serial = backtest_store(root, legs, workers=1)
+    serial_s = time.perf_counter() - start
+    start = time.perf_counter()
+    pooled = backtest_store(root, legs, workers=workers)
+    pooled_s = time.perf_counter() - start
+    assert len(pooled["trades"]) == len(serial["trades"])
+    return {"write_s": write_s, "serial_s": serial_s, "pooled_s": pooled_s, "trades": len(serial["trades"]),
+            "open": serial["open"], "chunks": serial["chunks"], "workers": pooled["workers"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, nargs="*", default=DAYS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--target-s", type=float, default=TARGET_S)
+    args = parser.parse_args()
+    print(f"{'days':>5} {'write s':>8} {'chunks':>7} {'trades':>7} {'open':>5} {'1 proc s':>9} {'pool s':>7} {'procs':>6}")
+    result = None
+    for days in args.days:
+        with tempfile.TemporaryDirectory() as root:
+            result = bench(days, args.workers, root)
+        print(f"{days:>5} {result['write_s']:>8.1f} {result['chunks']:>7} {result['trades']:>7} {result['open']:>5} "
+              f"{result['serial_s']:>9.2f} {result['pooled_s']:>7.2f} {result['workers']:>6}")
+    if result and result["serial_s"] > args.target_s:
+        print(f"TARGET MISSED {args.days[-1]} days: {result['serial_s']:.1f} s > {args.target_s:.0f} s")
+        sys.exit(1)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Microbenchmark for chain_analytics over growing multi-expiry chains.
+
+Run from the repository root:  python -m benchmarks.bench_chain_analytics
+"""
+import argparse
+import time
+
+from benchmarks.fixtures import synthetic_option_chain
+from chain_analytics import analyze_chain, chain_frame
+
+SIZES = [(1, 50), (1, 200), (4, 200), (8, 300), (16, 400)]
+
+
+def bench(expiries: int, strikes: int, repeat: int) -> dict:
+    payload = synthetic_option_chain(expiries=expiries, strikes=strikes)
+    start = time.perf_counter()
+    df = chain_frame(payload)
+    build = time.perf_counter() - start
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        strikes_df, summary = analyze_chain(df)
+        timings.append(time.perf_counter() - start)
+    solved = strikes_df[["call_iv", "put_iv"]].notna().to_numpy().mean()
+    return {
+        "rows": len(df),
+        "build_ms": build * 1000,
+        "analyze_ms": min(timings) * 1000,
+        "per_option_us": min(timings) * 1e6 / (2 * len(df)),
+        "iv_solved": solved,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(f"{'expiries':>8} {'strikes':>8} {'rows':>7} {'build ms':>9} {'analyze ms':>11} {'us/option':>10} {'iv solved':>10}")
+    for expiries, strikes in SIZES:
+        r = bench(expiries, strikes, args.repeat)
+        print(f"{expiries:>8} {strikes:>8} {r['rows']:>7} {r['build_ms']:>9.1f} {r['analyze_ms']:>11.1f} {r['per_option_us']:>10.2f} {r['iv_solved']:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Microbenchmark for journal ingestion, the search index and paging.
+
+For each journal size it times:
+
+* the batched upsert into the local store,
+* the index build,
+* an incremental refresh after one new entry,
+* a set of searches with facets, both cold (median of ``REPEATS``) and memoized.
+
+For comparison it also times the old path: loading every entry matching a tag
+filter from SQLite. Exits non-zero when the slowest cold search misses the
+target.
+
+Run from the repository root:  python -m benchmarks.bench_journal
+"""
+import argparse
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+from benchmarks.fixtures import synthetic_journals
+from journal_index import JournalIndex
+from local_store import LocalStore
+
+SIZES = [10_000, 50_000, 100_000]
+TARGET_MS = 50.0  # slowest cold search, facets and first page included
+REPEATS = 3
+QUERIES = [
+    {"text": "iron"},
+    {"text": "session 4"},
+    {"text": "plan", "mood": "Calm"},
+    {"tag": "discipline"},
+    {"text": "held", "start": date.today() - timedelta(days=365)},
+    {"text": "nothing matches this"},
+    {},
+]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def bench(count: int) -> dict:
+    store = LocalStore(":memory:")
+    ingest_ms, _ = timed(lambda: store.upsert_journals(synthetic_journals(count)))
+    index = JournalIndex(store)
+    build_ms, _ = timed(index.refresh)
+    store.add_pending_journal({"title": "Adjusted early", "content": "Rolled the iron fly up", "mood": "Calm", "tags": "adjustment"})
+    refresh_ms, _ = timed(index.refresh)
+    cold, warm = [], []
+    for query in QUERIES:
+        runs = []
+        for _ in range(REPEATS):
+            index.clear_searches()
+            runs.append(timed(lambda: index.search(**query).keys(0, 20))[0])
+        cold.append(statistics.median(runs))
+        warm.append(timed(lambda: index.search(**query))[0])
+    sql_ms, _ = timed(lambda: store.query_journals(tag="discipline"))
+    return {
+        "ingest_ms": ingest_ms, "build_ms": build_ms, "refresh_ms": refresh_ms,
+        "cold_max_ms": max(cold), "cold_avg_ms": sum(cold) / len(cold), "warm_max_ms": max(warm), "sql_ms": sql_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="*", default=SIZES)
+    parser.add_argument("--target-ms", type=float, default=TARGET_MS)
+    args = parser.parse_args()
+    print(f"{'entries':>8} {'ingest ms':>10} {'build ms':>9} {'1 new ms':>9} {'search avg':>11} {'search max':>11} "
+          f"{'memo max':>9} {'old tag scan ms':>16}")
+    misses = []
+    for count in args.sizes:
+        r = bench(count)
+        print(f"{count:>8} {r['ingest_ms']:>10.0f} {r['build_ms']:>9.0f} {r['refresh_ms']:>9.1f} {r['cold_avg_ms']:>11.1f} "
+              f"{r['cold_max_ms']:>11.1f} {r['warm_max_ms']:>9.3f} {r['sql_ms']:>16.1f}")
+        if r["cold_max_ms"] > args.target_ms:
+            misses.append(f"{count} entries: slowest search {r['cold_max_ms']:.1f} ms > {args.target_ms:.0f} ms")
+    for miss in misses:
+        print(f"TARGET MISSED {miss}")
+    sys.exit(1 if misses else 0)
+
+
+if __name__ == "__main__":
+    main()
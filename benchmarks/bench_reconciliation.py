@@ -0,0 +1,101 @@
+"""Microbenchmark for the order-book reconciler over growing order books.
+
+Times a cold poll (every order and fill is new), a warm poll (nothing changed),
+a poll after 1% of orders changed, the hash join against the logged trades and
+the batched ``/log/trade`` posting of unlogged fills. Requests are answered
+in-process, so the numbers are the reconciler's own cost. Exits non-zero when a
+poll plus reconcile pass misses the target.
+
+Run from the repository root:  python -m benchmarks.bench_reconciliation
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.fixtures import synthetic_order_book
+from reconciliation import ORDER_BOOK_ENDPOINT, ORDER_ID_TAG, Reconciler
+
+SIZES = [1_000, 5_000, 10_000, 20_000]
+TARGET_MS = 1000.0  # cold poll + reconcile for a full day's book
+
+
+def logged_rows(trades: list) -> list:
+    """Logged trades for the fills: ~5% missing, ~2% with a wrong quantity, half tagged by order id."""
+    by_order = {}
+    for trade in trades:
+        row = by_order.setdefault(trade["order_id"], {"instrument_token": trade["instrument_token"], "quantity": 0})
+        row["quantity"] += trade["quantity"]
+    logged = []
+    for i, (order_id, row) in enumerate(by_order.items()):
+        if i % 20 == 0:
+            continue
+        quantity = row["quantity"] + (25 if i % 50 == 1 else 0)
+        notes = f"{ORDER_ID_TAG}{order_id}" if i % 2 else ""
+        logged.append({"instrument_token": row["instrument_token"], "quantity": quantity, "notes": notes})
+    return logged
+
+
+def bench(count: int) -> dict:
+    orders, trades = synthetic_order_book(count)
+    logged = logged_rows(trades)
+    responses = {ORDER_BOOK_ENDPOINT: {"status": "success", "data": orders}}
+    responses["/trades/day"] = {"status": "success", "data": trades}
+    fetch_many = lambda endpoints: [(responses[endpoint], None) for endpoint in endpoints]
+    reconciler = Reconciler()
+
+    def timed(fn):
+        start = time.perf_counter()
+        result = fn()
+        return (time.perf_counter() - start) * 1000, result
+
+    cold_ms, _ = timed(lambda: reconciler.poll(fetch_many, force=True))
+    reconcile_ms, report = timed(lambda: reconciler.reconcile(logged))
+    warm_ms, _ = timed(lambda: reconciler.poll(fetch_many, force=True))
+    warm_changed = len(reconciler.changed)
+    for order in orders[::100]:
+        order["status"] = "cancelled" if order["status"] == "open" else order["status"]
+        order["filled_quantity"] = (order["filled_quantity"] or 0) + 1
+    incremental_ms, _ = timed(lambda: reconciler.poll(fetch_many, force=True))
+    batches = []
+    post_ms, post = timed(lambda: reconciler.post_unlogged(lambda specs: batches.append(specs) or [({}, None)] * len(specs),
+                                                           report["unlogged"]))
+    return {
+        "orders": len(orders),
+        "fills": len(trades),
+        "cold_ms": cold_ms,
+        "warm_ms": warm_ms,
+        "warm_changed": warm_changed,
+        "incremental_ms": incremental_ms,
+        "incremental_changed": len(reconciler.changed),
+        "reconcile_ms": reconcile_ms,
+        "post_ms": post_ms,
+        "posted": post["posted"],
+        "batches": len(batches),
+        "unlogged": len(report["unlogged"]),
+        "mismatches": len(report["mismatches"]),
+        "orphans": len(report["orphan_gtts"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="*", default=SIZES)
+    parser.add_argument("--target-ms", type=float, default=TARGET_MS)
+    args = parser.parse_args()
+    print(f"{'orders':>7} {'fills':>7} {'cold ms':>8} {'warm ms':>8} {'1% ms':>7} {'join ms':>8} {'post ms':>8} "
+          f"{'unlogged':>9} {'mismatch':>9} {'orphans':>8} {'batches':>8}")
+    misses = []
+    for count in args.sizes:
+        r = bench(count)
+        print(f"{r['orders']:>7} {r['fills']:>7} {r['cold_ms']:>8.1f} {r['warm_ms']:>8.1f} {r['incremental_ms']:>7.1f} "
+              f"{r['reconcile_ms']:>8.1f} {r['post_ms']:>8.1f} {r['unlogged']:>9} {r['mismatches']:>9} {r['orphans']:>8} "
+              f"{r['batches']:>8}")
+        if r["cold_ms"] + r["reconcile_ms"] > args.target_ms:
+            misses.append(f"{count} orders: poll + reconcile {r['cold_ms'] + r['reconcile_ms']:.1f} ms > {args.target_ms:.0f} ms")
+    for miss in misses:
+        print(f"TARGET MISSED {miss}")
+    sys.exit(1 if misses else 0)
+
+
+if __name__ == "__main__":
+    main()
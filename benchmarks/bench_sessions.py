@@ -0,0 +1,109 @@
+"""Backend load of the market-wide endpoints as the number of sessions grows.
+
+Each simulated session reads ``MARKET_ENDPOINTS`` every ``--think`` seconds
+(jittered) for ``--duration`` seconds against the local stand-in API, with
+refresh intervals scaled down to ``--interval`` seconds. Three strategies:
+
+* ``private``: every session caches its own copy (one poller per session).
+* ``cache``: one process-wide TTL cache; concurrent misses each hit the backend.
+* ``shared``: ``MarketStateService`` (single poller, single-flight refresh).
+
+Run from the repository root:  python -m benchmarks.bench_sessions --sessions 1 10 30
+"""
+import argparse
+import random
+import threading
+import time
+
+from benchmarks.mock_server import MockConfig, MockServer
+from http_client import ApiClient
+from market_state import MARKET_ENDPOINTS, MarketStateService
+from response_cache import PRIVATE, SHARED, ResponseCache
+from wire_format import accept_header, decode
+
+MODES = ["private", "cache", "shared"]
+
+
+def make_fetch(client: ApiClient):
+    def fetch(token: str, endpoint: str):
+        accept = accept_header(endpoint)
+        response = client.get(endpoint, params={"access_token": token}, headers={"Accept": accept} if accept else None)
+        if not response.ok:
+            return None, f"API Error: {response.status_code}"
+        return decode(response.headers.get("Content-Type"), response.content), None
+    return fetch
+
+
+def make_reader(mode: str, fetch, interval: float):
+    """Returns ``(read(token, endpoint), subscribe(session, token), stop())`` for a strategy."""
+    if mode == "shared":
+        service = MarketStateService(fetch, intervals={endpoint: interval for endpoint in MARKET_ENDPOINTS})
+        return lambda token, endpoint: service.get(endpoint, token), service.subscribe, service.stop
+    scope = PRIVATE if mode == "private" else SHARED
+    cache = ResponseCache(policies={endpoint: (interval, scope) for endpoint in MARKET_ENDPOINTS})
+
+    def read(token, endpoint):
+        key = cache.make_key(endpoint, token)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached, None
+        data, error = fetch(token, endpoint)
+        if error is None:
+            cache.put(key, data)
+        return data, error
+
+    return read, lambda session, token: None, lambda: None
+
+
+def run(mode: str, sessions: int, server: MockServer, args) -> dict:
+    client = ApiClient(server.url)
+    read, subscribe, stop = make_reader(mode, make_fetch(client), args.interval)
+    done = threading.Event()
+    errors = []
+
+    def session(index: int):
+        token = f"token-{index}"
+        rng = random.Random(index)
+        done.wait(rng.uniform(0, args.think))  # sessions do not all start in lockstep
+        while not done.is_set():
+            subscribe(index, token)
+            for endpoint in MARKET_ENDPOINTS:
+                if read(token, endpoint)[1]:
+                    errors.append(endpoint)
+            done.wait(rng.uniform(0.5, 1.5) * args.think)
+
+    server.reset_hits()
+    threads = [threading.Thread(target=session, args=(i,), daemon=True) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    done.set()
+    stop()
+    for thread in threads:
+        thread.join()
+    client.close()
+    hits = sum(count for (_, path), count in server.hits().items() if path in MARKET_ENDPOINTS)
+    return {"backend_qps": hits / args.duration, "hits": hits, "errors": len(errors)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 30])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--interval", type=float, default=2.0, help="refresh interval for every endpoint, seconds")
+    parser.add_argument("--think", type=float, default=0.5, help="mean pause between a session's reads, seconds")
+    parser.add_argument("--latency", type=float, default=0.1, help="injected backend latency, seconds")
+    args = parser.parse_args()
+    server = MockServer(MockConfig(latency=args.latency, chain_strikes=50)).start()
+    try:
+        print(f"{'sessions':>8} " + " ".join(f"{mode + ' qps':>12}" for mode in MODES))
+        for sessions in args.sessions:
+            results = [run(mode, sessions, server, args) for mode in MODES]
+            flag = "  !" if any(r["errors"] for r in results) else ""
+            print(f"{sessions:>8} " + " ".join(f"{r['backend_qps']:>12.2f}" for r in results) + flag)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Microbenchmark for multi-expiry chain books and memoized per-expiry analytics.
+
+For each size it times building the ``ChainBook`` from per-expiry responses,
+solving every expiry cold, serving them all from the memo, and a tick in which
+only the nearest expiry changed. It also compares the book's memory with the
+per-expiry ``chain_frame`` DataFrames it replaces.
+
+Run from the repository root:  python -m benchmarks.bench_term_structure
+"""
+import argparse
+import time
+
+from benchmarks.fixtures import synthetic_option_chain
+from chain_analytics import chain_frame
+from term_structure import ChainBook, ExpiryAnalyticsCache, term_structure
+
+SIZES = [(2, 200), (4, 200), (8, 200), (8, 400)]
+
+
+def bench(expiries: int, strikes: int) -> dict:
+    chain = synthetic_option_chain(expiries=expiries, strikes=strikes)
+    dates = sorted({row["expiry"] for row in chain})
+    responses = [{"status": "success", "data": [row for row in chain if row["expiry"] == d]} for d in dates]
+    frames_kb = sum(chain_frame(r).memory_usage(deep=True).sum() for r in responses) / 1024
+
+    start = time.perf_counter()
+    book = ChainBook.from_responses(dates, responses)
+    build_ms = (time.perf_counter() - start) * 1000
+    memo = ExpiryAnalyticsCache()
+
+    def solve_all():
+        start = time.perf_counter()
+        term_structure([memo.analytics(book, d)["summary"] for d in dates])
+        return (time.perf_counter() - start) * 1000
+
+    cold_ms = solve_all()
+    memo_ms = solve_all()
+    for row in responses[0]["data"]:
+        row["call_options"]["market_data"]["ltp"] += 0.05
+    book.add(dates[0], responses[0]["data"])
+    tick_ms = solve_all()
+    return {
+        "rows": len(chain), "build_ms": build_ms, "cold_ms": cold_ms, "memo_ms": memo_ms, "tick_ms": tick_ms,
+        "book_kb": book.nbytes / 1024, "frames_kb": frames_kb, "shared_strikes": book.strikes.size,
+    }
+
+
+def main():
+    argparse.ArgumentParser(description=__doc__).parse_args()
+    print(f"{'expiries':>8} {'strikes':>8} {'build ms':>9} {'cold ms':>8} {'memo ms':>8} {'1 tick ms':>10} "
+          f"{'book KB':>8} {'frames KB':>10} {'index':>6}")
+    for expiries, strikes in SIZES:
+        r = bench(expiries, strikes)
+        print(f"{expiries:>8} {strikes:>8} {r['build_ms']:>9.1f} {r['cold_ms']:>8.1f} {r['memo_ms']:>8.2f} {r['tick_ms']:>10.1f} "
+              f"{r['book_kb']:>8.0f} {r['frames_kb']:>10.0f} {r['shared_strikes']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Decode time, size and peak memory of JSON vs columnar payloads.
+
+Run from the repository root:  python -m benchmarks.bench_wire_format
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import wire_format
+from benchmarks.fixtures import synthetic_trades
+
+SIZES = [1_000, 10_000, 50_000]
+KINDS = [wire_format.JSON, wire_format.COLUMNS_JSON, wire_format.ARROW_STREAM]
+
+
+def json_to_frame(body: bytes):
+    # the pre-columnar path: parse row dicts, then build the frame from them
+    return wire_format.as_frame(json.loads(body)["trades"])
+
+
+def bench(count: int, kind: str, repeat: int) -> dict:
+    payload = {"trades": synthetic_trades(count), "next_cursor": None}
+    body = wire_format.encode(payload, "/fetch/trades", kind)
+    decode = json_to_frame if kind == wire_format.JSON else (
+        lambda raw: wire_format.decode(kind, raw)["trades"])
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode(body)
+        timings.append(time.perf_counter() - start)
+    # tracemalloc misses Arrow's own memory pool, so add what the decoded frame still holds there
+    arrow_before = wire_format.pa.total_allocated_bytes() if wire_format.pa else 0
+    tracemalloc.start()
+    frame = decode(body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    if wire_format.pa:
+        peak += max(0, wire_format.pa.total_allocated_bytes() - arrow_before)
+    del frame
+    return {"bytes": len(body), "decode_ms": min(timings) * 1000, "peak_mb": peak / 2 ** 20}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(f"{'trades':>7} {'format':<40} {'KB':>9} {'decode ms':>10} {'peak MB':>8}")
+    for count in SIZES:
+        for kind in KINDS:
+            r = bench(count, kind, args.repeat)
+            print(f"{count:>7} {kind:<40} {r['bytes'] / 1024:>9.0f} {r['decode_ms']:>10.1f} {r['peak_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""Synthetic VoluGuard API payloads for benchmarks and the local stand-in server."""
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from backend_router import IST
+from chain_analytics import bs_price
+
+STRIKE_STEP = 50
+LOT_SIZE = 75
+
+
+def synthetic_option_chain(expiries: int = 1, strikes: int = 100, spot: float = 24000.0,
+                           seed: int = 7, start: date = None) -> list:
+    """Builds ``/fetch/option-chain`` rows priced off a smile so IV solving is realistic."""
+    rng = np.random.default_rng(seed)
+    start = start or date.today()
+    rows = []
+    atm = round(spot / STRIKE_STEP) * STRIKE_STEP
+    grid = atm + STRIKE_STEP * (np.arange(strikes) - strikes // 2)
+    for e in range(expiries):
+        expiry = start + timedelta(days=7 * (e + 1))
+        t = (7 * (e + 1)) / 365.0
+        moneyness = grid / spot - 1.0
+        sigma = 0.13 + 0.6 * moneyness ** 2 - 0.15 * moneyness
+        calls = bs_price(spot, grid, t, sigma, True)
+        puts = bs_price(spot, grid, t, sigma, False)
+        call_oi = rng.integers(1_000, 500_000, strikes)
+        put_oi = rng.integers(1_000, 500_000, strikes)
+        for i, strike in enumerate(grid):
+            rows.append({
+                "expiry": expiry.isoformat(),
+                "strike_price": float(strike),
+                "underlying_spot_price": spot,
+                "pcr": float(put_oi[i] / call_oi[i]),
+                "call_options": {
+                    "instrument_key": f"NSE_FO|{e}{i:04d}1",
+                    "market_data": {"ltp": round(float(calls[i]), 2), "oi": int(call_oi[i]), "volume": int(call_oi[i] // 3)},
+                    "option_greeks": {"iv": round(float(sigma[i]) * 100, 2)},
+                },
+                "put_options": {
+                    "instrument_key": f"NSE_FO|{e}{i:04d}2",
+                    "market_data": {"ltp": round(float(puts[i]), 2), "oi": int(put_oi[i]), "volume": int(put_oi[i] // 3)},
+                    "option_greeks": {"iv": round(float(sigma[i]) * 100, 2)},
+                },
+            })
+    return rows
+
+
+STRATEGIES = ["Iron Fly", "Iron Condor", "Short Straddle", "Short Strangle", "Bull Put Credit", "Bear Call Credit"]
+# short-premium legs per strategy as (strike offset in steps, option type)
+_STRATEGY_LEGS = {
+    "Iron Fly": [(0, "CE"), (0, "PE"), (4, "CE"), (-4, "PE")],
+    "Iron Condor": [(3, "CE"), (-3, "PE"), (6, "CE"), (-6, "PE")],
+    "Short Straddle": [(0, "CE"), (0, "PE")],
+    "Short Strangle": [(4, "CE"), (-4, "PE")],
+    "Bull Put Credit": [(-2, "PE"), (-5, "PE")],
+    "Bear Call Credit": [(2, "CE"), (5, "CE")],
+}
+
+
+def _chain_index(chain: list) -> dict:
+    """Maps ``(strike, 'CE'|'PE')`` of the nearest expiry to its chain leg."""
+    if not chain:
+        return {}
+    nearest = min(row["expiry"] for row in chain)
+    index = {}
+    for row in chain:
+        if row["expiry"] == nearest:
+            index[(row["strike_price"], "CE")] = row["call_options"]
+            index[(row["strike_price"], "PE")] = row["put_options"]
+    return index
+
+
+def synthetic_strategy_details(strategy: str, chain: list, spot: float = 24000.0) -> dict:
+    """``/strategy/details`` for one lot, with legs taken from ``chain`` so they resolve locally."""
+    index = _chain_index(chain)
+    atm = round(spot / STRIKE_STEP) * STRIKE_STEP
+    orders, premium = [], 0.0
+    for i, (offset, option_type) in enumerate(_STRATEGY_LEGS.get(strategy, _STRATEGY_LEGS["Short Straddle"])):
+        strike = float(atm + offset * STRIKE_STEP)
+        leg = index.get((strike, option_type), {})
+        ltp = leg.get("market_data", {}).get("ltp", 0.0)
+        # the inner legs are sold, wings bought
+        selling = i < 2
+        premium += ltp if selling else -ltp
+        orders.append({
+            "instrument_key": leg.get("instrument_key", f"NSE_FO|{int(strike)}{option_type}"),
+            "transaction_type": "SELL" if selling else "BUY",
+            "quantity": LOT_SIZE,
+            "price": ltp,
+            "current_price": ltp,
+            "strike": strike,
+            "option_type": option_type,
+            "product": "D",
+        })
+    return {
+        "strategy": strategy,
+        "orders": orders,
+        "strikes": sorted({o["strike"] for o in orders}),
+        "premium": round(premium, 2),
+        "premium_total": round(premium * LOT_SIZE, 2),
+        "max_profit": round(premium * LOT_SIZE, 2),
+        "max_loss": round(max(4 * STRIKE_STEP - premium, premium) * LOT_SIZE, 2),
+    }
+
+
+def synthetic_positions(count: int, chain: list, seed: int = 11) -> list:
+    """``/live/dashboard`` positions on chain instruments, mostly short."""
+    rng = np.random.default_rng(seed)
+    legs = list(_chain_index(chain).values())
+    positions = []
+    for i in range(count):
+        leg = legs[int(rng.integers(len(legs)))] if legs else {"instrument_key": f"NSE_FO|{i}", "market_data": {"ltp": 100.0}}
+        entry = float(leg["market_data"]["ltp"]) * float(rng.uniform(0.8, 1.2))
+        current = float(leg["market_data"]["ltp"])
+        quantity = LOT_SIZE * int(rng.integers(1, 5)) * (-1 if rng.random() < 0.8 else 1)
+        positions.append({
+            "instrument_key": leg["instrument_key"],
+            "strategy": STRATEGIES[i % len(STRATEGIES)],
+            "entry_price": round(entry, 2),
+            "current_price": round(current, 2),
+            "quantity": quantity,
+            "realized_pnl": 0.0,
+            "unrealized_pnl": round((current - entry) * quantity, 2),
+            "capital_used": round(abs(entry * quantity) * 5, 2),
+            "delta": 0.0, "gamma": 0.0, "theta": 0.0, "vega": 0.0,
+        })
+    return positions
+
+
+def synthetic_trades(count: int, seed: int = 13, start: date = None) -> list:
+    """``/fetch/trades`` rows, newest first, one entry every 15 minutes."""
+    rng = np.random.default_rng(seed)
+    start = start or date.today()
+    trades = []
+    for i in range(count):
+        entered = datetime.combine(start, datetime.min.time()) - timedelta(minutes=15 * i)
+        closed = i % 3 != 0
+        entry = float(rng.uniform(20, 300))
+        quantity = LOT_SIZE * int(rng.integers(1, 5))
+        trades.append({
+            "id": count - i,
+            "strategy": STRATEGIES[i % len(STRATEGIES)],
+            "instrument_token": f"NSE_FO|{40000 + i % 500}",
+            "entry_price": round(entry, 2),
+            "quantity": quantity,
+            "realized_pnl": round(float(rng.normal(0, 2000)), 2) if closed else 0.0,
+            "unrealized_pnl": 0.0 if closed else round(float(rng.normal(0, 1000)), 2),
+            "capital_used": round(entry * quantity * 5, 2),
+            "potential_loss": round(entry * quantity * 0.5, 2),
+            "vega": round(float(rng.normal(0, 50)), 2),
+            "sl_hit": bool(closed and rng.random() < 0.1),
+            "regime_score": round(float(rng.uniform(0, 10)), 1),
+            "notes": "",
+            "status": "closed" if closed else "open",
+            "timestamp_entry": entered.isoformat(),
+            "timestamp_exit": (entered + timedelta(hours=3)).isoformat() if closed else None,
+        })
+    return trades
+
+
+def synthetic_order_book(count: int, seed: int = 17, day: date = None) -> tuple:
+    """``/order/book`` and ``/trades/day`` rows for one session: ``(orders, trades)``.
+
+    Most orders are complete with one or two fills; the rest are open,
+    cancelled, rejected or pending GTT stop-losses.
+    """
+    rng = np.random.default_rng(seed)
+    day = day or date.today()
+    opened = datetime.combine(day, datetime.min.time()).replace(hour=9, minute=15)
+    orders, trades = [], []
+    for i in range(count):
+        placed = opened + timedelta(seconds=int(22500 * i / max(count, 1)))
+        roll = rng.random()
+        gtt = roll >= 0.95
+        status = "complete" if roll < 0.8 else "open" if roll < 0.85 else "cancelled" if roll < 0.9 else "rejected" if roll < 0.95 else "trigger pending"
+        quantity = LOT_SIZE * int(rng.integers(1, 5))
+        price = round(float(rng.uniform(20, 300)), 2)
+        order_id = f"GTT-{day:%y%m%d}{i:06d}" if gtt else f"{day:%y%m%d}{i:08d}"
+        orders.append({
+            "order_id": order_id,
+            "instrument_token": f"NSE_FO|{40000 + i % 500}",
+            "transaction_type": "BUY" if gtt or rng.random() < 0.3 else "SELL",
+            "order_type": "SL" if gtt else "LIMIT",
+            "product": "D",
+            "status": status,
+            "quantity": quantity,
+            "filled_quantity": quantity if status == "complete" else 0,
+            "price": price,
+            "trigger_price": round(price * 1.5, 2) if gtt else 0.0,
+            "average_price": price if status == "complete" else 0.0,
+            "order_timestamp": placed.isoformat(),
+        })
+        if status == "complete":
+            split = LOT_SIZE * int(rng.integers(1, quantity // LOT_SIZE + 1))
+            for n, part in enumerate(q for q in (split, quantity - split) if q):
+                trades.append({
+                    "trade_id": f"T{i:08d}{n}",
+                    "order_id": order_id,
+                    "instrument_token": orders[-1]["instrument_token"],
+                    "transaction_type": orders[-1]["transaction_type"],
+                    "quantity": part,
+                    "average_price": price,
+                    "exchange_timestamp": (placed + timedelta(seconds=n + 1)).isoformat(),
+                })
+    return orders, trades
+
+
+def synthetic_journals(count: int, start: date = None) -> list:
+    """``/fetch/journals`` entries, one per day going back from ``start``."""
+    moods = ["Calm", "Confident", "Anxious", "Neutral"]
+    start = start or date.today()
+    return [{
+        "id": count - i,
+        "title": f"Session {count - i}",
+        "content": f"Held {STRATEGIES[i % len(STRATEGIES)]} through the open; followed the plan.",
+        "mood": moods[i % len(moods)],
+        "tags": ", ".join(["discipline", STRATEGIES[i % len(STRATEGIES)].lower()]),
+        "timestamp": datetime.combine(start - timedelta(days=i), datetime.min.time()).replace(hour=16).isoformat(),
+    } for i in range(count)]
+
+
+_REGIMES = [  # (regime, VIX range, suggested strategies)
+    ("Low Volatility", (10.0, 13.0), ["Iron Fly", "Bull Put Credit", "Bear Call Credit"]),
+    ("Neutral Volatility", (13.0, 17.0), ["Iron Condor", "Short Strangle", "Iron Fly"]),
+    ("High Volatility", (17.0, 26.0), ["Iron Condor", "Bull Put Credit"]),
+]
+
+
+def synthetic_history(days: int, strikes: int = 40, samples: int = 75, spot: float = 22000.0,
+                      seed: int = 19, end: date = None) -> dict:
+    """Recorded ``metrics``, ``chain`` (``/full-chain-table`` columns) and ``suggestions`` frames.
+
+    Covers the last ``days`` weekdays up to ``end``, ``samples`` snapshots a day
+    from 09:15 at 5-minute steps, with a GBM spot, weekly Thursday expiries and
+    a regime drawn from each day's VIX.
+    """
+    rng = np.random.default_rng(seed)
+    end = end or date.today()
+    trading = pd.bdate_range(end=end, periods=days)
+    regime = rng.integers(0, len(_REGIMES), days)
+    vix = np.array([rng.uniform(*_REGIMES[r][1]) for r in regime])
+    closes = spot * np.exp(np.cumsum(rng.standard_normal(days) * vix / 100 / np.sqrt(252)))
+    minutes = (9 * 60 + 15 + 5 * np.arange(samples)).astype("timedelta64[m]")
+    stamps = pd.DatetimeIndex((trading.to_numpy()[:, None] + minutes).ravel()).tz_localize(IST)
+    intraday = np.repeat(closes, samples) * (1 + rng.standard_normal(days * samples) * 0.001)
+    days_to_expiry = np.repeat((3 - trading.weekday.to_numpy()) % 7, samples)
+    metrics = pd.DataFrame({"ts": stamps, "nifty_spot": intraday, "india_vix": np.repeat(vix, samples),
+                            "days_to_expiry": days_to_expiry.astype(float)})
+    atm = np.round(intraday / STRIKE_STEP) * STRIKE_STEP
+    grid = atm[:, None] + STRIKE_STEP * (np.arange(strikes) - strikes // 2)
+    moneyness = grid / intraday[:, None] - 1.0
+    base = np.repeat(vix, samples)[:, None] / 100
+    chain = pd.DataFrame({
+        "ts": np.repeat(stamps, strikes),
+        "Strike": grid.ravel(),
+        "Call IV": ((base + 0.6 * moneyness ** 2 - 0.10 * moneyness) * 100).ravel().round(2),
+        "Put IV": ((base + 0.6 * moneyness ** 2 - 0.15 * moneyness) * 100).ravel().round(2),
+    })
+    suggestions = pd.DataFrame({
+        "ts": stamps,
+        "regime": np.repeat([_REGIMES[r][0] for r in regime], samples),
+        "score": np.repeat(rng.uniform(0, 10, days).round(1), samples),
+        "strategies": np.repeat(["|".join(_REGIMES[r][2]) for r in regime], samples),
+    })
+    return {"metrics": metrics, "chain": chain, "suggestions": suggestions}
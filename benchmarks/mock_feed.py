@@ -0,0 +1,225 @@
+"""Local stand-in for the Upstox market feed WebSocket.
+
+``MockFeedServer`` speaks just enough RFC 6455 (handshake, unfragmented text,
+binary, ping and close frames) to serve ``market_feed.FeedWorker``. It needs no
+dependency beyond the standard library. Every market connection streams JSON ``ltpc``
+frames, which ``decode_market_message`` accepts the same way as protobuf. The
+server records which token opened each connection and which instrument keys
+were subscribed.
+
+``authorize`` stands in for the backend's ``/authorize-market-feed`` and
+``/authorize-portfolio-feed``: it returns a connection URL that carries the
+token, or a 401 error once the token is revoked. Portfolio connections are
+accepted but stay silent. Revoking a token also drops its open connections, as
+Upstox does, so tests can drive reconnects and token rotation.
+
+Run standalone from the repository root:
+
+    python -m benchmarks.mock_feed --port 8765
+"""
+import argparse
+import base64
+import hashlib
+import json
+import select
+import socket
+import socketserver
+import struct
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+from market_feed import NIFTY_KEY, VIX_KEY
+
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+def encode_frame(payload: bytes, opcode: int = OP_TEXT) -> bytes:
+    """Builds one unmasked, unfragmented server frame."""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+def _read_exact(sock, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Client closed the connection")
+        data += chunk
+    return data
+
+
+def read_frame(sock) -> tuple:
+    """Reads one (masked) client frame and returns ``(opcode, payload)``."""
+    first, second = _read_exact(sock, 2)
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", _read_exact(sock, 2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", _read_exact(sock, 8))[0]
+    mask = _read_exact(sock, 4) if second & 0x80 else b"\0\0\0\0"
+    payload = _read_exact(sock, length)
+    return first & 0x0F, bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+
+class MockFeedServer:
+    """Threaded stand-in WebSocket feed; see the module docstring."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, interval: float = 0.05, ltps: dict = None):
+        self.interval = interval
+        self.ltps = dict(ltps or {NIFTY_KEY: 24000.0, VIX_KEY: 13.5})
+        self.connections = []  # token of every accepted market connection, in order
+        self.subscriptions = []  # instrument keys of every subscription frame received
+        self.authorizations = []  # token of every authorize call, accepted or not
+        self.revoked = set()
+        self._open = {}  # socket -> (token, feed)
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer((host, port), self._handler_class(), bind_and_activate=False)
+        self._server.daemon_threads = True
+        self._server.allow_reuse_address = True
+        self._server.server_bind()
+        self._server.server_activate()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"ws://{host}:{port}"
+
+    def start(self) -> "MockFeedServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-feed", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.disconnect()
+        self._server.shutdown()
+        self._server.server_close()
+
+    # --- Backend stand-in ---
+    def authorize(self, token: str, endpoint: str):
+        """``(data, error)`` like ``services._send_request`` for the authorize-feed endpoints."""
+        feed = "market" if endpoint == "/authorize-market-feed" else "portfolio"
+        with self._lock:
+            if feed == "market":
+                self.authorizations.append(token)
+            if token in self.revoked:
+                return None, "API Error: 401 - Invalid token"
+        return {"status": "success", "data": {"authorized_redirect_uri": f"{self.url}/{feed}?token={token}"}}, None
+
+    def revoke(self, token: str):
+        """Rejects ``token`` from now on and drops its open connections."""
+        with self._lock:
+            self.revoked.add(token)
+        self.disconnect(token)
+
+    def disconnect(self, token: str = None):
+        """Closes open connections (all, or only those opened with ``token``)."""
+        with self._lock:
+            sockets = [sock for sock, (owner, _) in self._open.items() if token is None or owner == token]
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def open_tokens(self) -> list:
+        """Tokens of the open market connections."""
+        with self._lock:
+            return [token for token, feed in self._open.values() if feed == "market"]
+
+    def wait_for(self, condition, timeout: float = 10.0) -> bool:
+        """Polls ``condition()`` until it is true or ``timeout`` passes."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if condition():
+                return True
+            time.sleep(0.02)
+        return condition()
+
+    # --- Connections ---
+    def _accept(self, sock, rfile) -> tuple:
+        request_line = rfile.readline().decode("latin-1")
+        headers = {}
+        for line in iter(lambda: rfile.readline().decode("latin-1").strip(), ""):
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        target = urlparse(request_line.split(" ")[1])
+        token, feed = parse_qs(target.query).get("token", [None])[0], target.path.strip("/")
+        with self._lock:
+            rejected = token is None or token in self.revoked
+        if rejected or "sec-websocket-key" not in headers:
+            sock.sendall(b"HTTP/1.1 401 Unauthorized\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            return None, None
+        accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + GUID).encode()).digest()).decode()
+        sock.sendall(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        with self._lock:
+            if feed == "market":
+                self.connections.append(token)
+            self._open[sock] = (token, feed)
+        return token, feed
+
+    def _serve(self, sock, stream: bool):
+        while True:
+            readable, _, _ = select.select([sock], [], [], self.interval)
+            if readable:
+                opcode, payload = read_frame(sock)
+                if opcode == OP_CLOSE:
+                    sock.sendall(encode_frame(payload[:2], OP_CLOSE))
+                    return
+                if opcode == OP_PING:
+                    sock.sendall(encode_frame(payload, OP_PONG))
+                elif opcode in (OP_TEXT, OP_BINARY):
+                    keys = json.loads(payload).get("data", {}).get("instrumentKeys", [])
+                    with self._lock:
+                        self.subscriptions.append(list(keys))
+            if not stream:
+                continue
+            with self._lock:
+                feeds = {key: {"ltpc": {"ltp": ltp}} for key, ltp in self.ltps.items()}
+            sock.sendall(encode_frame(json.dumps({"type": "live_feed", "feeds": feeds}).encode()))
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                token, feed = server._accept(self.connection, self.rfile)
+                if token is None:
+                    return
+                try:
+                    server._serve(self.connection, stream=feed == "market")
+                except (ConnectionError, OSError, ValueError):
+                    pass
+                finally:
+                    with server._lock:
+                        server._open.pop(self.connection, None)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between ltpc frames")
+    args = parser.parse_args()
+    server = MockFeedServer(args.host, args.port, args.interval).start()
+    print(f"Stand-in market feed on {server.url}/market?token=<token>")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
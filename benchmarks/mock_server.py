@@ -0,0 +1,374 @@
+"""Local stand-in for the VoluGuard API, generated from ``openapi2.txt``.
+
+Routes, methods and required query parameters come from the OpenAPI document;
+response bodies come from ``benchmarks.fixtures`` and are sized by
+``MockConfig`` (chain strikes and expiries, trades, positions, journals, orders).
+Latency, jitter and failures can be injected globally or per endpoint.
+Columnar encodings (see ``wire_format``) are served when the client asks for
+them and ``MockConfig.columnar`` is on; ``compress`` gzips bodies on request.
+Unknown paths get 404, wrong methods 405 and missing required parameters 422,
+as the real FastAPI backend would return.
+
+Run standalone from the repository root:
+
+    python -m benchmarks.mock_server --port 8000 --latency 0.05 --strikes 200
+
+then point the app at it with ``VOLUGUARD_API_URL=http://127.0.0.1:8000``.
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import wire_format
+from benchmarks.fixtures import (
+    LOT_SIZE, STRATEGIES, synthetic_journals, synthetic_option_chain, synthetic_order_book, synthetic_positions,
+    synthetic_strategy_details, synthetic_trades,
+)
+
+SPEC_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "openapi2.txt")
+SPOT = 24000.0
+VIX = 13.5
+
+
+@dataclass
+class MockConfig:
+    """Payload sizes and fault injection for the stand-in server."""
+
+    latency: float = 0.0  # seconds added to every response
+    jitter: float = 0.0  # uniform extra latency in [0, jitter]
+    error_rate: float = 0.0  # probability of a 500 on any endpoint
+    endpoint_latency: dict = field(default_factory=dict)  # path -> seconds, replaces ``latency``
+    endpoint_errors: dict = field(default_factory=dict)  # path -> error probability, replaces ``error_rate``
+    chain_expiries: int = 2
+    chain_strikes: int = 100
+    trades: int = 1000
+    positions: int = 20
+    journals: int = 100
+    orders: int = 200
+    seed: int = 7
+    columnar: bool = True  # honour Accept for Arrow / column-oriented JSON
+    compress: bool = False  # gzip bodies when the client accepts it
+
+
+def load_routes(spec_path: str = SPEC_PATH) -> dict:
+    """Returns ``{path: {METHOD: [required query params]}}`` from the OpenAPI document."""
+    with open(spec_path, encoding="utf-8") as f:
+        spec = json.load(f)
+    routes = {}
+    for path, operations in spec["paths"].items():
+        routes[path] = {
+            method.upper(): [p["name"] for p in op.get("parameters", []) if p.get("in") == "query" and p.get("required")]
+            for method, op in operations.items()
+        }
+    return routes
+
+
+class MockApi:
+    """Builds response bodies once per config and serves them by path."""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.chain = synthetic_option_chain(expiries=config.chain_expiries, strikes=config.chain_strikes,
+                                            spot=SPOT, seed=config.seed)
+        self.trades = synthetic_trades(config.trades)
+        self.journals = synthetic_journals(config.journals)
+        self.positions = synthetic_positions(config.positions, self.chain)
+        self.orders, self.day_trades = synthetic_order_book(config.orders)
+        self.details = {name: synthetic_strategy_details(name, self.chain, SPOT) for name in STRATEGIES}
+        self._encoded = {}
+        self._columnar = {}
+
+    def encode(self, path: str, raw: bytes, kind: str) -> bytes:
+        """Re-encodes a JSON body in a columnar ``kind``; fixed payloads are converted once."""
+        if kind == wire_format.JSON:
+            return raw
+        cacheable = path in self._encoded and self._encoded[path] is raw
+        if cacheable and (path, kind) in self._columnar:
+            return self._columnar[(path, kind)]
+        body = wire_format.encode(json.loads(raw), path, kind)
+        if cacheable:
+            self._columnar[(path, kind)] = body
+        return body
+
+    def _static(self, path: str, body):
+        # fixed payloads are encoded once so the server measures the app, not itself
+        if path not in self._encoded:
+            self._encoded[path] = json.dumps(body).encode("utf-8")
+        return self._encoded[path]
+
+    def respond(self, method: str, path: str, query: dict, body: dict) -> bytes:
+        name = path.strip("/").replace("/", "_").replace("-", "_") or "root"
+        handler = getattr(self, "_" + name, None)
+        if handler is not None:
+            return handler(query, body)
+        if method == "POST":
+            return self._static(path, {"status": "success"})
+        return self._static(path, {"status": "success", "data": {}})
+
+    # --- Market data ---
+    def _root(self, query, body):
+        return self._static("/", {"message": "VoluGuard API is running"})
+
+    def _expiries(self, query, body):
+        return self._static("/expiries", {"status": "success", "data": sorted({row["expiry"] for row in self.chain})})
+
+    def _fetch_option_chain(self, query, body):
+        expiry = query.get("expiry_date")
+        if expiry:
+            return json.dumps({"status": "success", "data": [row for row in self.chain if row["expiry"] == expiry]}).encode("utf-8")
+        return self._static("/fetch/option-chain", {"status": "success", "data": self.chain})
+
+    def _full_chain_table(self, query, body):
+        nearest = min(row["expiry"] for row in self.chain)
+        rows = []
+        for row in self.chain:
+            if row["expiry"] != nearest:
+                continue
+            call, put = row["call_options"], row["put_options"]
+            rows.append({
+                "Strike": row["strike_price"],
+                "Call IV": call["option_greeks"]["iv"],
+                "Put IV": put["option_greeks"]["iv"],
+                "IV Skew": round(put["option_greeks"]["iv"] - call["option_greeks"]["iv"], 2),
+                "Total Theta": -round((call["market_data"]["ltp"] + put["market_data"]["ltp"]) / 7, 2),
+                "Total Vega": round((call["market_data"]["ltp"] + put["market_data"]["ltp"]) / 20, 2),
+                "Straddle Price": round(call["market_data"]["ltp"] + put["market_data"]["ltp"], 2),
+                "Total OI": call["market_data"]["oi"] + put["market_data"]["oi"],
+            })
+        return self._static("/full-chain-table", {"status": "success", "data": rows})
+
+    def _option_seller_dashboard(self, query, body):
+        return self._static("/option-seller-dashboard", {
+            "nifty_spot": SPOT, "india_vix": VIX, "days_to_expiry": 7, "atm_strike": SPOT,
+            "straddle_price": 420.0, "avg_iv": 13.2, "theta": -60.0, "vega": 21.0, "hv_7_day": 11.8,
+            "garch_7_day": 12.4, "pcr": 1.05, "max_pain": SPOT, "iv_rv_spread": 1.4, "pop": 68.0,
+        })
+
+    def _predict_volatility(self, query, body):
+        return self._static("/predict/volatility", {
+            "predicted_volatility": 12.9, "atm_iv": 13.2, "hv": 11.8, "ivp": 42.0, "pcr": 1.05,
+            "vix": VIX, "days_to_expiry": 7,
+        })
+
+    def _suggest_strategy(self, query, body):
+        return self._static("/suggest/strategy", {
+            "regime": "Neutral Volatility", "score": 5.5, "strategies": STRATEGIES[:4],
+            "note": "Benchmark fixture", "explanation": "Synthetic regime for the offline benchmark.",
+        })
+
+    def _strategy_details(self, query, body):
+        return json.dumps(self.details.get((body or {}).get("strategy"), self.details[STRATEGIES[0]])).encode("utf-8")
+
+    # --- Portfolio ---
+    def _live_dashboard(self, query, body):
+        capital = sum(p["capital_used"] for p in self.positions)
+        return self._static("/live/dashboard", {
+            "portfolio": {"total_funds": max(capital * 3, 1_000_000.0), "capital_deployed": capital,
+                          "exposure_percent": 33.0, "realized_pnl": 0.0,
+                          "unrealized_pnl": sum(p["unrealized_pnl"] for p in self.positions)},
+            "positions": self.positions,
+            "market_data": {"nifty_spot": SPOT, "india_vix": VIX},
+        })
+
+    def _order_book(self, query, body):
+        return self._static("/order/book", {"status": "success", "data": self.orders})
+
+    def _trades_day(self, query, body):
+        return self._static("/trades/day", {"status": "success", "data": self.day_trades})
+
+    def _fetch_trades(self, query, body):
+        trades = self.trades
+        if query.get("status"):
+            trades = [t for t in trades if t["status"] == query["status"]]
+        if query.get("strategy"):
+            trades = [t for t in trades if t["strategy"] == query["strategy"]]
+        if query.get("updated_since"):
+            trades = [t for t in trades if max(filter(None, (t["timestamp_exit"], t["timestamp_entry"]))) > query["updated_since"]]
+        if "limit" not in query:
+            return json.dumps({"trades": trades}).encode("utf-8")
+        offset = int(query.get("cursor") or 0)
+        limit = int(query["limit"])
+        page = trades[offset:offset + limit]
+        fields = query.get("fields")
+        if fields:
+            keep = fields.split(",")
+            page = [{k: t.get(k) for k in keep} for t in page]
+        next_cursor = str(offset + limit) if offset + limit < len(trades) else None
+        return json.dumps({"trades": page, "next_cursor": next_cursor}).encode("utf-8")
+
+    def _fetch_journals(self, query, body):
+        since = query.get("since")
+        journals = [j for j in self.journals if not since or j["timestamp"] > since]
+        return json.dumps({"journals": journals}).encode("utf-8")
+
+    # --- Orders ---
+    def _precheck_order(self, query, body):
+        price = float((body or {}).get("price") or 100.0)
+        quantity = int((body or {}).get("quantity") or LOT_SIZE)
+        return json.dumps({"status": "success", "data": {"final_margin": round(price * quantity * 1.5, 2)}}).encode("utf-8")
+
+    def _place_multileg(self, query, body):
+        legs = (body or {}).get("legs", [])
+        return json.dumps({"status": "success", "data": {"order_ids": [f"MOCK{i:06d}" for i in range(len(legs))]}}).encode("utf-8")
+
+    def _place_gtt_multileg(self, query, body):
+        legs = (body or {}).get("legs", [])
+        return json.dumps({"status": "success", "data": {"gtt_order_ids": [f"GTT{i:06d}" for i in range(len(legs))]}}).encode("utf-8")
+
+
+class MockServer:
+    """Threaded HTTP server for a ``MockApi``; counts requests per (method, path)."""
+
+    def __init__(self, config: MockConfig = None, host: str = "127.0.0.1", port: int = 0, spec_path: str = SPEC_PATH):
+        self.config = config or MockConfig()
+        self.routes = load_routes(spec_path)
+        self.api = MockApi(self.config)
+        self._hits = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.config.seed)
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-voluguard", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def hits(self) -> dict:
+        with self._lock:
+            return dict(self._hits)
+
+    def total_hits(self) -> int:
+        with self._lock:
+            return sum(self._hits.values())
+
+    def reset_hits(self):
+        with self._lock:
+            self._hits.clear()
+
+    def _count(self, method: str, path: str):
+        with self._lock:
+            self._hits[(method, path)] = self._hits.get((method, path), 0) + 1
+
+    def _delay_and_fail(self, path: str):
+        """Sleeps for the injected latency; returns True when this call should fail."""
+        config = self.config
+        with self._lock:
+            jitter = self._rng.uniform(0, config.jitter) if config.jitter else 0.0
+            roll = self._rng.random()
+        delay = config.endpoint_latency.get(path, config.latency) + jitter
+        if delay > 0:
+            time.sleep(delay)
+        return roll < config.endpoint_errors.get(path, config.error_rate)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, status: int, payload: bytes, head: bool = False, content_type: str = wire_format.JSON):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                if server.config.compress and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                    payload = gzip.compress(payload, compresslevel=5)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                if not head:
+                    self.wfile.write(payload)
+
+            def _handle(self, method: str):
+                parsed = urlparse(self.path)
+                path = parsed.path
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                server._count(method, path)
+                route = server.routes.get(path)
+                if route is None:
+                    return self._reply(404, b'{"detail": "Not Found"}')
+                lookup = "GET" if method == "HEAD" and "HEAD" not in route else method
+                if lookup not in route:
+                    return self._reply(405, b'{"detail": "Method Not Allowed"}')
+                query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+                missing = [name for name in route[lookup] if name not in query]
+                if missing:
+                    detail = [{"loc": ["query", name], "msg": "Field required", "type": "missing"} for name in missing]
+                    return self._reply(422, json.dumps({"detail": detail}).encode("utf-8"))
+                if server._delay_and_fail(path):
+                    return self._reply(500, b'{"detail": "Injected failure"}')
+                try:
+                    body = json.loads(raw) if raw else None
+                except ValueError:
+                    return self._reply(422, b'{"detail": "Invalid JSON body"}')
+                kind = wire_format.JSON
+                if server.config.columnar:
+                    kind = wire_format.negotiate(self.headers.get("Accept"), path)
+                payload = server.api.encode(path, server.api.respond(lookup, path, query, body), kind)
+                self._reply(200, payload, head=method == "HEAD", content_type=kind)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_HEAD(self):
+                self._handle("HEAD")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in VoluGuard API server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--expiries", type=int, default=2)
+    parser.add_argument("--strikes", type=int, default=100)
+    parser.add_argument("--trades", type=int, default=1000)
+    parser.add_argument("--positions", type=int, default=20)
+    parser.add_argument("--journals", type=int, default=100)
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--json-only", action="store_true", help="ignore columnar Accept headers")
+    parser.add_argument("--gzip", action="store_true", help="gzip responses when accepted")
+    args = parser.parse_args()
+    config = MockConfig(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        chain_expiries=args.expiries, chain_strikes=args.strikes, trades=args.trades,
+                        positions=args.positions, journals=args.journals, orders=args.orders, columnar=not args.json_only,
+                        compress=args.gzip)
+    server = MockServer(config, host=args.host, port=args.port)
+    print(f"Serving mock VoluGuard API on {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
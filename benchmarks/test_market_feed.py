@@ -0,0 +1,73 @@
+"""Reconnect and token rotation of the market feed against the stand-in WebSocket server.
+
+Run from the repository root:  python -m pytest -q benchmarks/test_market_feed.py
+"""
+import pytest
+
+import market_feed
+from benchmarks.mock_feed import MockFeedServer
+from market_feed import NIFTY_KEY, FeedManager
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(market_feed, "RECONNECT_MIN_SECONDS", 0.05)
+    server = MockFeedServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def live():
+    return []  # live session tokens, most recent first, as MarketStateService.live_tokens returns them
+
+
+@pytest.fixture
+def feed(server, live):
+    feed = FeedManager(server.authorize, tokens=lambda: list(live))
+    yield feed
+    feed.stop()
+
+
+def test_reconnects_and_resubscribes_after_drop(server, live, feed):
+    live.append("a")
+    feed.start("a", ["NSE_FO|1"])
+    assert server.wait_for(lambda: feed.snapshot("a")["spot"] == 24000.0)
+    server.disconnect()
+    assert server.wait_for(lambda: server.connections == ["a", "a"] and server.open_tokens() == ["a"])
+    server.ltps[NIFTY_KEY] = 24100.0
+    assert server.wait_for(lambda: feed.snapshot("a")["spot"] == 24100.0)
+    assert all("NSE_FO|1" in keys for keys in server.subscriptions[-2:])
+
+
+def test_rotates_to_next_live_token_on_401(server, live, feed):
+    live.extend(["a", "b"])
+    feed.start("b")
+    assert server.wait_for(lambda: server.open_tokens() == ["a"])
+    server.revoke("a")
+    assert server.wait_for(lambda: server.open_tokens() == ["b"])
+    assert feed.market_token == "b"
+    assert feed.live_tokens() == ["b"]
+
+
+def test_rotates_on_logout_and_stops_without_live_tokens(server, live, feed):
+    live.extend(["a", "b"])
+    feed.start("a")
+    assert server.wait_for(lambda: server.open_tokens() == ["a"])
+    live.remove("a")
+    feed.stop_token("a")
+    assert server.wait_for(lambda: server.open_tokens() == ["b"])
+    assert feed.market_token == "b"
+    live.remove("b")
+    feed.stop_token("b")
+    assert server.wait_for(lambda: server.open_tokens() == [])
+    assert feed.market_token is None
+    assert not feed.snapshot("b")["connected"]
+
+
+def test_logout_keeps_token_another_session_uses(server, live, feed):
+    live.append("a")
+    feed.start("a")
+    assert server.wait_for(lambda: server.open_tokens() == ["a"])
+    feed.stop_token("a")  # "a" is still live in another session
+    assert server.open_tokens() == ["a"] and server.connections == ["a"]
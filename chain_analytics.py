@@ -0,0 +1,234 @@
+"""Vectorized option-chain analytics computed client-side.
+
+``chain_frame`` turns the raw ``/fetch/option-chain`` payload (Upstox put/call
+option chain rows) into one columnar DataFrame, and ``analyze_chain`` computes
+implied volatility, Greeks, straddle, PCR, max pain and skew slope for every
+strike and expiry in a single batched NumPy pass. With the chain held locally,
+metrics can be recomputed on each tick without another API round trip.
+"""
+from datetime import datetime, time as dt_time
+
+import numpy as np
+import pandas as pd
+
+from backend_router import IST
+
+RISK_FREE_RATE = 0.065
+EXPIRY_CLOSE = dt_time(15, 30)
+MIN_T = 1.0 / (365 * 24 * 60)  # one minute, avoids division by zero on expiry day
+IV_LOW, IV_HIGH = 1e-4, 5.0
+IV_TOLERANCE = 1e-6
+IV_MAX_ITER = 50
+SKEW_WINDOW = 0.05  # +/- 5% moneyness around spot used for the skew slope
+
+CHAIN_COLUMNS = [
+    "expiry", "strike", "spot",
+    "call_key", "call_ltp", "call_oi", "call_volume", "call_feed_iv",
+    "put_key", "put_ltp", "put_oi", "put_volume", "put_feed_iv",
+]
+
+
+def chain_rows(payload) -> list:
+    """Returns the list of strike rows from a ``/fetch/option-chain`` response."""
+    if isinstance(payload, dict):
+        payload = payload.get("data", payload.get("chain", []))
+    return payload or []
+
+
+def chain_frame(payload) -> pd.DataFrame:
+    """Builds a columnar chain (one row per expiry/strike) from the raw payload."""
+    columns = {name: [] for name in CHAIN_COLUMNS}
+    for row in chain_rows(payload):
+        call = row.get("call_options") or {}
+        put = row.get("put_options") or {}
+        call_md, put_md = call.get("market_data") or {}, put.get("market_data") or {}
+        call_gk, put_gk = call.get("option_greeks") or {}, put.get("option_greeks") or {}
+        columns["expiry"].append(row.get("expiry"))
+        columns["strike"].append(row.get("strike_price"))
+        columns["spot"].append(row.get("underlying_spot_price"))
+        columns["call_key"].append(call.get("instrument_key"))
+        columns["call_ltp"].append(call_md.get("ltp"))
+        columns["call_oi"].append(call_md.get("oi"))
+        columns["call_volume"].append(call_md.get("volume"))
+        columns["call_feed_iv"].append(call_gk.get("iv"))
+        columns["put_key"].append(put.get("instrument_key"))
+        columns["put_ltp"].append(put_md.get("ltp"))
+        columns["put_oi"].append(put_md.get("oi"))
+        columns["put_volume"].append(put_md.get("volume"))
+        columns["put_feed_iv"].append(put_gk.get("iv"))
+    df = pd.DataFrame(columns)
+    numeric = [c for c in CHAIN_COLUMNS if c not in ("expiry", "call_key", "put_key")]
+    df[numeric] = df[numeric].apply(pd.to_numeric, errors="coerce")
+    return df.sort_values(["expiry", "strike"], ignore_index=True)
+
+
+def apply_ltps(df: pd.DataFrame, ltps: dict, spot: float = None) -> pd.DataFrame:
+    """Returns a copy of the chain with streamed LTPs (and spot) applied."""
+    updated = df.copy()
+    for side in ("call", "put"):
+        live = updated[f"{side}_key"].map(ltps)
+        updated[f"{side}_ltp"] = live.fillna(updated[f"{side}_ltp"])
+    if spot is not None:
+        updated["spot"] = spot
+    return updated
+
+
+# --- Black-Scholes kernels (all arrays broadcast elementwise) ---
+def _norm_cdf(x):
+    # Abramowitz & Stegun 7.1.26 erf approximation, |error| < 1.5e-7
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+
+def _norm_pdf(x):
+    return np.exp(-0.5 * x * x) / np.sqrt(2.0 * np.pi)
+
+
+def _d1_d2(spot, strike, t, sigma, rate):
+    sqrt_t = np.sqrt(t)
+    d1 = (np.log(spot / strike) + (rate + 0.5 * sigma * sigma) * t) / (sigma * sqrt_t)
+    return d1, d1 - sigma * sqrt_t
+
+
+def bs_price(spot, strike, t, sigma, is_call, rate=RISK_FREE_RATE):
+    """Black-Scholes price for calls (``is_call`` True) and puts, vectorized."""
+    d1, d2 = _d1_d2(spot, strike, t, sigma, rate)
+    discount = strike * np.exp(-rate * t)
+    call = spot * _norm_cdf(d1) - discount * _norm_cdf(d2)
+    put = discount * _norm_cdf(-d2) - spot * _norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+
+def bs_greeks(spot, strike, t, sigma, is_call, rate=RISK_FREE_RATE) -> dict:
+    """Delta, gamma, theta (per day) and vega (per 1 vol point), vectorized."""
+    d1, d2 = _d1_d2(spot, strike, t, sigma, rate)
+    sqrt_t = np.sqrt(t)
+    pdf = _norm_pdf(d1)
+    discount = strike * np.exp(-rate * t)
+    delta = np.where(is_call, _norm_cdf(d1), _norm_cdf(d1) - 1.0)
+    gamma = pdf / (spot * sigma * sqrt_t)
+    decay = -spot * pdf * sigma / (2.0 * sqrt_t)
+    theta = np.where(is_call, decay - rate * discount * _norm_cdf(d2), decay + rate * discount * _norm_cdf(-d2))
+    vega = spot * pdf * sqrt_t
+    return {"delta": delta, "gamma": gamma, "theta": theta / 365.0, "vega": vega / 100.0}
+
+
+def implied_vol(price, spot, strike, t, is_call, rate=RISK_FREE_RATE):
+    """Solves Black-Scholes IV for every option at once.
+
+    Uses Newton steps safeguarded by a bisection bracket, so options where
+    Newton would overshoot (deep ITM/OTM, tiny vega) still converge. Prices
+    outside the no-arbitrage bounds return NaN.
+    """
+    price, spot, strike, t = (np.asarray(a, dtype=float) for a in (price, spot, strike, t))
+    is_call = np.asarray(is_call, dtype=bool)
+    discount = strike * np.exp(-rate * t)
+    intrinsic = np.where(is_call, np.maximum(spot - discount, 0.0), np.maximum(discount - spot, 0.0))
+    upper = np.where(is_call, spot, discount)
+    valid = np.isfinite(price) & (price > intrinsic) & (price < upper) & (t > 0)
+
+    low = np.full(price.shape, IV_LOW)
+    high = np.full(price.shape, IV_HIGH)
+    sigma = np.full(price.shape, 0.3)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for _ in range(IV_MAX_ITER):
+            diff = bs_price(spot, strike, t, sigma, is_call, rate) - price
+            done = ~valid | (np.abs(diff) < IV_TOLERANCE)
+            if done.all():
+                break
+            high = np.where(diff > 0, sigma, high)
+            low = np.where(diff < 0, sigma, low)
+            d1, _ = _d1_d2(spot, strike, t, sigma, rate)
+            vega = spot * _norm_pdf(d1) * np.sqrt(t)
+            newton = sigma - diff / vega
+            in_bracket = np.isfinite(newton) & (newton > low) & (newton < high)
+            sigma = np.where(done, sigma, np.where(in_bracket, newton, 0.5 * (low + high)))
+    return np.where(valid, sigma, np.nan)
+
+
+def time_to_expiry(expiry, now: datetime = None):
+    """Years to the 15:30 IST close on each expiry date (vectorized over a Series).
+
+    A naive ``now`` is taken as IST wall-clock time, so the result does not depend on the host's time zone.
+    """
+    now = pd.Timestamp(now or datetime.now(IST))
+    now = now.tz_localize(IST) if now.tzinfo is None else now
+    close = pd.to_datetime(pd.Series(expiry)).dt.tz_localize(None).dt.normalize()
+    close = (close + pd.Timedelta(hours=EXPIRY_CLOSE.hour, minutes=EXPIRY_CLOSE.minute)).dt.tz_localize(IST)
+    seconds = (close - now).dt.total_seconds().to_numpy()
+    return np.maximum(seconds / (365.0 * 24 * 3600), MIN_T)
+
+
+def max_pain(strikes, call_oi, put_oi) -> float:
+    """Settlement strike that minimises total option-writer payout."""
+    strikes = np.asarray(strikes, dtype=float)
+    if strikes.size == 0:
+        return float("nan")
+    settle = strikes[:, None]
+    payout = (np.maximum(settle - strikes, 0.0) * np.nan_to_num(call_oi)).sum(axis=1)
+    payout += (np.maximum(strikes - settle, 0.0) * np.nan_to_num(put_oi)).sum(axis=1)
+    return float(strikes[np.argmin(payout)])
+
+
+def skew_slope(strikes, spot, iv) -> float:
+    """Least-squares slope of IV (in %) against moneyness within ``SKEW_WINDOW`` of spot."""
+    moneyness = np.asarray(strikes, dtype=float) / spot - 1.0
+    mask = (np.abs(moneyness) <= SKEW_WINDOW) & np.isfinite(iv)
+    if mask.sum() < 2:
+        return float("nan")
+    slope, _ = np.polyfit(moneyness[mask], np.asarray(iv)[mask], 1)
+    return float(slope)
+
+
+def analyze_chain(df: pd.DataFrame, now: datetime = None, rate: float = RISK_FREE_RATE):
+    """Computes per-strike analytics and per-expiry summary metrics.
+
+    Returns ``(strikes_df, summary_df)``: ``strikes_df`` adds call/put IV (%),
+    Greeks, straddle and IV skew columns; ``summary_df`` has one row per expiry
+    with ATM strike, ATM IV, straddle, PCR, max pain and skew slope.
+    """
+    out = df.copy()
+    n = len(out)
+    t = time_to_expiry(out["expiry"], now)
+    spot = out["spot"].to_numpy(dtype=float)
+    strike = out["strike"].to_numpy(dtype=float)
+
+    # Solve calls and puts in one stacked batch
+    prices = np.concatenate([out["call_ltp"].to_numpy(dtype=float), out["put_ltp"].to_numpy(dtype=float)])
+    is_call = np.concatenate([np.ones(n, dtype=bool), np.zeros(n, dtype=bool)])
+    spot2, strike2, t2 = np.tile(spot, 2), np.tile(strike, 2), np.tile(t, 2)
+    iv = implied_vol(prices, spot2, strike2, t2, is_call, rate)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        greeks = bs_greeks(spot2, strike2, t2, np.where(np.isfinite(iv), iv, np.nan), is_call, rate)
+
+    out["t"] = t
+    out["call_iv"], out["put_iv"] = iv[:n] * 100.0, iv[n:] * 100.0
+    for name, values in greeks.items():
+        out[f"call_{name}"], out[f"put_{name}"] = values[:n], values[n:]
+    out["straddle"] = out["call_ltp"] + out["put_ltp"]
+    out["iv_skew"] = out["put_iv"] - out["call_iv"]
+    out["total_theta"] = out["call_theta"] + out["put_theta"]
+    out["total_vega"] = out["call_vega"] + out["put_vega"]
+    out["total_oi"] = out["call_oi"].fillna(0) + out["put_oi"].fillna(0)
+
+    summaries = []
+    for expiry, group in out.groupby("expiry", sort=True):
+        spot_now = float(group["spot"].iloc[0])
+        atm = group.iloc[int(np.argmin(np.abs(group["strike"].to_numpy() - spot_now)))]
+        avg_iv = group[["call_iv", "put_iv"]].mean(axis=1).to_numpy()
+        call_oi, put_oi = group["call_oi"].sum(), group["put_oi"].sum()
+        summaries.append({
+            "expiry": expiry,
+            "spot": spot_now,
+            "atm_strike": float(atm["strike"]),
+            "atm_iv": float(np.nanmean([atm["call_iv"], atm["put_iv"]])),
+            "straddle": float(atm["straddle"]),
+            "pcr": float(put_oi / call_oi) if call_oi else float("nan"),
+            "max_pain": max_pain(group["strike"], group["call_oi"].to_numpy(), group["put_oi"].to_numpy()),
+            "skew_slope": skew_slope(group["strike"], spot_now, avg_iv),
+            "days_to_expiry": float(group["t"].iloc[0] * 365.0),
+        })
+    return out, pd.DataFrame(summaries)
@@ -0,0 +1,117 @@
+"""Incremental rendering state for the Option Chain tab.
+
+``ChainTable`` keeps the chain keyed by strike across reruns and applies only
+the rows/columns that changed, and ``update_skew_figure`` mutates the existing
+Plotly figure instead of building a new one. Formatting is declared once as
+Streamlit column configs rather than a per-cell Styler.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from views.figures import TEMPLATE
+
+KEY_COLUMN = "Strike"
+
+CHAIN_COLUMN_CONFIG = {
+    "Strike": st.column_config.NumberColumn("Strike", format="₹%.2f"),
+    "Call IV": st.column_config.NumberColumn("Call IV", format="%.2f%%"),
+    "Put IV": st.column_config.NumberColumn("Put IV", format="%.2f%%"),
+    "IV Skew": st.column_config.NumberColumn("IV Skew", format="%.4f"),
+    "Total Theta": st.column_config.NumberColumn("Total Theta", format="%.2f"),
+    "Total Vega": st.column_config.NumberColumn("Total Vega", format="%.2f"),
+    "Straddle Price": st.column_config.NumberColumn("Straddle Price", format="₹%.2f"),
+    "Total OI": st.column_config.NumberColumn("Total OI", format="localized"),
+}
+
+
+class ChainTable:
+    """Option chain kept keyed by strike, updated with row/column deltas."""
+
+    def __init__(self):
+        self.df = None
+        self.version = 0
+        self.last_delta = {"changed_rows": 0, "changed_columns": [], "added": 0, "removed": 0}
+        self._frame = None
+        self._frame_version = -1
+
+    def update(self, rows) -> dict:
+        """Merges a fresh ``/full-chain-table`` payload (row dicts or a columnar frame) and returns what changed."""
+        incoming = pd.DataFrame(rows)
+        if incoming.empty or KEY_COLUMN not in incoming:
+            return self._reset(incoming)
+        incoming = incoming.drop_duplicates(KEY_COLUMN, keep="last").set_index(KEY_COLUMN).sort_index()
+        if self.df is None or self.df.empty or list(self.df.columns) != list(incoming.columns):
+            return self._reset(incoming)
+        delta = self._apply(incoming)
+        if delta["changed_rows"] or delta["added"] or delta["removed"]:
+            self.version += 1
+        self.last_delta = delta
+        return delta
+
+    def _reset(self, incoming: pd.DataFrame) -> dict:
+        """Replaces the whole chain; the delta reports every old row removed and every new row added."""
+        removed = 0 if self.df is None else len(self.df)
+        self.df = incoming
+        self.version += 1
+        self.last_delta = {
+            "changed_rows": len(incoming), "changed_columns": list(incoming.columns), "added": len(incoming),
+            "removed": removed,
+        }
+        return self.last_delta
+
+    def _apply(self, incoming: pd.DataFrame) -> dict:
+        current = self.df
+        added = incoming.index.difference(current.index)
+        removed = current.index.difference(incoming.index)
+        common = incoming.index.intersection(current.index)
+        old, new = current.loc[common], incoming.loc[common]
+        old_values, new_values = old.to_numpy(), new.to_numpy()
+        same = (old_values == new_values) | (pd.isna(old_values) & pd.isna(new_values))
+        changed_cells = ~same
+        row_mask = changed_cells.any(axis=1)
+        col_mask = changed_cells.any(axis=0)
+        changed_columns = list(current.columns[col_mask])
+        if row_mask.any():
+            rows = common[row_mask]
+            current.loc[rows, changed_columns] = incoming.loc[rows, changed_columns]
+        if len(removed):
+            current = current.drop(index=removed)
+        if len(added):
+            current = pd.concat([current, incoming.loc[added]]).sort_index()
+        self.df = current
+        return {
+            "changed_rows": int(row_mask.sum()),
+            "changed_columns": changed_columns,
+            "added": len(added),
+            "removed": len(removed),
+        }
+
+    def frame(self) -> pd.DataFrame:
+        """Returns the chain with the strike restored as a column, rebuilt only after a change."""
+        if self.df is None:
+            return pd.DataFrame()
+        if self._frame_version != self.version:
+            self._frame = self.df.reset_index() if self.df.index.name == KEY_COLUMN else self.df
+            self._frame_version = self.version
+        return self._frame
+
+
+def update_skew_figure(fig, table: ChainTable):
+    """Updates the IV skew figure's trace in place, creating it on first use."""
+    df = table.df
+    x = df.index.to_numpy() if df is not None and not df.empty else np.array([])
+    y = df["IV Skew"].to_numpy() if df is not None and "IV Skew" in df else np.array([])
+    if fig is None:
+        fig = go.Figure(go.Scatter(x=x, y=y, mode="lines", name="IV Skew", line=dict(color="#00FF00")))
+        fig.update_layout(
+            title="IV Skew Across Strikes",
+            xaxis_title="Strike",
+            yaxis_title="IV Skew",
+            template=TEMPLATE,
+            height=400,
+        )
+    else:
+        fig.data[0].update(x=x, y=y)
+    return fig
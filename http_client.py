@@ -0,0 +1,201 @@
+"""Shared, pooled HTTP client for the VoluGuard backend.
+
+One ``ApiClient`` is kept per process (see ``get_api_client`` in app.py) so every
+Streamlit session and rerun reuses the same keep-alive connections instead of
+paying a fresh TCP+TLS handshake per endpoint call.
+
+GETs are retried on connection errors, read timeouts and gateway 5xx. A caller
+that stretches the read timeout (a cold backend booting) passes
+``read_retries=False``: the request then goes over the same pools, but a read
+timeout is final, so the wait is one timeout and not ``RETRY_TOTAL + 1`` of them.
+"""
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+# --- Defaults ---
+DEFAULT_TIMEOUT = 10
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 16
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = (502, 503, 504)
+
+# Per-endpoint read timeouts (seconds). Anything not listed uses DEFAULT_TIMEOUT.
+ENDPOINT_TIMEOUTS = {
+    "/expiries": 5,
+    "/live/dashboard": 15,
+    "/predict/volatility": 20,
+    "/option-seller-dashboard": 20,
+    "/full-chain-table": 20,
+    "/fetch/option-chain": 20,
+    "/suggest/strategy": 15,
+    "/place/multileg": 20,
+}
+CONNECT_TIMEOUT = 5
+
+
+class ConnectionStats:
+    """Thread-safe counters describing how the connection pool is being used."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.handshake_seconds = 0.0
+
+    def record_checkout(self, reused: bool):
+        with self._lock:
+            if reused:
+                self.reused_connections += 1
+            else:
+                self.new_connections += 1
+
+    def record_handshake(self, seconds: float):
+        with self._lock:
+            self.handshake_seconds += seconds
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            checkouts = self.new_connections + self.reused_connections
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": self.reused_connections,
+                "reuse_ratio": self.reused_connections / checkouts if checkouts else 0.0,
+                "handshake_seconds_total": self.handshake_seconds,
+                "handshake_seconds_avg": self.handshake_seconds / self.new_connections if self.new_connections else 0.0,
+            }
+
+
+def _counting_pool(base_cls):
+    """Builds a connection pool class that reports checkouts and handshake time."""
+
+    class CountingPool(base_cls):
+        stats = None
+
+        def _get_conn(self, timeout=None):
+            conn = super()._get_conn(timeout=timeout)
+            reused = getattr(conn, "sock", None) is not None
+            if self.stats is not None:
+                self.stats.record_checkout(reused)
+                if not reused:
+                    self._time_connect(conn)
+            return conn
+
+        def _time_connect(self, conn):
+            connect = conn.connect
+            stats = self.stats
+
+            def timed_connect():
+                start = time.perf_counter()
+                try:
+                    connect()
+                finally:
+                    stats.record_handshake(time.perf_counter() - start)
+
+            conn.connect = timed_connect
+
+    CountingPool.__name__ = f"Counting{base_cls.__name__}"
+    return CountingPool
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools feed a shared ``ConnectionStats``."""
+
+    def __init__(self, stats: ConnectionStats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        pool_classes = {}
+        for scheme, base_cls in (("http", HTTPConnectionPool), ("https", HTTPSConnectionPool)):
+            pool_cls = _counting_pool(base_cls)
+            pool_cls.stats = self.stats
+            pool_classes[scheme] = pool_cls
+        self.poolmanager.pool_classes_by_scheme = pool_classes
+
+
+class ApiClient:
+    """Keep-alive session with pooling, gzip, per-endpoint timeouts and GET retries."""
+
+    def __init__(self, base_url: str, pool_connections: int = POOL_CONNECTIONS,
+                 pool_maxsize: int = POOL_MAXSIZE, retries: int = RETRY_TOTAL,
+                 backoff_factor: float = RETRY_BACKOFF, timeouts: dict = None, stats: ConnectionStats = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeouts = dict(ENDPOINT_TIMEOUTS, **(timeouts or {}))
+        self.stats = stats or ConnectionStats()
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            raise_on_status=False,
+        )
+        adapter = CountingHTTPAdapter(
+            self.stats,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+        )
+        # shares the pools; only the retry policy differs
+        final_read = CountingHTTPAdapter(self.stats, max_retries=retry.new(read=False))
+        final_read.poolmanager = adapter.poolmanager
+        self.session = self._session(adapter)
+        self._final_read_session = self._session(final_read)
+
+    @staticmethod
+    def _session(adapter: HTTPAdapter) -> requests.Session:
+        session = requests.Session()
+        session.headers.update({
+            "Accept": "application/json",
+            # gzip/deflate, plus zstd/br when their decoders are installed
+            "Accept-Encoding": ACCEPT_ENCODING,
+            "Connection": "keep-alive",
+        })
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def timeout_for(self, endpoint: str):
+        """Returns the (connect, read) timeout tuple for an endpoint."""
+        return CONNECT_TIMEOUT, self.timeouts.get(endpoint, DEFAULT_TIMEOUT)
+
+    def request(self, method: str, endpoint: str, params: dict = None, json_data: dict = None,
+                timeout=None, headers: dict = None, read_retries: bool = True) -> requests.Response:
+        """Sends a request over the pooled session. Raises requests exceptions unchanged.
+
+        With ``read_retries=False`` a read timeout is not retried (see the module docstring).
+        """
+        self.stats.record_request()
+        session = self.session if read_retries else self._final_read_session
+        return session.request(
+            method,
+            f"{self.base_url}{endpoint}",
+            params=params,
+            json=json_data,
+            headers=headers,
+            timeout=timeout or self.timeout_for(endpoint),
+        )
+
+    def get(self, endpoint: str, params: dict = None, timeout=None, headers: dict = None) -> requests.Response:
+        return self.request("GET", endpoint, params=params, timeout=timeout, headers=headers)
+
+    def post(self, endpoint: str, params: dict = None, json_data: dict = None, timeout=None,
+             headers: dict = None) -> requests.Response:
+        return self.request("POST", endpoint, params=params, json_data=json_data, timeout=timeout, headers=headers)
+
+    def close(self):
+        self.session.close()
+        self._final_read_session.close()
@@ -0,0 +1,305 @@
+"""In-memory inverted index over the local journal mirror: full text, tags and facets.
+
+Each journal entry gets a document id. The index keeps:
+
+* posting lists (token -> doc ids) over title and content,
+* a normalized tag index,
+* per-document mood, month and day codes.
+
+Posting lists are packed into one array ordered by token, with offsets into it
+(CSR). A query word then matches as a prefix ("vol iron" finds "volatility ...
+iron fly"), and however many tokens share the prefix, that is one contiguous
+slice. Entries indexed after the pack go into a small delta segment, which is
+merged into the CSR once it exceeds ``DELTA_MERGE_DOCS``. A search ANDs boolean masks built from those, so
+matching, facet counts and paging are a few numpy passes over 100k entries,
+not SQL scans. Results are newest first.
+
+The index follows ``LocalStore.journal_changes``. A refresh re-indexes only the
+entries written since the last one. Replaced or deleted entries are
+tombstoned, and the index is rebuilt once tombstones outnumber live entries.
+Facets are drill-sideways: the mood counts ignore the mood filter, and likewise
+for tags and dates, so the filter menus always show what selecting another
+value would give.
+"""
+import bisect
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"\w+")
+MAX_TAG_FACETS = 50
+MAX_CACHED_SEARCHES = 32
+MIN_REBUILD_TOMBSTONES = 1000
+DELTA_MERGE_DOCS = 1000
+
+
+def search_terms(text: str) -> tuple:
+    return tuple(dict.fromkeys(TOKEN_RE.findall((text or "").lower())))
+
+
+class JournalResults:
+    """One search: matching doc ids (newest first) and facet counts."""
+
+    __slots__ = ("ids", "facets", "keys_for")
+
+    def __init__(self, ids: np.ndarray, facets: dict, keys_for):
+        self.ids = ids
+        self.facets = facets
+        self.keys_for = keys_for
+
+    @property
+    def total(self) -> int:
+        return int(self.ids.size)
+
+    def keys(self, offset: int = 0, limit: int = None) -> list:
+        """Store keys of the matches in ``[offset, offset + limit)``."""
+        return self.keys_for(self.ids[offset:None if limit is None else offset + limit])
+
+
+class _Codes:
+    """Interns values to small integer codes."""
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def code(self, value) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def get(self, value):
+        return self._codes.get(value)
+
+
+class JournalIndex:
+    """Process-wide search index over ``LocalStore`` journals; call ``refresh`` before searching."""
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self.builds = 0
+        self._reset()
+
+    def _reset(self):
+        self.version = -1
+        self._keys = []  # doc id -> store key
+        self._docs = {}  # store key -> live doc id
+        self._stamps = []  # doc id -> timestamp string, for ordering
+        self._days = array("i")  # doc id -> date ordinal (0 when unknown)
+        self._alive = bytearray()
+        self._tombstones = 0
+        self._moods, self._mood_codes = _Codes(), array("h")
+        self._months, self._month_codes = _Codes(), array("h")
+        self._tags, self._pair_docs, self._pair_tags = _Codes(), array("i"), array("i")
+        self._postings = {}  # token -> array of doc ids
+        self._delta = {}  # token -> doc ids indexed since the CSR was packed
+        self._frozen = None  # numpy copies of the arrays above, updated on refresh
+        self._searches = OrderedDict()
+
+    # --- Maintenance ---
+    def refresh(self) -> int:
+        """Applies journal writes since the last refresh; returns the number of entries (re)indexed."""
+        with self._lock:
+            changes = self.store.journal_changes(self.version) if self.version >= 0 else None
+            if changes is None:
+                self._reset()
+                self.version = self.store.journal_version
+                indexed = sum(self._add_rows(rows) for rows in self.store.journal_rows())
+                self.builds += 1
+                self._pack()
+                return indexed
+            version, removed, written = changes
+            if version == self.version:
+                return 0
+            for key in removed | written:
+                self._remove(key)
+            indexed = sum(self._add_rows(rows) for rows in self.store.journal_rows(written))
+            self.version = version
+            self._searches.clear()
+            if self._tombstones > max(MIN_REBUILD_TOMBSTONES, len(self._docs)):
+                self.version = -1
+            elif len(self._keys) - self._frozen["packed"] > DELTA_MERGE_DOCS:
+                self._pack()
+            else:
+                self._extend()
+        if self.version < 0:
+            return self.refresh()
+        return indexed
+
+    def _add_rows(self, rows: list) -> int:
+        for key, timestamp, title, content, mood, tags, _ in rows:
+            doc = len(self._keys)
+            self._keys.append(key)
+            self._docs[key] = doc
+            stamp = timestamp or ""
+            self._stamps.append(stamp)
+            try:
+                self._days.append(date.fromisoformat(stamp[:10]).toordinal())
+            except ValueError:
+                self._days.append(0)
+            self._alive.append(1)
+            self._mood_codes.append(self._moods.code(mood))
+            self._month_codes.append(self._months.code(stamp[:7]))
+            for tag in (tags or "").split(", "):
+                if tag:
+                    code = self._tags.code(tag)
+                    self._pair_docs.append(doc)
+                    self._pair_tags.append(code)
+            for token in set(TOKEN_RE.findall(f"{title or ''} {content or ''}".lower())):
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = array("i")
+                postings.append(doc)
+                if self._frozen is not None:
+                    self._delta.setdefault(token, []).append(doc)
+        return len(rows)
+
+    def _remove(self, key: str):
+        doc = self._docs.pop(key, None)
+        if doc is not None:
+            self._alive[doc] = 0
+            self._tombstones += 1
+
+    def _columns(self) -> dict:
+        # frombuffer(...).copy() rather than np.array(): one memcpy instead of a per-item loop
+        return {
+            "alive": np.frombuffer(bytes(self._alive), dtype=np.bool_),
+            "days": np.frombuffer(self._days, dtype=np.int32).copy(),
+            "mood": np.frombuffer(self._mood_codes, dtype=np.int16).copy(),
+            "month": np.frombuffer(self._month_codes, dtype=np.int16).copy(),
+            "pair_docs": np.frombuffer(self._pair_docs, dtype=np.int32).copy(),
+            "pair_tags": np.frombuffer(self._pair_tags, dtype=np.int32).copy(),
+        }
+
+    def _pack(self):
+        """Rebuilds every frozen array, merging the delta into the CSR."""
+        stamps = np.array(self._stamps, dtype=object)
+        order = np.argsort(stamps, kind="stable").astype(np.int32)
+        vocab = sorted(self._postings)
+        lengths = np.fromiter((len(self._postings[token]) for token in vocab), dtype=np.int64, count=len(vocab))
+        self._delta = {}
+        self._frozen = dict(
+            self._columns(),
+            packed=len(self._keys),
+            sorted_stamps=stamps[order],
+            order=order,  # oldest first; searches read it reversed
+            vocab=vocab,
+            offsets=np.concatenate([[0], np.cumsum(lengths)]),
+            postings=np.frombuffer(b"".join(self._postings[token] for token in vocab), dtype=np.int32),
+            delta_vocab=[],
+        )
+
+    def _extend(self):
+        """Adds the entries indexed since the last freeze without repacking the CSR."""
+        frozen = self._frozen
+        first = frozen["order"].size
+        stamps = np.array(self._stamps[first:], dtype=object)
+        new = np.argsort(stamps, kind="stable")
+        at = np.searchsorted(frozen["sorted_stamps"], stamps[new], side="right")
+        frozen.update(
+            self._columns(),
+            sorted_stamps=np.insert(frozen["sorted_stamps"], at, stamps[new]),
+            order=np.insert(frozen["order"], at, (new + first).astype(np.int32)),
+            delta_vocab=sorted(self._delta),
+        )
+
+    # --- Queries ---
+    def _text_mask(self, arrays: dict, terms: tuple, size: int):
+        if not terms:
+            return None
+        vocab, offsets, postings = arrays["vocab"], arrays["offsets"], arrays["postings"]
+        delta_vocab = arrays["delta_vocab"]
+        mask = np.ones(size, dtype=np.bool_)
+        for term in terms:
+            lo = bisect.bisect_left(vocab, term)
+            hi = bisect.bisect_left(vocab, term + "\uffff", lo)  # every token starting with ``term``
+            term_mask = np.zeros(size, dtype=np.bool_)
+            term_mask[postings[offsets[lo]:offsets[hi]]] = True
+            lo = bisect.bisect_left(delta_vocab, term)
+            for token in delta_vocab[lo:bisect.bisect_left(delta_vocab, term + "\uffff", lo)]:
+                term_mask[self._delta[token]] = True
+            mask &= term_mask
+        return mask
+
+    def search(self, text: str = None, mood: str = None, tag: str = None, start: date = None,
+               end: date = None) -> JournalResults:
+        """Entries matching every query word (as prefixes), the mood, the tag and the date range (inclusive)."""
+        terms = search_terms(text)
+        tag = tag.strip().lower() if tag else None
+        cache_key = (terms, mood, tag, start, end)
+        with self._lock:
+            cached = self._searches.get(cache_key)
+            if cached is not None:
+                self._searches.move_to_end(cache_key)
+                return cached
+            if self._frozen is None:
+                self._pack()
+            arrays = self._frozen
+            size = arrays["alive"].size
+            base = arrays["alive"].copy()
+            text_mask = self._text_mask(arrays, terms, size)
+            if text_mask is not None:
+                base &= text_mask
+            masks = {}
+            if mood is not None:
+                code = self._moods.get(mood)
+                masks["mood"] = arrays["mood"] == code if code is not None else np.zeros(size, dtype=np.bool_)
+            if tag is not None:
+                masks["tag"] = np.zeros(size, dtype=np.bool_)
+                code = self._tags.get(tag)
+                if code is not None:
+                    masks["tag"][arrays["pair_docs"][arrays["pair_tags"] == code]] = True
+            if start is not None or end is not None:
+                days = arrays["days"]
+                masks["date"] = (days >= (start.toordinal() if start else 1)) & (days <= (end.toordinal() if end else days.max(initial=0)))
+
+            def without(dimension):
+                mask = base.copy()
+                for name, other in masks.items():
+                    if name != dimension:
+                        mask &= other
+                return mask
+
+            matched = without(None)
+            pairs = without("tag")[arrays["pair_docs"]]
+            tag_counts = np.bincount(arrays["pair_tags"][pairs], minlength=len(self._tags.values))
+            top = np.argsort(-tag_counts, kind="stable")[:MAX_TAG_FACETS]
+            facets = {
+                "total": int(matched.sum()),
+                "mood": self._counts(self._moods.values, arrays["mood"][without("mood")]),
+                "month": dict(sorted(self._counts(self._months.values, arrays["month"][without("date")]).items(), reverse=True)),
+                "tags": {self._tags.values[i]: int(tag_counts[i]) for i in top if tag_counts[i]},
+            }
+            order = arrays["order"][::-1]
+            results = JournalResults(order[matched[order]], facets, self._keys_for)
+            self._searches[cache_key] = results
+            while len(self._searches) > MAX_CACHED_SEARCHES:
+                self._searches.popitem(last=False)
+        return results
+
+    def clear_searches(self):
+        """Drops memoized searches, so the next ones are computed cold."""
+        with self._lock:
+            self._searches.clear()
+
+    @staticmethod
+    def _counts(values: list, codes: np.ndarray) -> dict:
+        counts = np.bincount(codes, minlength=len(values))
+        present = np.flatnonzero(counts)
+        present = present[np.argsort(-counts[present], kind="stable")]
+        return dict(zip([values[i] for i in present], counts[present].tolist()))
+
+    def _keys_for(self, ids: np.ndarray) -> list:
+        return [self._keys[i] for i in ids]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._docs), "tokens": len(self._postings), "tags": len(self._tags.values),
+                    "tombstones": self._tombstones, "version": self.version, "builds": self.builds}
@@ -0,0 +1,120 @@
+"""Bulk import and export of journal entries as JSON Lines, JSON or CSV.
+
+Imports are validated locally, then sent to ``/log/journal``
+``IMPORT_BATCH_SIZE`` requests at a time. Accepted entries are shown
+immediately as pending local copies, and the next sync replaces them. The
+backend stamps entries on receipt, so once synced an imported entry carries the
+import time, not its original timestamp. Exports read the store in
+``EXPORT_BATCH_SIZE`` pages, in the order of the current search.
+"""
+import csv
+import io
+import json
+
+JOURNAL_ENDPOINT = "/log/journal"
+EXPORT_FIELDS = ["id", "timestamp", "title", "content", "mood", "tags"]
+EXPORT_FORMATS = {"jsonl": "application/x-ndjson", "csv": "text/csv"}
+IMPORT_TYPES = ["jsonl", "json", "csv"]
+IMPORT_BATCH_SIZE = 20
+EXPORT_BATCH_SIZE = 1000
+DEFAULT_MOOD = "Neutral"
+
+
+def _entry(row: dict):
+    """Normalizes one imported row; returns ``(entry, error)``."""
+    if not isinstance(row, dict):
+        return None, "not an object"
+    title, content = str(row.get("title") or "").strip(), str(row.get("content") or "").strip()
+    if not title or not content:
+        return None, "title and content are required"
+    tags = row.get("tags") or ""
+    if isinstance(tags, (list, tuple)):
+        tags = ", ".join(str(tag) for tag in tags)
+    entry = {"title": title, "content": content, "mood": str(row.get("mood") or DEFAULT_MOOD), "tags": str(tags)}
+    if row.get("timestamp"):
+        entry["timestamp"] = str(row["timestamp"])
+    return entry, None
+
+
+def parse_journals(name: str, data: bytes):
+    """Parses an uploaded file into journal entries; returns ``(entries, errors)``.
+
+    The format follows the extension: ``.csv`` (header row), ``.json`` (a list,
+    or ``{"journals": [...]}`` as ``/fetch/journals`` returns it) or JSON Lines.
+    Invalid rows are reported by line and skipped.
+    """
+    text = data.decode("utf-8-sig")
+    extension = name.lower().rsplit(".", 1)[-1]
+    errors = []
+    if extension == "csv":
+        rows = list(enumerate(csv.DictReader(io.StringIO(text)), start=2))
+    elif extension == "json":
+        try:
+            payload = json.loads(text)
+        except ValueError as e:
+            return [], [f"invalid JSON: {e}"]
+        rows = list(enumerate(payload.get("journals", []) if isinstance(payload, dict) else payload, start=1))
+    else:
+        rows = []
+        for line, raw in enumerate(text.splitlines(), start=1):
+            if raw.strip():
+                try:
+                    rows.append((line, json.loads(raw)))
+                except ValueError as e:
+                    errors.append(f"line {line}: invalid JSON ({e})")
+    entries = []
+    for line, row in rows:
+        entry, error = _entry(row)
+        if error:
+            errors.append(f"line {line}: {error}")
+        else:
+            entries.append(entry)
+    return entries, errors
+
+
+def journal_request(entry: dict) -> dict:
+    """Builds a ``/log/journal`` JournalRequest."""
+    return {"title": entry["title"], "content": entry["content"], "mood": entry["mood"], "tags": entry.get("tags") or ""}
+
+
+def post_journals(send_many, entries: list, batch_size: int = IMPORT_BATCH_SIZE, progress=None) -> dict:
+    """Sends ``entries`` to ``/log/journal`` in concurrent batches.
+
+    ``progress(done, total)`` is called after each batch. Stops after a batch in
+    which every request failed (backend down). Returns
+    ``{"posted": n, "accepted": [...], "errors": [...]}``.
+    """
+    accepted, errors = [], []
+    for i in range(0, len(entries), batch_size):
+        batch = entries[i:i + batch_size]
+        results = send_many([
+            {"endpoint": JOURNAL_ENDPOINT, "method": "POST", "json_data": journal_request(entry)} for entry in batch
+        ])
+        failed = 0
+        for entry, (_, error) in zip(batch, results):
+            if error:
+                failed += 1
+                errors.append(f"{entry['title']}: {error}")
+            else:
+                accepted.append(entry)
+        if progress is not None:
+            progress(i + len(batch), len(entries))
+        if failed == len(batch):
+            errors.append(f"stopped after a failed batch; {len(entries) - i - len(batch)} entries not sent")
+            break
+    return {"posted": len(accepted), "accepted": accepted, "errors": errors}
+
+
+def export_journals(batches, fmt: str = "jsonl") -> bytes:
+    """Serializes batches of stored entries (lists of dicts) as JSON Lines or CSV."""
+    out = io.StringIO()
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+    for batch in batches:
+        if writer is not None:
+            writer.writerows(batch)
+        else:
+            out.writelines(json.dumps({k: entry.get(k) for k in EXPORT_FIELDS}, default=str) + "\n" for entry in batch)
+    return out.getvalue().encode("utf-8")
@@ -0,0 +1,316 @@
+"""Embedded SQLite mirror of the backend's trade and journal logs.
+
+Rows from ``/fetch/trades`` and ``/fetch/journals`` are upserted here and the
+Trade Log and Journal tabs read from indexed local tables, so they load without
+a round trip and keep working while the backend is cold-starting. Sync progress
+is tracked as per-stream watermarks; journal entries written from the UI are
+inserted optimistically and replaced once the backend copy arrives. Small
+app settings (alert rules) are kept here too, as JSON values.
+
+Journal writes are batched into one transaction and recorded in a bounded
+in-memory change log, which ``journal_index.JournalIndex`` follows to keep
+its search index current without rereading the table.
+"""
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from collections import deque
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser("~"), ".voluguard", "voluguard.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    key TEXT PRIMARY KEY,
+    timestamp_entry TEXT,
+    timestamp_exit TEXT,
+    strategy TEXT,
+    status TEXT,
+    instrument_token TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trades_status ON trades(status);
+CREATE INDEX IF NOT EXISTS idx_trades_strategy ON trades(strategy);
+CREATE INDEX IF NOT EXISTS idx_trades_entry ON trades(timestamp_entry);
+
+CREATE TABLE IF NOT EXISTS journals (
+    key TEXT PRIMARY KEY,
+    timestamp TEXT,
+    title TEXT,
+    content TEXT,
+    mood TEXT,
+    tags TEXT,
+    pending INTEGER NOT NULL DEFAULT 0,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_journals_mood ON journals(mood);
+CREATE INDEX IF NOT EXISTS idx_journals_timestamp ON journals(timestamp);
+-- optimistic copies are matched by title when the backend copy arrives
+CREATE INDEX IF NOT EXISTS idx_journals_pending ON journals(title) WHERE pending = 1;
+
+CREATE TABLE IF NOT EXISTS journal_tags (
+    journal_key TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (journal_key, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_journal_tags_tag ON journal_tags(tag);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    stream TEXT PRIMARY KEY,
+    watermark TEXT,
+    synced_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS settings (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+JOURNAL_COLUMNS = ["key", "timestamp", "title", "content", "mood", "tags", "pending"]
+MAX_JOURNAL_CHANGES = 256  # write batches kept in the change log
+
+
+def normalize_tags(tags) -> list:
+    """Splits a comma-separated tag string into unique, lower-cased tags."""
+    if not tags:
+        return []
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    seen = []
+    for tag in tags:
+        tag = str(tag).strip().lower()
+        if tag and tag not in seen:
+            seen.append(tag)
+    return seen
+
+
+def journal_key(entry: dict) -> str:
+    if entry.get("id") is not None:
+        return f"id:{entry['id']}"
+    return f"{entry.get('timestamp')}|{entry.get('title')}"
+
+
+class LocalStore:
+    """Thread-safe SQLite store shared by every session in the process."""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+        self.journal_version = 0
+        self._journal_changes = deque(maxlen=MAX_JOURNAL_CHANGES)  # (version, removed keys, written keys)
+
+    # --- Sync state ---
+    def watermark(self, stream: str):
+        with self._lock:
+            row = self._conn.execute("SELECT watermark FROM sync_state WHERE stream = ?", (stream,)).fetchone()
+        return row["watermark"] if row else None
+
+    def set_watermark(self, stream: str, watermark):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO sync_state (stream, watermark, synced_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(stream) DO UPDATE SET watermark = excluded.watermark, synced_at = excluded.synced_at",
+                (stream, watermark, datetime.now().isoformat()),
+            )
+
+    # --- Settings ---
+    def setting(self, name: str, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM settings WHERE name = ?", (name,)).fetchone()
+        return json.loads(row["value"]) if row else default
+
+    def set_setting(self, name: str, value):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO settings (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+                (name, json.dumps(value, default=str)),
+            )
+
+    # --- Trades ---
+    def upsert_trades(self, keyed_trades: list):
+        """Upserts ``(key, trade)`` pairs in a single transaction."""
+        rows = [
+            (
+                json.dumps(key, default=str), trade.get("timestamp_entry"), trade.get("timestamp_exit"),
+                trade.get("strategy"), trade.get("status"), trade.get("instrument_token"),
+                json.dumps(trade, default=str),
+            )
+            for key, trade in keyed_trades
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO trades (key, timestamp_entry, timestamp_exit, strategy, status, instrument_token, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def query_trades(self, status: str = None, strategy: str = None, start_date=None, end_date=None) -> pd.DataFrame:
+        """Returns matching trades, newest entry first, using the indexed columns."""
+        clauses, args = [], []
+        if status:
+            clauses.append("status = ?")
+            args.append(status)
+        if strategy:
+            clauses.append("strategy = ?")
+            args.append(strategy)
+        if start_date:
+            clauses.append("timestamp_entry >= ?")
+            args.append(str(start_date))
+        if end_date:
+            # entry timestamps are ISO strings, so anything before the next day's date is on or before end_date
+            clauses.append("timestamp_entry < ?")
+            args.append((date.fromisoformat(str(end_date)[:10]) + timedelta(days=1)).isoformat())
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT payload FROM trades {where} ORDER BY timestamp_entry DESC", args
+            ).fetchall()
+        return pd.DataFrame([json.loads(row["payload"]) for row in rows])
+
+    # --- Journals ---
+    def upsert_journals(self, entries: list):
+        """Upserts backend journal entries in one transaction and drops optimistic copies they confirm."""
+        with self._lock, self._conn:
+            confirmed = []
+            if self._conn.execute("SELECT 1 FROM journals WHERE pending = 1 LIMIT 1").fetchone():
+                for entry in entries:
+                    confirmed += [row["key"] for row in self._conn.execute(
+                        "SELECT key FROM journals WHERE pending = 1 AND title IS ? AND content IS ?",
+                        (entry.get("title"), entry.get("content")),
+                    )]
+                self._delete_journals(confirmed)
+            self._write_journals([(journal_key(entry), entry) for entry in entries], pending=False, removed=confirmed)
+
+    def add_pending_journal(self, entry: dict) -> str:
+        """Optimistically inserts a journal entry the backend has accepted but not yet returned."""
+        return self.add_pending_journals([entry])[0]
+
+    def add_pending_journals(self, entries: list) -> list:
+        """Batch form of ``add_pending_journal``; entries keep their own timestamp when they have one."""
+        now = datetime.now().isoformat()
+        rows = [(f"pending:{uuid.uuid4()}", dict(entry, timestamp=entry.get("timestamp") or now)) for entry in entries]
+        with self._lock, self._conn:
+            self._write_journals(rows, pending=True)
+        return [key for key, _ in rows]
+
+    def _delete_journals(self, keys: list):
+        keys = [(key,) for key in keys]
+        self._conn.executemany("DELETE FROM journal_tags WHERE journal_key = ?", keys)
+        self._conn.executemany("DELETE FROM journals WHERE key = ?", keys)
+
+    def _write_journals(self, rows: list, pending: bool, removed: list = ()):
+        rows = dict(rows)  # the last copy of a repeated key wins
+        tagged = [(key, entry, normalize_tags(entry.get("tags"))) for key, entry in rows.items()]
+        self._conn.executemany("DELETE FROM journal_tags WHERE journal_key = ?", [(key,) for key in rows])
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO journals (key, timestamp, title, content, mood, tags, pending, payload) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(key, entry.get("timestamp"), entry.get("title"), entry.get("content"), entry.get("mood"),
+              ", ".join(tags), int(pending), json.dumps(entry, default=str)) for key, entry, tags in tagged],
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO journal_tags (journal_key, tag) VALUES (?, ?)",
+            [(key, tag) for key, _, tags in tagged for tag in tags],
+        )
+        self.journal_version += 1
+        self._journal_changes.append((self.journal_version, frozenset(removed), frozenset(rows)))
+
+    def journal_changes(self, since: int):
+        """``(version, removed keys, written keys)`` for journal writes after version ``since``.
+
+        Returns None when the change log no longer reaches back that far; the
+        caller should then reload everything.
+        """
+        with self._lock:
+            changes = [change for change in self._journal_changes if change[0] > since]
+            if self.journal_version > since and (not changes or changes[0][0] != since + 1):
+                return None
+            removed, written = set(), set()
+            for _, gone, keys in changes:
+                written -= gone
+                removed |= gone
+                written |= keys
+            return self.journal_version, removed, written
+
+    def journal_rows(self, keys=None, batch_size: int = 5000):
+        """Yields ``(key, timestamp, title, content, mood, tags, pending)`` rows in batches.
+
+        Every entry when ``keys`` is None; otherwise only those keys (missing ones are skipped).
+        """
+        columns = "key, timestamp, title, content, mood, tags, pending"
+        if keys is None:
+            after = ""
+            while True:
+                with self._lock:
+                    rows = self._conn.execute(
+                        f"SELECT {columns} FROM journals WHERE key > ? ORDER BY key LIMIT ?", (after, batch_size)
+                    ).fetchall()
+                if not rows:
+                    return
+                yield [tuple(row) for row in rows]
+                after = rows[-1]["key"]
+        keys = list(keys)
+        for i in range(0, len(keys), batch_size):
+            batch = keys[i:i + batch_size]
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {columns} FROM journals WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+            yield [tuple(row) for row in rows]
+
+    def journals_by_key(self, keys: list) -> pd.DataFrame:
+        """Journal entries for ``keys``, in that order (for rendering one page of search results)."""
+        rows = {row[0]: row for batch in self.journal_rows(keys) for row in batch}
+        return pd.DataFrame([rows[key] for key in keys if key in rows], columns=JOURNAL_COLUMNS)
+
+    def journal_payloads(self, keys: list) -> list:
+        """The stored entries for ``keys``, in that order, as received from the backend or the UI."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, payload FROM journals WHERE key IN ({','.join('?' * len(keys))})", list(keys)
+            ).fetchall()
+        payloads = {row["key"]: json.loads(row["payload"]) for row in rows}
+        return [payloads[key] for key in keys if key in payloads]
+
+    def query_journals(self, mood: str = None, tag: str = None, limit: int = None, offset: int = 0) -> pd.DataFrame:
+        """Returns journal entries (newest first) filtered by mood and/or tag."""
+        clauses, args = [], []
+        if mood:
+            clauses.append("j.mood = ?")
+            args.append(mood)
+        if tag:
+            clauses.append("j.key IN (SELECT journal_key FROM journal_tags WHERE tag = ?)")
+            args.append(tag.strip().lower())
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        page = ""
+        if limit is not None:
+            page = " LIMIT ? OFFSET ?"
+            args.extend([limit, offset])
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT j.key, j.timestamp, j.title, j.content, j.mood, j.tags, j.pending FROM journals j "
+                f"{where} ORDER BY j.timestamp DESC{page}", args
+            ).fetchall()
+        return pd.DataFrame([dict(row) for row in rows], columns=JOURNAL_COLUMNS)
+
+    def journal_tags(self) -> list:
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT tag FROM journal_tags ORDER BY tag").fetchall()
+        return [row["tag"] for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
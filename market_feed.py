@@ -0,0 +1,343 @@
+"""Background streaming of Upstox market and portfolio feeds.
+
+The backend's ``/authorize-market-feed`` and ``/authorize-portfolio-feed``
+endpoints hand out authorized WebSocket URLs. ``FeedManager`` keeps one market
+feed connection per process plus one portfolio feed per token, decodes every
+frame into a ``FeedState`` latest-value store, and lets the UI read snapshots
+at its own frame rate instead of rerunning the whole script.
+
+The market feed belongs to no session: every (re)connect authorizes it with
+the most recently seen live session token, skipping tokens the backend has
+rejected with 401/403. When the token in use logs out, the connection rotates
+to another live token, or stops when none is left.
+
+Market frames are protobuf when they come from Upstox; they are decoded with the
+``upstox-python-sdk`` generated module when it is installed. JSON frames with
+the same shape (what ``MessageToDict`` would produce) are always accepted, which
+is what a local stand-in server sends.
+"""
+import json
+import threading
+import time
+import uuid
+
+import websocket
+
+from market_state import AUTH_STATUSES
+
+try:
+    from google.protobuf import json_format
+    from upstox_client.feeder.proto import MarketDataFeedV3_pb2
+except ImportError:  # optional: only needed for real Upstox binary frames
+    json_format = None
+    MarketDataFeedV3_pb2 = None
+
+NIFTY_KEY = "NSE_INDEX|Nifty 50"
+VIX_KEY = "NSE_INDEX|India VIX"
+FEED_MODE = "ltpc"
+RECONNECT_MIN_SECONDS = 1
+RECONNECT_MAX_SECONDS = 30
+RECV_TIMEOUT_SECONDS = 5
+
+
+def authorized_url(response: dict):
+    """Extracts the WebSocket URL from an authorize-feed response."""
+    if not isinstance(response, dict):
+        return None
+    data = response.get("data", response)
+    if isinstance(data, dict):
+        for key in ("authorized_redirect_uri", "authorizedRedirectUri", "url"):
+            if data.get(key):
+                return data[key]
+    return None
+
+
+def decode_market_message(raw) -> dict:
+    """Decodes a market feed frame (protobuf bytes or JSON) into a dict."""
+    if isinstance(raw, bytes):
+        if MarketDataFeedV3_pb2 is not None and not raw.lstrip().startswith(b"{"):
+            message = MarketDataFeedV3_pb2.FeedResponse.FromString(raw)
+            return json_format.MessageToDict(message)
+        raw = raw.decode("utf-8")
+    return json.loads(raw)
+
+
+def extract_ltps(message: dict) -> dict:
+    """Returns ``{instrument_key: ltp}`` for every feed in a decoded market message."""
+    ltps = {}
+    for key, feed in (message.get("feeds") or {}).items():
+        ltpc = feed.get("ltpc")
+        if ltpc is None:
+            full = feed.get("fullFeed") or feed.get("firstLevelWithGreeks") or {}
+            if "ltpc" in full:
+                ltpc = full["ltpc"]
+            else:
+                ltpc = (full.get("marketFF") or full.get("indexFF") or {}).get("ltpc")
+        if ltpc and ltpc.get("ltp") is not None:
+            ltps[key] = float(ltpc["ltp"])
+    return ltps
+
+
+def subscribe_request(instrument_keys: list, mode: str = FEED_MODE) -> bytes:
+    """Builds the binary subscription frame expected by the Upstox V3 market feed."""
+    request = {
+        "guid": str(uuid.uuid4()),
+        "method": "sub",
+        "data": {"mode": mode, "instrumentKeys": list(instrument_keys)},
+    }
+    return json.dumps(request).encode("utf-8")
+
+
+class FeedState:
+    """Thread-safe latest-value store for streamed market and portfolio data."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ltps = {}
+        self.positions = {}
+        self.orders = {}
+        self.version = 0
+        self.last_update = None
+        self.messages = 0
+
+    def apply_market(self, message: dict):
+        ltps = extract_ltps(message)
+        if not ltps:
+            return
+        with self._lock:
+            self.ltps.update(ltps)
+            self._touch()
+
+    def apply_portfolio(self, message: dict):
+        update_type = message.get("update_type")
+        key = message.get("instrument_token") or message.get("instrument_key")
+        with self._lock:
+            if update_type == "position" and key:
+                self.positions[key] = message
+            elif update_type == "order" and message.get("order_id"):
+                self.orders[message["order_id"]] = message
+            else:
+                return
+            self._touch()
+
+    def _touch(self):
+        self.version += 1
+        self.messages += 1
+        self.last_update = time.time()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "spot": self.ltps.get(NIFTY_KEY),
+                "vix": self.ltps.get(VIX_KEY),
+                "ltps": dict(self.ltps),
+                "positions": dict(self.positions),
+                "orders": dict(self.orders),
+                "version": self.version,
+                "last_update": self.last_update,
+                "messages": self.messages,
+            }
+
+
+class FeedWorker(threading.Thread):
+    """Keeps one WebSocket connection alive, reconnecting with backoff.
+
+    ``url_provider`` is called before every (re)connect because authorized URLs
+    are single-use; it may return None when authorization fails.
+    """
+
+    def __init__(self, name: str, url_provider, on_message, on_open=None):
+        super().__init__(name=name, daemon=True)
+        self.url_provider = url_provider
+        self.on_message = on_message
+        self.on_open = on_open
+        self.connected = False
+        self.last_error = None
+        self._stop_event = threading.Event()
+        self._reconnect_event = threading.Event()
+        self._ws = None
+
+    def stop(self):
+        self._stop_event.set()
+        self._close()
+
+    def reconnect(self):
+        """Drops the current connection so the next one asks ``url_provider`` again."""
+        self._reconnect_event.set()
+        self._close()
+
+    def _close(self):
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+
+    def send(self, payload: bytes):
+        """Sends a binary frame if the connection is up; returns whether it was sent."""
+        ws = self._ws
+        if not self.connected or ws is None:
+            return False
+        ws.send(payload, opcode=websocket.ABNF.OPCODE_BINARY)
+        return True
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop_event.is_set()
+
+    def run(self):
+        delay = RECONNECT_MIN_SECONDS
+        while not self.stopped:
+            self._reconnect_event.clear()
+            try:
+                url = self.url_provider()
+                if not url:
+                    raise ConnectionError("Feed authorization returned no URL")
+                self._ws = websocket.create_connection(url, timeout=RECV_TIMEOUT_SECONDS)
+                self.connected = True
+                delay = RECONNECT_MIN_SECONDS
+                if self.on_open:
+                    self.on_open(self._ws)
+                self._receive()
+            except Exception as e:
+                self.last_error = str(e)
+            finally:
+                self.connected = False
+                if self._ws is not None:
+                    try:
+                        self._ws.close()
+                    except Exception:
+                        pass
+                    self._ws = None
+            self._stop_event.wait(delay)
+            delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+
+    def _receive(self):
+        while not self.stopped and not self._reconnect_event.is_set():
+            try:
+                raw = self._ws.recv()
+            except websocket.WebSocketTimeoutException:
+                continue
+            if not raw:
+                raise ConnectionError("Feed closed by server")
+            try:
+                self.on_message(raw)
+            except ValueError as e:
+                self.last_error = f"Decode error: {e}"
+
+
+class FeedManager:
+    """Process-wide owner of the market feed and per-token portfolio feeds."""
+
+    def __init__(self, authorize, tokens=None):
+        # authorize(token, endpoint) -> (data, error), normally app._send_request
+        self.authorize = authorize
+        # tokens() -> live session tokens, most recent first (normally MarketStateService.live_tokens);
+        # defaults to the tokens whose portfolio feeds run here, newest first
+        self.tokens = tokens or (lambda: list(reversed(self._portfolio_workers)))
+        self.market_state = FeedState()
+        self.market_token = None  # token that authorized the current market connection
+        self._portfolio_states = {}
+        self._market_worker = None
+        self._portfolio_workers = {}
+        self._instrument_keys = {NIFTY_KEY, VIX_KEY}
+        self._rejected = set()  # tokens the backend answered 401/403 for
+        self._lock = threading.Lock()
+
+    def live_tokens(self) -> list:
+        return [token for token in self.tokens() if token not in self._rejected]
+
+    def _market_url(self):
+        """Authorizes the market feed with the newest live token that the backend accepts."""
+        error = "No live session token for the market feed"
+        for token in self.live_tokens():
+            data, error = self.authorize(token, "/authorize-market-feed")
+            if error is None:
+                self.market_token = token
+                return authorized_url(data)
+            if not any(status in error for status in AUTH_STATUSES):
+                break
+            self._rejected.add(token)  # expired or revoked token; try the next subscriber's
+        self.market_token = None
+        raise ConnectionError(error)
+
+    def _url_provider(self, token: str, endpoint: str):
+        def provide():
+            data, error = self.authorize(token, endpoint)
+            if error:
+                raise ConnectionError(error)
+            return authorized_url(data)
+        return provide
+
+    def start(self, token: str, instrument_keys: list = ()):
+        """Ensures the market feed and this token's portfolio feed are running."""
+        with self._lock:
+            new_keys = set(instrument_keys) - self._instrument_keys
+            self._instrument_keys.update(new_keys)
+            market = self._market_worker
+            if market is None or not market.is_alive():
+                market = FeedWorker(
+                    "market-feed",
+                    self._market_url,
+                    lambda raw: self.market_state.apply_market(decode_market_message(raw)),
+                    on_open=lambda ws: ws.send(subscribe_request(sorted(self._instrument_keys)), opcode=websocket.ABNF.OPCODE_BINARY),
+                )
+                self._market_worker = market
+                market.start()
+            elif new_keys:
+                market.send(subscribe_request(sorted(new_keys)))
+            worker = self._portfolio_workers.get(token)
+            if worker is None or not worker.is_alive():
+                state = self._portfolio_states.setdefault(token, FeedState())
+                worker = FeedWorker(
+                    "portfolio-feed",
+                    self._url_provider(token, "/authorize-portfolio-feed"),
+                    lambda raw, state=state: state.apply_portfolio(json.loads(raw)),
+                )
+                self._portfolio_workers[token] = worker
+                worker.start()
+
+    def stop_token(self, token: str):
+        """Stops the portfolio feed for a token (e.g. on logout) and moves the market feed off it.
+
+        Call it after the session has unsubscribed, so ``tokens()`` no longer lists
+        the token unless another session still uses it.
+        """
+        with self._lock:
+            worker = self._portfolio_workers.pop(token, None)
+            self._portfolio_states.pop(token, None)
+            market, live = self._market_worker, self.live_tokens()
+            if market is None or self.market_token != token or token in live:
+                market = None  # not on this token, or another session still uses it
+            elif not live:
+                self._market_worker, self.market_token = None, None
+        if worker is not None:
+            worker.stop()
+        if market is not None and live:
+            market.reconnect()
+        elif market is not None:
+            market.stop()
+
+    def stop(self):
+        with self._lock:
+            workers = list(self._portfolio_workers.values())
+            if self._market_worker is not None:
+                workers.append(self._market_worker)
+            self._portfolio_workers.clear()
+            self._market_worker, self.market_token = None, None
+        for worker in workers:
+            worker.stop()
+
+    def snapshot(self, token: str) -> dict:
+        """Returns the latest market state merged with this token's portfolio state."""
+        snap = self.market_state.snapshot()
+        portfolio = self._portfolio_states.get(token)
+        if portfolio is not None:
+            portfolio_snap = portfolio.snapshot()
+            snap["positions"] = portfolio_snap["positions"]
+            snap["orders"] = portfolio_snap["orders"]
+        market = self._market_worker
+        snap["connected"] = bool(market and market.connected)
+        snap["last_error"] = market.last_error if market else None
+        return snap
@@ -0,0 +1,250 @@
+"""Process-wide market state shared by every Streamlit session.
+
+Streamlit runs one script instance per browser session. Market-wide endpoints
+(``MARKET_ENDPOINTS``) return the same data whoever asks, so instead of each
+session fetching them with its own token, one ``MarketStateService`` per
+process keeps the latest snapshot of each. Sessions ``subscribe`` on render and
+read under a shared lock. A single poller thread refreshes every endpoint shortly
+before it goes stale, using the token of any live subscriber, so backend load
+depends on the refresh intervals and not on the number of sessions. A read that
+finds a stale snapshot (poller behind or not yet started) refreshes it
+single-flight: concurrent readers wait for the one in-flight fetch.
+
+Per-token endpoints (``/live/dashboard``, ``/order/book``, ...) never pass
+through here.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# endpoint -> refresh interval, seconds
+MARKET_ENDPOINTS = {
+    "/option-seller-dashboard": 30,
+    "/predict/volatility": 60,
+    "/full-chain-table": 30,
+}
+REFRESH_AHEAD = 0.8  # the poller refreshes at this fraction of the interval, before readers see it stale
+SUBSCRIBER_TTL_SECONDS = 15 * 60  # a session that has not rendered for this long stops counting
+AUTH_STATUSES = ("401", "403")
+QPS_WINDOW_SECONDS = 60
+
+
+class RWLock:
+    """Many concurrent readers or one writer; waiting writers block new readers."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+class RateWindow:
+    """Event timestamps over the last ``QPS_WINDOW_SECONDS`` for a rolling rate."""
+
+    def __init__(self, window: float = QPS_WINDOW_SECONDS):
+        self.window = window
+        self.total = 0
+        self._events = deque()
+        self._lock = threading.Lock()
+
+    def add(self):
+        now = time.monotonic()
+        with self._lock:
+            self.total += 1
+            self._events.append(now)
+            self._trim(now)
+
+    def rate(self) -> float:
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            return len(self._events) / self.window
+
+    def _trim(self, now: float):
+        while self._events and self._events[0] < now - self.window:
+            self._events.popleft()
+
+
+class MarketStateService:
+    """Single poller plus shared snapshots for the market-wide endpoints.
+
+    ``fetch(token, endpoint)`` performs the backend round trip and returns
+    ``(data, error)``. With ``poll=False`` no poller runs and snapshots are
+    only refreshed by stale reads.
+    """
+
+    def __init__(self, fetch, intervals: dict = None, poll: bool = True):
+        self.fetch = fetch
+        self.poll = poll
+        self.intervals = dict(MARKET_ENDPOINTS if intervals is None else intervals)
+        self._snapshots = {}  # endpoint -> (data, fetched_at monotonic)
+        self._errors = {}
+        self._lock = RWLock()
+        self._flights = {endpoint: threading.Lock() for endpoint in self.intervals}
+        self._subscribers = {}  # session id -> (token, last seen monotonic)
+        self._sub_lock = threading.Lock()
+        self.backend = {endpoint: RateWindow() for endpoint in self.intervals}
+        self.reads = {endpoint: RateWindow() for endpoint in self.intervals}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def handles(self, endpoint: str, method: str = "GET", params: dict = None) -> bool:
+        return method == "GET" and not params and endpoint in self.intervals
+
+    # --- Sessions ---
+    def subscribe(self, session_id: str, token: str):
+        """Registers (or refreshes) a live session; starts the poller on first use."""
+        with self._sub_lock:
+            self._subscribers[session_id] = (token, time.monotonic())
+        if self.poll and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="market-state", daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def unsubscribe(self, session_id: str):
+        with self._sub_lock:
+            self._subscribers.pop(session_id, None)
+
+    def live_tokens(self) -> list:
+        """Distinct tokens of live subscribers, most recently seen first."""
+        cutoff = time.monotonic() - SUBSCRIBER_TTL_SECONDS
+        with self._sub_lock:
+            for session_id in [s for s, (_, seen) in self._subscribers.items() if seen < cutoff]:
+                del self._subscribers[session_id]
+            live = sorted(self._subscribers.values(), key=lambda item: -item[1])
+        return list(dict.fromkeys(token for token, _ in live))
+
+    def sessions(self) -> int:
+        self.live_tokens()  # prunes sessions past SUBSCRIBER_TTL_SECONDS
+        with self._sub_lock:
+            return len(self._subscribers)
+
+    def drop_token(self, token: str):
+        """Forgets every session using ``token`` (expired or revoked)."""
+        with self._sub_lock:
+            for session_id in [s for s, (t, _) in self._subscribers.items() if t == token]:
+                del self._subscribers[session_id]
+
+    # --- Reads ---
+    def _age(self, endpoint: str) -> float:
+        with self._lock.read():
+            snapshot = self._snapshots.get(endpoint)
+        return time.monotonic() - snapshot[1] if snapshot else float("inf")
+
+    def get(self, endpoint: str, token: str):
+        """Latest snapshot of ``endpoint`` as ``(data, error)``, refreshing it first when stale."""
+        self.reads[endpoint].add()
+        with self._lock.read():
+            snapshot = self._snapshots.get(endpoint)
+        if snapshot and time.monotonic() - snapshot[1] < self.intervals[endpoint]:
+            return snapshot[0], None
+        return self.refresh(endpoint, [token], max_age=self.intervals[endpoint])
+
+    def peek(self, endpoint: str):
+        """The snapshot if it is still fresh, without fetching or counting a read (for prefetchers)."""
+        with self._lock.read():
+            snapshot = self._snapshots.get(endpoint)
+        fresh = snapshot and time.monotonic() - snapshot[1] < self.intervals[endpoint]
+        return snapshot[0] if fresh else None
+
+    # --- Writes ---
+    def refresh(self, endpoint: str, tokens: list, max_age: float = 0.0):
+        """Fetches ``endpoint`` single-flight, trying ``tokens`` in order until one is accepted.
+
+        Callers that waited on another thread's fetch reuse its result when it
+        is younger than ``max_age``.
+        """
+        with self._flights[endpoint]:
+            with self._lock.read():
+                snapshot = self._snapshots.get(endpoint)
+            if snapshot and time.monotonic() - snapshot[1] < max_age:
+                return snapshot[0], None
+            error = "No session token available for market data."
+            for token in tokens:
+                self.backend[endpoint].add()
+                data, error = self.fetch(token, endpoint)
+                if error is None:
+                    with self._lock.write():
+                        self._snapshots[endpoint] = (data, time.monotonic())
+                        self._errors.pop(endpoint, None)
+                    return data, None
+                if not any(status in error for status in AUTH_STATUSES):
+                    break
+                self.drop_token(token)  # expired or revoked token; let the next subscriber's try
+            with self._lock.write():
+                self._errors[endpoint] = error
+            return None, error
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            tokens = self.live_tokens()
+            wait = min(self.intervals.values()) * REFRESH_AHEAD
+            if tokens:
+                for endpoint, interval in self.intervals.items():
+                    remaining = interval * REFRESH_AHEAD - self._age(endpoint)
+                    if remaining <= 0:
+                        self.refresh(endpoint, tokens, max_age=interval * REFRESH_AHEAD)
+                        remaining = interval * REFRESH_AHEAD
+                    wait = min(wait, remaining)
+            self._wake.wait(wait if tokens else SUBSCRIBER_TTL_SECONDS)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    # --- Metrics ---
+    def stats(self) -> dict:
+        """Live sessions plus backend vs. session read rates, overall and per endpoint."""
+        endpoints = {}
+        for endpoint in self.intervals:
+            fetches, reads = self.backend[endpoint], self.reads[endpoint]
+            endpoints[endpoint] = {
+                "backend_fetches": fetches.total,
+                "reads": reads.total,
+                "backend_qps": fetches.rate(),
+                "read_qps": reads.rate(),
+                "age_seconds": self._age(endpoint),
+                "last_error": self._errors.get(endpoint),
+            }
+        backend_total = sum(e["backend_fetches"] for e in endpoints.values())
+        reads_total = sum(e["reads"] for e in endpoints.values())
+        return {
+            "sessions": self.sessions(),
+            "backend_qps": sum(e["backend_qps"] for e in endpoints.values()),
+            "read_qps": sum(e["read_qps"] for e in endpoints.values()),
+            "reads_per_fetch": reads_total / backend_total if backend_total else 0.0,
+            "endpoints": endpoints,
+        }
@@ -0,0 +1,154 @@
+"""Hot-path instrumentation: per-endpoint latency, payload size, decode time and render phases.
+
+One ``MetricsRegistry`` is kept per process. Request metrics are recorded by the
+API layer; render phases are timed with ``registry.timer(tab, phase)``. Everything
+can be exported as Prometheus text exposition or JSONL.
+"""
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Prometheus histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RESERVOIR_SIZE = 2048  # recent samples kept per series for percentiles
+
+
+class Histogram:
+    """Cumulative bucket counts plus a bounded window of recent samples for percentiles."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.recent.append(value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def percentile(self, q: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        index = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+        return ordered[index]
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe store for request and render-phase metrics."""
+
+    def __init__(self, event_log_size: int = 5000):
+        self._lock = threading.Lock()
+        self.latency = {}
+        self.decode = {}
+        self.bytes = {}
+        self.errors = {}
+        self.phases = {}
+        self.events = deque(maxlen=event_log_size)
+
+    def record_request(self, endpoint: str, method: str, status, latency: float, size: int = 0,
+                       decode: float = 0.0, error: bool = False):
+        key = (endpoint, method)
+        with self._lock:
+            self.latency.setdefault(key, Histogram()).observe(latency)
+            self.decode.setdefault(key, Histogram()).observe(decode)
+            self.bytes[key] = self.bytes.get(key, 0) + size
+            if error:
+                self.errors[key] = self.errors.get(key, 0) + 1
+            self.events.append({
+                "ts": time.time(), "type": "request", "endpoint": endpoint, "method": method, "status": status,
+                "latency_s": latency, "bytes": size, "decode_s": decode, "error": error,
+            })
+
+    def record_phase(self, tab: str, phase: str, seconds: float):
+        with self._lock:
+            self.phases.setdefault((tab, phase), Histogram()).observe(seconds)
+            self.events.append({"ts": time.time(), "type": "phase", "tab": tab, "phase": phase, "seconds": seconds})
+
+    @contextmanager
+    def timer(self, tab: str, phase: str):
+        """Times the enclosed block as a render phase of ``tab``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_phase(tab, phase, time.perf_counter() - start)
+
+    def endpoint_table(self) -> list:
+        """One row per endpoint with latency percentiles (ms), bytes and errors."""
+        with self._lock:
+            rows = []
+            for (endpoint, method), hist in sorted(self.latency.items()):
+                summary = hist.summary()
+                rows.append({
+                    "Endpoint": endpoint,
+                    "Method": method,
+                    "Calls": summary["count"],
+                    "p50 ms": summary["p50"] * 1000,
+                    "p95 ms": summary["p95"] * 1000,
+                    "p99 ms": summary["p99"] * 1000,
+                    "Decode p95 ms": self.decode[(endpoint, method)].percentile(95) * 1000,
+                    "KB total": self.bytes.get((endpoint, method), 0) / 1024,
+                    "Errors": self.errors.get((endpoint, method), 0),
+                })
+            return rows
+
+    def phase_table(self) -> list:
+        with self._lock:
+            return [
+                dict(Tab=tab, Phase=phase, Count=hist.count,
+                     **{"p50 ms": hist.percentile(50) * 1000, "p95 ms": hist.percentile(95) * 1000,
+                        "p99 ms": hist.percentile(99) * 1000})
+                for (tab, phase), hist in sorted(self.phases.items())
+            ]
+
+    def to_prometheus(self) -> str:
+        """Renders all series in Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            lines += _histogram_lines(
+                "voluguard_request_latency_seconds", "API request latency", self.latency, ("endpoint", "method"))
+            lines += _histogram_lines(
+                "voluguard_response_decode_seconds", "JSON decode time", self.decode, ("endpoint", "method"))
+            lines += ["# HELP voluguard_response_bytes_total Response payload bytes",
+                      "# TYPE voluguard_response_bytes_total counter"]
+            lines += [f'voluguard_response_bytes_total{{endpoint="{e}",method="{m}"}} {v}' for (e, m), v in sorted(self.bytes.items())]
+            lines += ["# HELP voluguard_request_errors_total Failed API requests",
+                      "# TYPE voluguard_request_errors_total counter"]
+            lines += [f'voluguard_request_errors_total{{endpoint="{e}",method="{m}"}} {v}' for (e, m), v in sorted(self.errors.items())]
+            lines += _histogram_lines(
+                "voluguard_render_phase_seconds", "Render phase duration", self.phases, ("tab", "phase"))
+        return "\n".join(lines) + "\n"
+
+    def to_jsonl(self) -> str:
+        """Returns the recent raw events, one JSON object per line."""
+        with self._lock:
+            return "".join(json.dumps(event) + "\n" for event in self.events)
+
+
+def _histogram_lines(name: str, help_text: str, series: dict, label_names: tuple) -> list:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, hist in sorted(series.items()):
+        label_str = ",".join(f'{k}="{v}"' for k, v in zip(label_names, labels))
+        for bound, count in zip(hist.buckets, hist.counts):
+            lines.append(f'{name}_bucket{{{label_str},le="{bound}"}} {count}')
+        lines.append(f'{name}_bucket{{{label_str},le="+Inf"}} {hist.count}')
+        lines.append(f"{name}_sum{{{label_str}}} {hist.total}")
+        lines.append(f"{name}_count{{{label_str}}} {hist.count}")
+    return lines
@@ -0,0 +1,182 @@
+"""Multi-leg order execution pipeline.
+
+Stages: concurrent ``/precheck/order`` for every leg with the margin results
+aggregated, then one ``/place/multileg`` submission, then the stop-loss legs
+attached in one ``/place/gtt-multileg`` call. A stop-loss is relative to each
+leg's limit price, so when one is asked for, legs without a positive price, or
+a stop of 100% or more on a bought leg (whose trigger would fall to zero), are
+rejected before anything is sent. Each submission carries an
+idempotency key; a repeat of the same order inside the duplicate window (a
+double click or a Streamlit rerun) returns the first result instead of sending
+the order again.
+"""
+import hashlib
+import json
+import threading
+import time
+
+ORDER_FIELDS = ("transaction_type", "instrument_key", "product", "price", "quantity")
+DEFAULT_PRODUCT = "D"
+DEFAULT_STOP_LOSS_PCT = 50.0
+MAX_STOP_LOSS_PCT = 500.0
+MAX_LONG_STOP_LOSS_PCT = 95.0  # a bought leg's stop sits below its price, so it must stay under 100%
+DUPLICATE_WINDOW_SECONDS = 120
+_MARGIN_KEYS = ("final_margin", "required_margin", "total_margin", "margin")
+
+
+def order_leg(order: dict) -> dict:
+    """Projects a ``/strategy/details`` order onto the UpstoxOrderRequest schema."""
+    leg = {field: order[field] for field in ORDER_FIELDS if order.get(field) is not None}
+    leg.setdefault("product", DEFAULT_PRODUCT)
+    leg["quantity"] = int(leg.get("quantity", 0))
+    return leg
+
+
+def unpriced_legs(legs: list) -> list:
+    """Instrument keys of legs with no positive limit price (market legs), which cannot carry a stop-loss."""
+    return [leg["instrument_key"] for leg in legs if not float(leg.get("price") or 0.0) > 0]
+
+
+def stop_loss_leg(leg: dict, stop_loss_pct: float) -> dict:
+    """Builds a GTT leg that exits ``leg`` once its premium moves ``stop_loss_pct`` against it.
+
+    Raises ValueError for a leg without a positive price, and for a bought leg
+    with ``stop_loss_pct`` of 100 or more: either trigger would be 0 or below.
+    """
+    price = float(leg.get("price") or 0.0)
+    if not price > 0:
+        raise ValueError(f"{leg['instrument_key']}: no price to set a stop-loss from")
+    selling = leg.get("transaction_type", "").upper() == "SELL"
+    if not selling and stop_loss_pct >= 100:
+        raise ValueError(f"{leg['instrument_key']}: a {stop_loss_pct:g}% stop-loss on a bought leg would trigger at 0")
+    trigger = price * (1 + stop_loss_pct / 100.0) if selling else price * (1 - stop_loss_pct / 100.0)
+    return {
+        "transaction_type": "BUY" if selling else "SELL",
+        "instrument_key": leg["instrument_key"],
+        "product": leg.get("product", DEFAULT_PRODUCT),
+        "price": round(trigger, 2),
+        "trigger_price": round(trigger, 2),
+        "quantity": leg["quantity"],
+    }
+
+
+def extract_margin(response) -> float:
+    """Finds the margin figure in a precheck response (0.0 when absent)."""
+    if not isinstance(response, dict):
+        return 0.0
+    data = response.get("data", response)
+    if isinstance(data, dict):
+        for key in _MARGIN_KEYS:
+            if isinstance(data.get(key), (int, float)):
+                return float(data[key])
+    return 0.0
+
+
+def idempotency_key(owner: str, strategy: str, legs: list) -> str:
+    payload = json.dumps({"owner": owner, "strategy": strategy, "legs": legs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class IdempotencyRegistry:
+    """Remembers in-flight and recent submissions by idempotency key."""
+
+    def __init__(self, window_seconds: float = DUPLICATE_WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def claim(self, key: str):
+        """Returns None if the caller may submit, else the earlier result (or an in-flight marker)."""
+        now = time.monotonic()
+        with self._lock:
+            self._entries = {k: v for k, v in self._entries.items() if now - v[0] < self.window_seconds}
+            if key in self._entries:
+                return self._entries[key][1] or {"status": "in_flight", "idempotency_key": key}
+            self._entries[key] = (now, None)
+            return None
+
+    def complete(self, key: str, result: dict):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+
+    def release(self, key: str):
+        """Forgets a key whose submission failed before reaching the broker, allowing a retry."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class OrderPipeline:
+    """Runs precheck → submit → GTT for one strategy's legs.
+
+    ``send(endpoint, method, json_data)`` performs one API call and returns
+    ``(data, error)``; ``send_many(specs)`` does the same for a batch concurrently.
+    """
+
+    def __init__(self, send, send_many, registry: IdempotencyRegistry):
+        self.send = send
+        self.send_many = send_many
+        self.registry = registry
+
+    def precheck(self, legs: list) -> dict:
+        specs = [{"endpoint": "/precheck/order", "method": "POST", "json_data": leg} for leg in legs]
+        results = self.send_many(specs)
+        errors = [f"{leg['instrument_key']}: {error}" for leg, (_, error) in zip(legs, results) if error]
+        margins = [extract_margin(data) for data, _ in results]
+        return {"ok": not errors, "errors": errors, "leg_margins": margins, "total_margin": sum(margins)}
+
+    def execute(self, owner: str, strategy: str, orders: list, available_funds: float = None,
+                stop_loss_pct: float = None) -> dict:
+        """Runs the pipeline; returns a result dict with per-stage timings in milliseconds."""
+        legs = [order_leg(order) for order in orders]
+        key = idempotency_key(owner, strategy, legs)
+        previous = self.registry.claim(key)
+        if previous is not None:
+            return dict(previous, duplicate=True)
+
+        result = {"idempotency_key": key, "strategy": strategy, "timings_ms": {}, "duplicate": False}
+        unpriced = unpriced_legs(legs) if stop_loss_pct else []
+        if unpriced:
+            # refused before submitting, so no leg is left open without its stop-loss
+            self.registry.release(key)
+            return dict(result, status="stop_loss_unpriced",
+                        error=f"Stop-loss needs a limit price on every leg; missing for {', '.join(unpriced)}")
+        try:
+            gtt_legs = [stop_loss_leg(leg, stop_loss_pct) for leg in legs] if stop_loss_pct else []
+        except ValueError as e:
+            self.registry.release(key)
+            return dict(result, status="stop_loss_invalid", error=str(e))
+        start = time.perf_counter()
+        margin = self.precheck(legs)
+        result["timings_ms"]["precheck"] = (time.perf_counter() - start) * 1000
+        result["margin"] = margin
+        if not margin["ok"]:
+            self.registry.release(key)
+            return dict(result, status="precheck_failed", error="; ".join(margin["errors"]))
+        if available_funds is not None and margin["total_margin"] > available_funds:
+            self.registry.release(key)
+            return dict(result, status="insufficient_margin",
+                        error=f"Required margin ₹{margin['total_margin']:.2f} exceeds available funds ₹{available_funds:.2f}")
+
+        start = time.perf_counter()
+        order_data, order_error = self.send(
+            "/place/multileg", "POST", {"legs": legs, "strategy": strategy, "idempotency_key": key}
+        )
+        result["timings_ms"]["submit"] = (time.perf_counter() - start) * 1000
+        if order_error:
+            # the broker may have accepted part of the order, so keep the key claimed
+            result.update(status="submit_failed", error=order_error)
+            self.registry.complete(key, result)
+            return result
+        result["order"] = order_data
+
+        if stop_loss_pct:
+            start = time.perf_counter()
+            gtt_data, gtt_error = self.send("/place/gtt-multileg", "POST", {"legs": gtt_legs, "idempotency_key": f"{key}-gtt"})
+            result["timings_ms"]["gtt"] = (time.perf_counter() - start) * 1000
+            result["gtt"] = gtt_data
+            result["gtt_error"] = gtt_error
+
+        result["timings_ms"]["total"] = sum(result["timings_ms"].values())
+        result["status"] = "submitted"
+        self.registry.complete(key, result)
+        return result
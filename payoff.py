@@ -0,0 +1,127 @@
+"""Payoff curves and Monte Carlo probability of profit for suggested strategies.
+
+Legs come from the ``orders`` of ``/strategy/details``. Strike and option type
+are taken from the order when present, else looked up by instrument key in the
+local option chain, else parsed from a trading symbol the way the risk engine
+does (``risk_engine.contract_from_symbol``). Legs that none of these resolve are
+returned as unresolved rather than guessed.
+Every strategy is simulated against the same set of terminal spot paths in one
+batched NumPy computation, with volatility seeded from ``/predict/volatility``.
+"""
+import numpy as np
+import pandas as pd
+
+from chain_analytics import MIN_T, RISK_FREE_RATE, bs_price
+from risk_engine import contract_from_symbol
+
+DEFAULT_PATHS = 100_000
+DEFAULT_SEED = 42
+GRID_POINTS = 401
+GRID_WIDTH = 0.12  # payoff grid spans spot +/- 12%
+
+
+def _leg_contract(order: dict, chain_lookup: dict):
+    strike = order.get("strike") or order.get("strike_price")
+    option_type = (order.get("option_type") or order.get("instrument_type") or "").upper()
+    if strike is None or option_type not in ("CE", "PE"):
+        found = chain_lookup.get(order.get("instrument_key"))
+        if found:
+            return found
+        contract = contract_from_symbol(order.get("tradingsymbol") or order.get("trading_symbol"))
+        if contract is None:
+            return None
+        return contract[0], contract[2]
+    return float(strike), option_type == "CE"
+
+
+def chain_lookup(chain_df: pd.DataFrame) -> dict:
+    """Maps instrument keys to ``(strike, is_call)`` from a ``chain_frame``."""
+    if chain_df is None or chain_df.empty:
+        return {}
+    lookup = dict(zip(chain_df["call_key"], zip(chain_df["strike"], [True] * len(chain_df))))
+    lookup.update(zip(chain_df["put_key"], zip(chain_df["strike"], [False] * len(chain_df))))
+    return lookup
+
+
+def strategy_legs(details: dict, lookup: dict = None) -> tuple:
+    """Returns ``(legs_df, unresolved_orders)`` with strike, is_call, signed quantity and premium."""
+    rows, unresolved = [], []
+    for order in (details or {}).get("orders", []):
+        contract = _leg_contract(order, lookup or {})
+        if contract is None:
+            unresolved.append(order)
+            continue
+        side = -1.0 if str(order.get("transaction_type", "")).upper() == "SELL" else 1.0
+        rows.append({
+            "strike": contract[0],
+            "is_call": contract[1],
+            "quantity": side * float(order.get("quantity", 0)),
+            "premium": float(order.get("price") or order.get("current_price") or 0.0),
+        })
+    return pd.DataFrame(rows, columns=["strike", "is_call", "quantity", "premium"]), unresolved
+
+
+def expiry_payoff(legs: pd.DataFrame, spots) -> np.ndarray:
+    """P&L at expiry for each spot in ``spots``."""
+    spots = np.asarray(spots, dtype=float)[:, None]
+    strike = legs["strike"].to_numpy()
+    intrinsic = np.where(legs["is_call"].to_numpy(), np.maximum(spots - strike, 0.0), np.maximum(strike - spots, 0.0))
+    return ((intrinsic - legs["premium"].to_numpy()) * legs["quantity"].to_numpy()).sum(axis=1)
+
+
+def horizon_payoff(legs: pd.DataFrame, spots, t_remaining: float, sigma: float) -> np.ndarray:
+    """Mark-to-model P&L with ``t_remaining`` years left, valued at a flat ``sigma``."""
+    spots = np.asarray(spots, dtype=float)[:, None]
+    value = bs_price(spots, legs["strike"].to_numpy(), max(t_remaining, MIN_T), sigma, legs["is_call"].to_numpy())
+    return ((value - legs["premium"].to_numpy()) * legs["quantity"].to_numpy()).sum(axis=1)
+
+
+def breakevens(spots, pnl) -> list:
+    """Spots where the P&L curve crosses zero, linearly interpolated."""
+    spots, pnl = np.asarray(spots), np.asarray(pnl)
+    sign = np.sign(pnl)
+    idx = np.nonzero(sign[:-1] * sign[1:] < 0)[0]
+    return [float(spots[i] - pnl[i] * (spots[i + 1] - spots[i]) / (pnl[i + 1] - pnl[i])) for i in idx]
+
+
+def payoff_grid(spot: float, width: float = GRID_WIDTH, points: int = GRID_POINTS) -> np.ndarray:
+    return np.linspace(spot * (1 - width), spot * (1 + width), points)
+
+
+def terminal_spots(spot: float, sigma: float, t: float, paths: int = DEFAULT_PATHS,
+                   seed: int = DEFAULT_SEED, rate: float = RISK_FREE_RATE) -> np.ndarray:
+    """Risk-neutral GBM terminal spots (antithetic pairs for lower variance)."""
+    rng = np.random.default_rng(seed)
+    half = rng.standard_normal((paths + 1) // 2)
+    z = np.concatenate([half, -half])[:paths]
+    t = max(t, MIN_T)
+    return spot * np.exp((rate - 0.5 * sigma * sigma) * t + sigma * np.sqrt(t) * z)
+
+
+def simulate_strategies(strategy_legs_map: dict, spot: float, sigma: float, t: float,
+                        paths: int = DEFAULT_PATHS, seed: int = DEFAULT_SEED) -> pd.DataFrame:
+    """Monte Carlo POP and P&L statistics for many strategies against shared paths.
+
+    All legs of all strategies are stacked and reduced per strategy with a single
+    matrix product, so cost grows with total legs rather than strategies × paths loops.
+    """
+    names = [name for name, legs in strategy_legs_map.items() if not legs.empty]
+    if not names:
+        return pd.DataFrame(columns=["Strategy", "POP", "Expected P&L", "P5 P&L", "P95 P&L"])
+    stacked = pd.concat([strategy_legs_map[name] for name in names], ignore_index=True)
+    owner = np.repeat(np.arange(len(names)), [len(strategy_legs_map[name]) for name in names])
+    membership = np.zeros((len(stacked), len(names)))
+    membership[np.arange(len(stacked)), owner] = 1.0
+
+    s_t = terminal_spots(spot, sigma, t, paths, seed)[:, None]
+    strike = stacked["strike"].to_numpy()
+    intrinsic = np.where(stacked["is_call"].to_numpy(), np.maximum(s_t - strike, 0.0), np.maximum(strike - s_t, 0.0))
+    leg_pnl = (intrinsic - stacked["premium"].to_numpy()) * stacked["quantity"].to_numpy()
+    pnl = leg_pnl @ membership  # (paths, strategies)
+    return pd.DataFrame({
+        "Strategy": names,
+        "POP": (pnl > 0).mean(axis=0) * 100,
+        "Expected P&L": pnl.mean(axis=0),
+        "P5 P&L": np.percentile(pnl, 5, axis=0),
+        "P95 P&L": np.percentile(pnl, 95, axis=0),
+    })
@@ -0,0 +1,176 @@
+"""Idle-time prefetching of the tabs a session is likely to open next.
+
+Streamlit only runs the selected tab's branch, so every tab switch starts its
+fetches cold. Each session gets a ``PrefetchScheduler`` that, once a render has
+finished and the user has been idle for ``IDLE_DELAY_SECONDS``, warms the data
+of the other tabs in likelihood order: tabs most often opened after the current
+one first (``NavigationHistory``), then the most visited, then the menu order.
+
+Loaders are plain callables supplied by the app (usually filling the response
+cache or the local store); a process-wide ``RateLimiter`` bounds how fast all
+sessions together hit the backend. Loaders charge it once per backend request,
+not once per loader, since one loader may send several. Endpoints cached for
+less than ``MIN_PREFETCH_TTL_SECONDS`` are not worth prefetching: the entry
+would expire before the user is likely to click through. A new render replaces the pending plan, and
+``cancel`` (on logout) drops it and stops the worker.
+"""
+import threading
+import time
+from collections import Counter
+
+IDLE_DELAY_SECONDS = 1.5  # quiet time after a render before prefetching starts
+MAX_PREFETCH_TABS = 3  # how many likely-next tabs to warm per render
+PREFETCH_RATE = 2.0  # requests per second across all sessions
+PREFETCH_BURST = 4
+MIN_PREFETCH_TTL_SECONDS = 15  # expected idle-to-click time; shorter-lived data is fetched on render instead
+FAILURE_BACKOFF_SECONDS = 30  # pause after a failed load so a struggling backend is not piled on
+WORKER_IDLE_EXIT_SECONDS = 600  # worker thread exits after this long without a render
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every session's prefetcher."""
+
+    def __init__(self, rate: float = PREFETCH_RATE, burst: int = PREFETCH_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, stop: threading.Event) -> bool:
+        """Blocks until a token is available; returns False if ``stop`` is set first."""
+        while not stop.is_set():
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            stop.wait(wait)
+        return False
+
+
+class NavigationHistory:
+    """Per-session tab visits and tab-to-tab transitions."""
+
+    def __init__(self, default_order: list):
+        self.default_order = list(default_order)
+        self.visits = Counter()
+        self.transitions = Counter()
+        self.current = None
+
+    def record(self, tab: str):
+        if tab == self.current:
+            return
+        if self.current is not None:
+            self.transitions[(self.current, tab)] += 1
+        self.visits[tab] += 1
+        self.current = tab
+
+    def likely_next(self, tab: str) -> list:
+        """Other tabs ordered by how likely they are to be opened after ``tab``."""
+        candidates = [t for t in self.default_order if t != tab]
+        return sorted(candidates, key=lambda t: (-self.transitions[(tab, t)], -self.visits[t], self.default_order.index(t)))
+
+
+class PrefetchScheduler:
+    """Background worker that runs tab loaders for one session while it is idle.
+
+    ``loaders`` maps a tab name to a list of ``(label, callable)``; a label is
+    loaded at most once per plan even when several tabs share it. A callable
+    takes ``acquire`` and calls it before each backend request it sends; it
+    blocks for one rate-limit token and returns False once the plan is
+    cancelled. A callable returns an error string (or raises) on failure and
+    None on success.
+    """
+
+    def __init__(self, loaders: dict, limiter: RateLimiter, default_order: list = None,
+                 idle_delay: float = IDLE_DELAY_SECONDS, max_tabs: int = MAX_PREFETCH_TABS):
+        self.loaders = loaders
+        self.limiter = limiter
+        self.history = NavigationHistory(default_order or list(loaders))
+        self.idle_delay = idle_delay
+        self.max_tabs = max_tabs
+        self._plan = []
+        self._not_before = 0.0
+        self._last_schedule = time.monotonic()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self.completed = 0
+        self.failed = 0
+        self.last_error = None
+
+    def schedule(self, current_tab: str):
+        """Replaces the pending plan with loaders for the tabs likely to follow ``current_tab``."""
+        if self._stop.is_set():
+            return
+        self.history.record(current_tab)
+        skip = {label for label, _ in self.loaders.get(current_tab, [])}
+        plan = []
+        for tab in self.history.likely_next(current_tab)[:self.max_tabs]:
+            for label, load in self.loaders.get(tab, []):
+                if label not in skip:
+                    skip.add(label)
+                    plan.append((tab, label, load))
+        with self._cond:
+            self._plan = plan
+            self._last_schedule = time.monotonic()
+            self._not_before = max(self._not_before, self._last_schedule + self.idle_delay)
+            self._cond.notify()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+                self._thread.start()
+
+    def _next_task(self):
+        with self._cond:
+            while not self._stop.is_set():
+                now = time.monotonic()
+                if self._plan and now >= self._not_before:
+                    return self._plan.pop(0)
+                if not self._plan and now - self._last_schedule > WORKER_IDLE_EXIT_SECONDS:
+                    self._thread = None  # the next schedule starts a fresh worker
+                    return None
+                self._cond.wait(max(0.05, self._not_before - now) if self._plan else WORKER_IDLE_EXIT_SECONDS)
+            return None
+
+    def _run(self):
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            tab, label, load = task
+            try:
+                error = load(lambda: self.limiter.acquire(self._stop))
+            except Exception as e:
+                error = str(e)
+            if self._stop.is_set():
+                return
+            if error:
+                self.failed += 1
+                self.last_error = f"{tab} {label}: {error}"
+                with self._cond:
+                    self._not_before = time.monotonic() + FAILURE_BACKOFF_SECONDS
+            else:
+                self.completed += 1
+
+    def pending(self) -> list:
+        with self._cond:
+            return [label for _, label, _ in self._plan]
+
+    def cancel(self):
+        """Drops pending work and stops the worker (an in-flight load finishes in the background)."""
+        self._stop.set()
+        with self._cond:
+            self._plan = []
+            self._cond.notify()
+
+    def stats(self) -> dict:
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "pending": len(self.pending()),
+            "last_error": self.last_error,
+        }
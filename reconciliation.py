@@ -0,0 +1,374 @@
+"""Reconciliation of broker fills against the logged trades.
+
+``/order/book`` and ``/trades/day`` are polled and diffed incrementally. Orders
+are keyed by order id, and only those whose status or filled quantity changed
+since the last poll are re-read. Day trades are keyed by trade id, and only new
+fills are folded into the per-order fill aggregates. Each pass hash-joins the
+aggregates against the trades logged today (``/fetch/trades``). The join uses
+the order id when a logged row carries one and falls back to the instrument.
+A pass flags unlogged fills, quantity mismatches, and orphan GTTs. An orphan
+GTT is an active GTT on an instrument with no open position.
+
+Unlogged fills can be posted back through ``/log/trade`` in concurrent batches.
+Fills are first netted per instrument, with quantities signed (sells negative).
+``/log/trade`` only inserts rows, so only fills that open a position, or that
+make a flat round trip, are posted as new rows. Each new row carries its order
+ids and signed quantities in its notes, so the next pass matches it exactly.
+Fills that would close or reduce an existing open row are reported as
+``needs_update`` with the row change they imply; the backend has no update
+endpoint, so these rows have to be edited by hand. The reconciler is shared by
+every session of a token (see ``services.get_reconciler``), so each order is
+posted at most once per process.
+"""
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import date
+
+from wire_format import records
+
+ORDER_BOOK_ENDPOINT = "/order/book"
+DAY_TRADES_ENDPOINT = "/trades/day"
+LOG_TRADE_ENDPOINT = "/log/trade"
+POLL_INTERVAL_SECONDS = 30
+POST_BATCH_SIZE = 20
+ACTIVE_STATUSES = {"open", "pending", "trigger pending", "active", "scheduled"}
+GTT_ORDER_TYPES = {"SL", "SL-M"}
+UNLOGGED_STRATEGY = "Unlogged Fill"
+ORDER_ID_TAG = "order_id="
+AUTO_LOG_NOTE = "(auto-logged by reconciliation)"
+# order_id=<id> or order_id=<id>:<signed quantity>
+_ORDER_ID_PATTERN = re.compile(re.escape(ORDER_ID_TAG) + r"([\w-]+)(?::(-?\d+(?:\.\d+)?))?")
+
+def _rows(data) -> list:
+    """Rows of an Upstox list response: ``{"data": [...]}`` or a bare list, in either wire form."""
+    if isinstance(data, dict):
+        data = data.get("data")
+    return records(data)
+
+
+def _number(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _present(value) -> bool:
+    return value is not None and value == value  # NaN from a frame round trip counts as missing
+
+
+def logged_orders(trade: dict) -> dict:
+    """Broker order ids a logged trade was reconciled against -> tagged signed quantity (None if untagged)."""
+    if trade.get("order_id"):
+        return {str(trade["order_id"]): None}
+    notes = trade.get("notes")
+    matches = _ORDER_ID_PATTERN.finditer(notes if isinstance(notes, str) else "")
+    return {m.group(1): float(m.group(2)) if m.group(2) else None for m in matches}
+
+
+def signed_quantity(fill: dict) -> float:
+    return -fill["quantity"] if fill["transaction_type"] == "SELL" else fill["quantity"]
+
+
+def is_gtt(order: dict) -> bool:
+    order_id = str(order.get("order_id") or "")
+    return bool(order.get("is_gtt")) or order_id.upper().startswith("GTT") or order.get("order_type") in GTT_ORDER_TYPES
+
+
+def is_active(order: dict) -> bool:
+    return str(order.get("status") or "").lower() in ACTIVE_STATUSES
+
+
+def _average_price(fills: list) -> float:
+    quantity = sum(fill["quantity"] for fill in fills)
+    return round(sum(fill["value"] for fill in fills) / quantity, 2) if quantity else 0.0
+
+
+def _order_tags(fills: list) -> str:
+    return " ".join(f"{ORDER_ID_TAG}{fill['order_id']}:{signed_quantity(fill):g}" for fill in fills)
+
+
+def trade_requests(fills: list, open_rows=()) -> tuple:
+    """Splits unlogged fills, netted per instrument, into new ``/log/trade`` rows and manual row updates.
+
+    ``open_rows`` are logged rows with status open, from any day. When the net
+    signed quantity of an instrument opens a position, or nets to zero as a
+    flat round trip, with no opposite-signed open row, it becomes a new
+    TradeRequest. Otherwise it would close or reduce open rows, oldest first,
+    at the volume-weighted exit price, and ``/log/trade`` cannot change an
+    existing row. The change is returned as an update for the user to apply by
+    hand, along with the notes tag that marks the fills as logged. Returns
+    ``([(order_ids, request), ...], [update, ...])``.
+    """
+    by_instrument = defaultdict(list)
+    for fill in fills:
+        by_instrument[fill["instrument_token"]].append(fill)
+    held = defaultdict(list)
+    for row in open_rows:
+        if str(row.get("status") or "").lower() == "open" and _number(row.get("quantity")):
+            held[row.get("instrument_token")].append(row)
+    requests, updates = [], []
+    for instrument, group in by_instrument.items():
+        buys = [fill for fill in group if fill["transaction_type"] != "SELL"]
+        sells = [fill for fill in group if fill["transaction_type"] == "SELL"]
+        stamps = sorted(fill["timestamp"] for fill in group if fill.get("timestamp"))
+        entered, exited = (stamps[0], stamps[-1]) if stamps else (None, None)
+        strategy = next((fill["tag"] for fill in group if fill.get("tag")), UNLOGGED_STRATEGY)
+        order_ids = [fill["order_id"] for fill in group]
+        remaining = sum(signed_quantity(fill) for fill in group)
+        rows = sorted(held.get(instrument, []), key=lambda row: str(row.get("timestamp_entry") or ""))
+        touched = []
+        for row in rows:
+            quantity = _number(row["quantity"])
+            if not remaining or quantity * remaining > 0:
+                continue
+            sign = 1 if quantity > 0 else -1
+            closed = min(abs(quantity), abs(remaining))
+            exit_price = _average_price(sells if sign > 0 else buys)
+            pnl = (exit_price - _number(row.get("entry_price"))) * closed * sign
+            left = quantity - sign * closed
+            remaining += sign * closed
+            touched.append({
+                "instrument_token": instrument, "id": row.get("id"), "strategy": row.get("strategy"),
+                "timestamp_entry": row.get("timestamp_entry"), "quantity": quantity, "new_quantity": left,
+                "realized_pnl": round(_number(row.get("realized_pnl")) + pnl, 2),
+                "status": "closed" if not left else "open", "timestamp_exit": exited if not left else None,
+            })
+        if touched:
+            # the fills are only logged once the rows are edited; the tag goes on the first of them
+            if remaining:
+                touched.append({
+                    "instrument_token": instrument, "strategy": strategy, "timestamp_entry": entered,
+                    "quantity": 0.0, "new_quantity": remaining, "status": "open",
+                    "entry_price": _average_price(buys if remaining > 0 else sells),
+                })
+            touched[0]["order_ids"], touched[0]["notes_tag"] = order_ids, _order_tags(group)
+            updates += touched
+            continue
+        if remaining:
+            request = {
+                "strategy": strategy, "instrument_token": instrument,
+                "entry_price": _average_price(buys if remaining > 0 else sells), "quantity": remaining,
+                "realized_pnl": 0.0, "unrealized_pnl": 0.0, "timestamp_entry": entered, "status": "open",
+            }
+        else:
+            request = {
+                "strategy": strategy, "instrument_token": instrument, "entry_price": _average_price(buys),
+                "quantity": 0.0, "realized_pnl": round(sum(f["value"] for f in sells) - sum(f["value"] for f in buys), 2),
+                "unrealized_pnl": 0.0, "timestamp_entry": entered, "timestamp_exit": exited, "status": "closed",
+            }
+        request["notes"] = f"{_order_tags(group)} {AUTO_LOG_NOTE}"
+        requests.append((order_ids, request))
+    return requests, updates
+
+
+class Reconciler:
+    """Incremental order-book and day-trade state for one account.
+
+    ``fetch_many(endpoints)`` performs the GETs concurrently and returns one
+    ``(data, error)`` tuple per endpoint; ``send_many(specs)`` does the same
+    for ``api_request`` keyword dicts.
+    """
+
+    def __init__(self, poll_interval: float = POLL_INTERVAL_SECONDS, batch_size: int = POST_BATCH_SIZE):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.day = date.today()
+        self.orders = {}  # order id -> latest order row
+        self.fills = {}  # order id -> aggregated fills
+        self.posted = set()  # order ids sent to /log/trade, never reset
+        self.open_rows = []  # logged open rows from the last reconcile, netted against by post_unlogged
+        self.changed = []  # orders new or changed in the last poll
+        self.last_poll = 0.0
+        self.polls = 0
+        self.report = None
+        self._order_state = {}
+        self._trade_ids = set()
+        self._lock = threading.Lock()
+
+    def _roll_day(self):
+        # the order book and day trades restart every session; ids are unique, so ``posted`` is kept
+        today = date.today()
+        if today != self.day:
+            self.day = today
+            self.orders, self.fills, self._order_state, self._trade_ids = {}, {}, {}, set()
+            self.report = None
+
+    def diff_orders(self, orders: list) -> list:
+        """Records the order book; returns only orders that are new or changed status or fill."""
+        changed = []
+        for order in orders:
+            order_id = order.get("order_id")
+            if order_id is None:
+                continue
+            state = (order.get("status"), order.get("filled_quantity"))
+            if self._order_state.get(order_id) != state:
+                self._order_state[order_id] = state
+                self.orders[order_id] = order
+                changed.append(order)
+        return changed
+
+    def ingest_trades(self, trades: list) -> int:
+        """Folds fills not seen before into the per-order aggregates; returns how many were new."""
+        new = 0
+        for trade in trades:
+            trade_id = trade.get("trade_id")
+            order_id = trade.get("order_id")
+            if trade_id is None or order_id is None or trade_id in self._trade_ids:
+                continue
+            self._trade_ids.add(trade_id)
+            quantity = _number(trade.get("quantity"))
+            fill = self.fills.get(order_id)
+            if fill is None:
+                fill = self.fills[order_id] = {
+                    "order_id": order_id,
+                    "instrument_token": trade.get("instrument_token"),
+                    "transaction_type": str(trade.get("transaction_type") or "").upper(),
+                    "tag": trade.get("tag"),
+                    "quantity": 0.0,
+                    "value": 0.0,
+                    "timestamp": trade.get("exchange_timestamp") or trade.get("order_timestamp"),
+                }
+            fill["quantity"] += quantity
+            fill["value"] += quantity * _number(trade.get("average_price"))
+            new += 1
+        return new
+
+    def poll(self, fetch_many, force: bool = False):
+        """Pulls the order book and day trades; throttled unless ``force``.
+
+        Returns ``(polled, error)``. ``polled`` is False when the poll was skipped.
+        """
+        with self._lock:
+            if not force and time.time() - self.last_poll < self.poll_interval:
+                return False, None
+            self._roll_day()
+            (book, book_error), (trades, trades_error) = fetch_many([ORDER_BOOK_ENDPOINT, DAY_TRADES_ENDPOINT])
+            error = book_error or trades_error
+            if error:
+                return False, error
+            self.changed = self.diff_orders(_rows(book))
+            self.ingest_trades(_rows(trades))
+            self.last_poll = time.time()
+            self.polls += 1
+            return True, None
+
+    def net_positions(self) -> dict:
+        """Signed filled quantity per instrument today (buys positive)."""
+        net = defaultdict(float)
+        for fill in self.fills.values():
+            sign = -1 if fill["transaction_type"] == "SELL" else 1
+            net[fill["instrument_token"]] += sign * fill["quantity"]
+        return net
+
+    def reconcile(self, logged: list, held=()) -> dict:
+        """Hash-joins today's fills against ``logged`` trade rows.
+
+        ``held`` holds logged rows from any day that are open or were closed
+        today. Their order-id tags count as logged, so fills that closed an
+        older row are matched once its notes carry them. Unlogged fills that
+        would close or reduce an open row are reported under ``needs_update``
+        instead of ``unlogged`` (see ``trade_requests``). A GTT on an
+        instrument with an open row is not an orphan.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            by_order = defaultdict(float)
+            by_instrument = defaultdict(float)
+            tagged = set()
+            for trade in logged:
+                orders = logged_orders(trade)
+                quantity = abs(_number(trade.get("quantity")))
+                for order_id, tagged_quantity in orders.items():
+                    by_order[order_id] += quantity if tagged_quantity is None else abs(tagged_quantity)
+                    tagged.add(order_id)
+                if not orders:
+                    by_instrument[trade.get("instrument_token")] += quantity
+            # older rows only contribute their tags; untagged quantities from other days are not today's fills
+            for trade in held:
+                for order_id, tagged_quantity in logged_orders(trade).items():
+                    if order_id not in tagged and tagged_quantity is not None:
+                        by_order[order_id] += abs(tagged_quantity)
+                        tagged.add(order_id)
+            self.open_rows = [trade for trade in held if str(trade.get("status") or "").lower() == "open"]
+
+            unlogged, mismatches = [], []
+            pending = defaultdict(list)
+            for order_id, fill in self.fills.items():
+                if order_id in by_order:
+                    if by_order[order_id] != fill["quantity"]:
+                        mismatches.append({
+                            "order_id": order_id, "instrument_token": fill["instrument_token"],
+                            "filled_quantity": fill["quantity"], "logged_quantity": by_order[order_id],
+                        })
+                elif order_id not in self.posted:
+                    pending[fill["instrument_token"]].append(fill)
+            # fills without an exact match are compared per instrument against rows logged by hand
+            for instrument, fills in pending.items():
+                filled = sum(fill["quantity"] for fill in fills)
+                if instrument not in by_instrument:
+                    unlogged.extend(fills)
+                elif by_instrument[instrument] != filled:
+                    mismatches.append({
+                        "order_id": None, "instrument_token": instrument,
+                        "filled_quantity": filled, "logged_quantity": by_instrument[instrument],
+                    })
+
+            # fills that would change an existing open row cannot be posted; they wait for a manual edit
+            _, needs_update = trade_requests(unlogged, self.open_rows)
+            waiting = {order_id for update in needs_update for order_id in update.get("order_ids", ())}
+            unlogged = [fill for fill in unlogged if fill["order_id"] not in waiting]
+
+            net = self.net_positions()
+            open_instruments = {trade.get("instrument_token") for trade in self.open_rows}
+            orphans = [
+                order for order in self.orders.values()
+                if is_gtt(order) and is_active(order)
+                and order.get("instrument_token") not in open_instruments and not net.get(order.get("instrument_token"))
+            ]
+            self.report = {
+                "unlogged": unlogged,
+                "needs_update": needs_update,
+                "mismatches": mismatches,
+                "orphan_gtts": orphans,
+                "orders": len(self.orders),
+                "fills": len(self.fills),
+                "changed": len(self.changed),
+                "reconcile_ms": (time.perf_counter() - start) * 1000,
+                "at": time.time(),
+            }
+            return self.report
+
+    def post_unlogged(self, send_many, fills: list) -> dict:
+        """Logs unlogged fills through ``/log/trade``, ``batch_size`` requests at a time.
+
+        Fills are netted against the open rows of the last ``reconcile`` (see
+        ``trade_requests``); only new rows are posted, and fills that would
+        change an open row are left for a manual update. Stops after a batch in
+        which every request failed (backend down). Returns
+        ``{"posted": n, "errors": [...]}``, where ``n`` counts the fills logged.
+        """
+        with self._lock:
+            fills = [fill for fill in fills if fill["order_id"] not in self.posted]
+            requests, _ = trade_requests(fills, self.open_rows)
+            # claimed up front so an overlapping rerun cannot post the same fill twice
+            self.posted.update(order_id for order_ids, _ in requests for order_id in order_ids)
+        posted, errors = 0, []
+        for i in range(0, len(requests), self.batch_size):
+            batch = requests[i:i + self.batch_size]
+            specs = [{"endpoint": LOG_TRADE_ENDPOINT, "method": "POST", "json_data": request} for _, request in batch]
+            results = send_many(specs)
+            failed = [(order_ids, request, error) for (order_ids, request), (_, error) in zip(batch, results) if error]
+            posted += sum(len(order_ids) for order_ids, _ in batch) - sum(len(order_ids) for order_ids, _, _ in failed)
+            errors += [f"{', '.join(order_ids) or request['instrument_token']}: {error}" for order_ids, request, error in failed]
+            with self._lock:
+                for order_ids, _, _ in failed:
+                    self.posted.difference_update(order_ids)
+            if len(failed) == len(batch):
+                with self._lock:
+                    for order_ids, _ in requests[i + self.batch_size:]:
+                        self.posted.difference_update(order_ids)
+                break
+        return {"posted": posted, "errors": errors}
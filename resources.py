@@ -0,0 +1,32 @@
+"""Process-wide resources the login screen needs: the backend router and the metrics registry.
+
+Everything else lives in ``services`` so that logging in never imports the data
+layer (pandas, plotly, pyarrow).
+"""
+import streamlit as st
+
+from backend_router import BackendRouter
+from metrics import MetricsRegistry
+from settings import BASE_API_URL, SECONDARY_API_URLS
+
+
+@st.cache_resource
+def get_api_client() -> BackendRouter:
+    """Returns the process-wide backend router (pooled clients per backend) shared by all sessions."""
+    router = BackendRouter([BASE_API_URL] + SECONDARY_API_URLS)
+    router.start()
+    return router
+
+
+def validate_access_token(token: str) -> str:
+    """Validates the Upstox access token by hitting the /expiries endpoint.
+
+    Returns ``TOKEN_VALID``, ``TOKEN_INVALID`` or ``BACKEND_UNAVAILABLE``.
+    """
+    return get_api_client().validate_token(token)
+
+
+@st.cache_resource
+def get_metrics() -> MetricsRegistry:
+    """Returns the process-wide latency and render-phase metrics registry."""
+    return MetricsRegistry()
@@ -0,0 +1,134 @@
+"""In-process TTL + LRU cache for VoluGuard API responses.
+
+Market-wide endpoints are cached once per process and shared by every session;
+per-token endpoints (positions, order book) are keyed by token so one user's
+data is never served to another.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+SHARED = "shared"
+PRIVATE = "private"
+
+# endpoint -> (ttl seconds, scope). Endpoints not listed are never cached.
+CACHE_POLICIES = {
+    "/expiries": (4 * 3600, SHARED),
+    "/predict/volatility": (60, SHARED),
+    "/option-seller-dashboard": (30, SHARED),
+    "/full-chain-table": (30, SHARED),
+    "/fetch/option-chain": (30, SHARED),
+    "/suggest/strategy": (60, SHARED),
+    "/calculate/regime": (60, SHARED),
+    # Trade and journal logs are not token-scoped on the backend.
+    "/fetch/trades": (120, SHARED),
+    "/fetch/journals": (300, SHARED),
+    "/live/dashboard": (5, PRIVATE),
+    "/order/book": (5, PRIVATE),
+    "/trades/day": (5, PRIVATE),
+}
+
+# write endpoint -> read endpoints whose cached responses become stale after it succeeds
+_ORDER_READS = ["/live/dashboard", "/order/book", "/trades/day", "/fetch/trades"]
+INVALIDATIONS = {
+    "/log/journal": ["/fetch/journals"],
+    "/log/trade": ["/fetch/trades"],
+    "/place/order": _ORDER_READS,
+    "/place/multileg": _ORDER_READS,
+    "/execute/order": _ORDER_READS,
+    "/place/gtt": ["/order/book"],
+    "/place/gtt-multileg": ["/order/book"],
+}
+
+MAX_ENTRIES = 256
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with per-endpoint TTLs and hit/miss statistics."""
+
+    def __init__(self, policies: dict = None, invalidations: dict = None, max_entries: int = MAX_ENTRIES):
+        self.policies = dict(CACHE_POLICIES if policies is None else policies)
+        self.invalidations = dict(INVALIDATIONS if invalidations is None else invalidations)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+        self._endpoint_stats = {}
+
+    def is_cacheable(self, endpoint: str, method: str = "GET") -> bool:
+        return method == "GET" and endpoint in self.policies
+
+    def make_key(self, endpoint: str, token: str, params: dict = None) -> tuple:
+        """Builds the cache key; the token only participates for private endpoints."""
+        _, scope = self.policies.get(endpoint, (0, PRIVATE))
+        items = tuple(sorted((k, str(v)) for k, v in (params or {}).items() if k != "access_token"))
+        return endpoint, token if scope == PRIVATE else None, items
+
+    def get(self, key: tuple):
+        """Returns the cached value for ``key`` or None on miss/expiry."""
+        endpoint = key[0]
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self._stats["expired"] += 1
+                entry = None
+            self._count(endpoint, entry is not None)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def peek(self, key: tuple):
+        """Like ``get`` but without touching statistics or LRU order (for prefetchers)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None and entry[0] > time.monotonic() else None
+
+    def put(self, key: tuple, value, ttl: float = None):
+        """Stores ``value`` under ``key`` using the endpoint TTL unless ``ttl`` is given."""
+        if ttl is None:
+            ttl = self.policies.get(key[0], (0, PRIVATE))[0]
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, *endpoints: str) -> int:
+        """Drops every cached response for the given endpoints."""
+        targets = set(endpoints)
+        with self._lock:
+            stale = [key for key in self._entries if key[0] in targets]
+            for key in stale:
+                del self._entries[key]
+            self._stats["invalidations"] += len(stale)
+        return len(stale)
+
+    def invalidate_after_write(self, endpoint: str) -> int:
+        """Applies the invalidation policy for a successful write to ``endpoint``."""
+        return self.invalidate(*self.invalidations.get(endpoint, ()))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _count(self, endpoint: str, hit: bool):
+        field = "hits" if hit else "misses"
+        self._stats[field] += 1
+        per_endpoint = self._endpoint_stats.setdefault(endpoint, {"hits": 0, "misses": 0})
+        per_endpoint[field] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                hit_ratio=self._stats["hits"] / lookups if lookups else 0.0,
+                endpoints={k: dict(v) for k, v in self._endpoint_stats.items()},
+            )
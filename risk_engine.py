@@ -0,0 +1,258 @@
+"""Client-side portfolio risk engine.
+
+Builds risk from the positions returned by ``/live/dashboard``: aggregate Greeks,
+per-strategy capital and loss limits with flags, and a spot × IV scenario grid
+revalued in one vectorized pass. Positions whose instrument key is found in
+the local option chain (see ``chain_analytics``), or whose trading symbol
+carries strike, expiry date and type, are fully revalued with Black-Scholes;
+the rest fall back to a delta/gamma/vega/theta expansion. Positions with
+neither a contract nor spot Greeks are unmodelled: they take no part in the
+scenario grid and are flagged, so they can never pass as all-clear.
+
+Quantities are signed: negative for short positions.
+"""
+import re
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from chain_analytics import MIN_T, bs_greeks, bs_price, implied_vol, time_to_expiry
+
+# Share of total funds each strategy may deploy; anything unlisted uses the default.
+STRATEGY_CAPITAL_LIMITS = {
+    "Iron Fly": 0.30,
+    "Iron Condor": 0.30,
+    "Short Straddle": 0.20,
+    "Short Strangle": 0.20,
+    "Bull Put Credit": 0.15,
+    "Bear Call Credit": 0.15,
+    "Jade Lizard": 0.15,
+    "Calendar Spread": 0.15,
+}
+DEFAULT_CAPITAL_LIMIT = 0.10
+RISK_LIMIT_OF_CAPITAL = 0.10  # max scenario loss as a share of the strategy's capital limit
+MAX_EXPOSURE_PCT = 40.0
+
+SPOT_SHOCKS = np.linspace(-0.10, 0.10, 81)  # relative spot moves
+IV_SHOCKS = np.linspace(-10.0, 20.0, 61)  # absolute IV moves, vol points
+
+_NUMERIC = ["quantity", "entry_price", "current_price", "realized_pnl", "unrealized_pnl",
+            "delta", "gamma", "vega", "theta", "capital_used"]
+_SYMBOL_COLUMNS = ("trading_symbol", "tradingsymbol")
+_MONTHS = {name: i for i, name in enumerate(
+    ("JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"), start=1)}
+_WEEKLY_MONTHS = {**{str(i): i for i in range(1, 10)}, "O": 10, "N": 11, "D": 12}
+_SYMBOL_PATTERNS = (
+    # weekly NIFTY2461324000CE: year, month code, day, strike, type
+    re.compile(r"^[A-Z]+(?P<yy>\d{2})(?P<m>[1-9OND])(?P<dd>\d{2})(?P<strike>\d+(?:\.\d+)?)(?P<type>CE|PE)$"),
+    # NIFTY 24000 CE 13 JUN 24
+    re.compile(r"^[A-Z]+ (?P<strike>\d+(?:\.\d+)?) (?P<type>CE|PE) (?P<dd>\d{1,2}) (?P<mon>[A-Z]{3}) (?P<yy>\d{2})$"),
+)
+
+
+def contract_from_symbol(symbol) -> tuple:
+    """``(strike, expiry, is_call)`` from an NSE option trading symbol, or None.
+
+    Upstox instrument keys (``NSE_FO|<token>``) carry no contract terms, and
+    monthly symbols (``NIFTY24JUN24000CE``) no expiry day, so neither is parsed.
+    """
+    if not isinstance(symbol, str):
+        return None
+    symbol = symbol.strip().upper()
+    for pattern in _SYMBOL_PATTERNS:
+        match = pattern.match(symbol)
+        if match is None:
+            continue
+        parts = match.groupdict()
+        month = _MONTHS.get(parts["mon"]) if parts.get("mon") else _WEEKLY_MONTHS[parts["m"]]
+        try:
+            expiry = date(2000 + int(parts["yy"]), month, int(parts["dd"]))
+        except (TypeError, ValueError):
+            return None
+        return float(parts["strike"]), expiry, parts["type"] == "CE"
+    return None
+
+
+def _attach_symbols(df: pd.DataFrame):
+    """Fills strike/t/is_call from trading symbols for positions the chain did not match."""
+    column = next((c for c in _SYMBOL_COLUMNS if c in df), None)
+    if column is None:
+        return
+    missing = df["strike"].isna()
+    contracts = df.loc[missing, column].map(contract_from_symbol).dropna()
+    if contracts.empty:
+        return
+    index = contracts.index
+    df.loc[index, "strike"] = [c[0] for c in contracts]
+    df.loc[index, "t"] = time_to_expiry(pd.Series([c[1] for c in contracts]))
+    df.loc[index, "is_call"] = [c[2] for c in contracts]
+
+
+def position_frame(positions, chain_df: pd.DataFrame = None, spot: float = None) -> pd.DataFrame:
+    """Normalizes positions and attaches strike/expiry/type/IV from the local chain or trading symbol.
+
+    ``positions`` is a list of dicts or an already-columnar frame (left unmodified).
+    The ``unmodelled`` column marks open positions that have neither contract
+    terms (and a solvable IV) nor reported delta/gamma.
+    """
+    df = positions.copy() if isinstance(positions, pd.DataFrame) else pd.DataFrame(positions)
+    if df.empty:
+        return df
+    for column in _NUMERIC:
+        df[column] = pd.to_numeric(df[column], errors="coerce") if column in df else np.nan
+    df["capital_used"] = df["capital_used"].fillna((df["entry_price"] * df["quantity"]).abs())
+    df[_NUMERIC] = df[_NUMERIC].fillna(0.0)
+    if "strategy" not in df:
+        df["strategy"] = df.get("instrument_key", "Unknown")
+    df["strategy"] = df["strategy"].fillna("Unknown")
+    df["strike"], df["t"], df["is_call"], df["iv"] = np.nan, np.nan, False, np.nan
+    if chain_df is not None and not chain_df.empty and "instrument_key" in df:
+        legs = pd.concat([
+            chain_df[["call_key", "strike", "t", "call_feed_iv"]]
+            .rename(columns={"call_key": "instrument_key", "call_feed_iv": "feed_iv"}).assign(is_call=True),
+            chain_df[["put_key", "strike", "t", "put_feed_iv"]]
+            .rename(columns={"put_key": "instrument_key", "put_feed_iv": "feed_iv"}).assign(is_call=False),
+        ]).dropna(subset=["instrument_key"]).drop_duplicates("instrument_key").set_index("instrument_key")
+        matched = df["instrument_key"].map(legs["strike"]).notna()
+        keys = df.loc[matched, "instrument_key"]
+        df.loc[matched, "strike"] = keys.map(legs["strike"]).to_numpy()
+        df.loc[matched, "t"] = keys.map(legs["t"]).to_numpy()
+        df.loc[matched, "is_call"] = keys.map(legs["is_call"]).astype(bool).to_numpy()
+        feed_iv = df["instrument_key"].map(legs["feed_iv"]) / 100.0
+    else:
+        feed_iv = pd.Series(np.nan, index=df.index)
+    _attach_symbols(df)
+    known = df["strike"].notna()
+    if spot and known.any():
+        m = df[known]
+        df.loc[known, "iv"] = implied_vol(
+            m["current_price"].to_numpy(), spot, m["strike"].to_numpy(), m["t"].to_numpy(), m["is_call"].to_numpy()
+        )
+        # a price outside the no-arbitrage bounds implies no IV; the chain's feed IV stands in
+        df["iv"] = df["iv"].fillna(feed_iv.where(feed_iv > 0))
+        # Model Greeks (scaled by quantity) replace the reported ones for revalued positions
+        mask = _modelled(df)
+        if mask.any():
+            m = df[mask]
+            greeks = bs_greeks(spot, m["strike"].to_numpy(), m["t"].to_numpy(), m["iv"].to_numpy(), m["is_call"].to_numpy())
+            for name, values in greeks.items():
+                df.loc[mask, name] = values * m["quantity"].to_numpy()
+    df["unmodelled"] = ~_modelled(df) & (df["delta"] == 0) & (df["gamma"] == 0) & (df["quantity"] != 0)
+    return df
+
+
+def _modelled(df: pd.DataFrame) -> np.ndarray:
+    return (df["strike"].notna() & df["iv"].notna()).to_numpy()
+
+
+def aggregate_greeks(df: pd.DataFrame) -> dict:
+    """Portfolio delta/gamma/vega/theta (position-level, quantity-scaled)."""
+    return {name: float(df[name].sum()) if name in df else 0.0 for name in ("delta", "gamma", "vega", "theta")}
+
+
+def scenario_pnl(df: pd.DataFrame, spot: float, spot_shocks=SPOT_SHOCKS, iv_shocks=IV_SHOCKS, days: float = 0.0) -> np.ndarray:
+    """P&L change per position over the grid: array of shape (positions, spot shocks, IV shocks).
+
+    Unmodelled positions (see ``position_frame``) stay at zero.
+    """
+    n = len(df)
+    pnl = np.zeros((n, len(spot_shocks), len(iv_shocks)))
+    if n == 0 or not spot:
+        return pnl
+    d_spot = spot * np.asarray(spot_shocks)[:, None]  # (S, 1)
+    d_iv = np.asarray(iv_shocks)[None, :]  # (1, V)
+    qty = df["quantity"].to_numpy()
+    mask = _modelled(df)
+    if mask.any():
+        m = df[mask]
+        strike = m["strike"].to_numpy()[:, None, None]
+        t = m["t"].to_numpy()[:, None, None]
+        iv = m["iv"].to_numpy()[:, None, None]
+        is_call = m["is_call"].to_numpy()[:, None, None]
+        now = bs_price(spot, strike, t, iv, is_call)
+        shocked = bs_price(
+            (spot + d_spot)[None, :, :], strike, np.maximum(t - days / 365.0, MIN_T),
+            np.maximum(iv + d_iv[None, :, :] / 100.0, 1e-4), is_call,
+        )
+        pnl[mask] = (shocked - now) * qty[mask][:, None, None]
+    rest = ~mask & ~_unmodelled(df)
+    if rest.any():
+        o = df[rest]
+        taylor = (
+            o["delta"].to_numpy()[:, None, None] * d_spot[None]
+            + 0.5 * o["gamma"].to_numpy()[:, None, None] * d_spot[None] ** 2
+            + o["vega"].to_numpy()[:, None, None] * d_iv[None]
+            + o["theta"].to_numpy()[:, None, None] * days
+        )
+        pnl[rest] = taylor
+    return pnl
+
+
+def _unmodelled(df: pd.DataFrame) -> np.ndarray:
+    return df["unmodelled"].to_numpy(dtype=bool) if "unmodelled" in df else np.zeros(len(df), dtype=bool)
+
+
+def evaluate(df: pd.DataFrame, total_funds: float, spot: float = None, days: float = 0.0):
+    """Computes the risk report.
+
+    Returns ``(portfolio, summary_df, grid)`` where ``portfolio`` and
+    ``summary_df`` use the same keys/columns as the backend's ``/evaluate/risk``
+    response and ``grid`` is the portfolio P&L over (spot shocks, IV shocks).
+    ``portfolio["Unmodelled Positions"]`` lists the instrument keys the grid
+    leaves out; any of them adds a flag.
+    """
+    total_funds = float(total_funds or 0.0)
+    pnl = scenario_pnl(df, spot, days=days)
+    grid = pnl.sum(axis=0)
+    rows, flags = [], []
+    if not df.empty:
+        strategies = df["strategy"].to_numpy()
+        for strategy in pd.unique(strategies):
+            mask = strategies == strategy
+            group = df[mask]
+            cap_limit = total_funds * STRATEGY_CAPITAL_LIMITS.get(strategy, DEFAULT_CAPITAL_LIMIT)
+            risk_limit = cap_limit * RISK_LIMIT_OF_CAPITAL
+            capital = float(group["capital_used"].sum())
+            potential_risk = max(0.0, -float(pnl[mask].sum(axis=0).min()))
+            rows.append({
+                "Strategy": strategy,
+                "Capital Used": capital,
+                "Cap Limit": cap_limit,
+                "% Used": capital / cap_limit * 100 if cap_limit else 0.0,
+                "Potential Risk": potential_risk,
+                "Risk Limit": risk_limit,
+                "Realized P&L": float(group["realized_pnl"].sum()),
+                "Unrealized P&L": float(group["unrealized_pnl"].sum()),
+                "Vega": float(group["vega"].sum()),
+            })
+            if capital > cap_limit:
+                flags.append(f"❌ {strategy} exceeds capital limit (₹{capital:.0f} > ₹{cap_limit:.0f})")
+            if potential_risk > risk_limit:
+                flags.append(f"⚠️ {strategy} scenario loss ₹{potential_risk:.0f} exceeds risk limit ₹{risk_limit:.0f}")
+    summary_df = pd.DataFrame(rows)
+    capital_deployed = float(summary_df["Capital Used"].sum()) if rows else 0.0
+    exposure = capital_deployed / total_funds * 100 if total_funds else 0.0
+    if exposure > MAX_EXPOSURE_PCT:
+        flags.append(f"⚠️ Exposure {exposure:.1f}% above {MAX_EXPOSURE_PCT:.0f}% limit")
+    unmodelled = []
+    if not df.empty:
+        unmodelled = df.get("instrument_key", df["strategy"])[_unmodelled(df)].astype(str).tolist()
+    if unmodelled:
+        flags.append(f"⚠️ {len(unmodelled)} position(s) without contract terms or Greeks are left out of scenario risk")
+    if not flags:
+        flags.append("✅ All strategies within capital and risk limits")
+    greeks = aggregate_greeks(df)
+    portfolio = {
+        "Total Funds": total_funds,
+        "Capital Deployed": capital_deployed,
+        "Exposure Percent": exposure,
+        "Risk on Table": float(summary_df["Potential Risk"].sum()) if rows else 0.0,
+        "Total Vega Exposure": greeks["vega"],
+        "Total Delta": greeks["delta"],
+        "Total Gamma": greeks["gamma"],
+        "Total Theta": greeks["theta"],
+        "Unmodelled Positions": unmodelled,
+        "Flags": flags,
+    }
+    return portfolio, summary_df, grid
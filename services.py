@@ -0,0 +1,535 @@
+"""Data layer shared by the dashboard pages: process-wide caches and stores, the
+request path (shared market state, response cache, metrics) and background work.
+
+Imported only once a session is logged in; every page module builds on it.
+Safe to use from worker threads unless a function reads ``st.session_state``.
+"""
+import atexit
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import requests
+import streamlit as st
+
+from alerts import RULES_SETTING, WEBHOOK_SETTING, AlertRule, AlertService, alert_inputs, owner_key, risk_flags
+from backtest import TEMPLATES_SETTING, backtest_store, strategy_template
+from journal_index import JournalIndex, JournalResults
+from journal_io import EXPORT_BATCH_SIZE, export_journals, post_journals
+from local_store import DEFAULT_STORE_PATH, LocalStore
+from market_feed import FeedManager
+from market_state import MarketStateService
+from order_pipeline import IdempotencyRegistry, OrderPipeline
+from prefetch import MIN_PREFETCH_TTL_SECONDS, PrefetchScheduler, RateLimiter
+from reconciliation import DAY_TRADES_ENDPOINT, ORDER_BOOK_ENDPOINT, Reconciler
+from resources import get_api_client, get_metrics
+from response_cache import ResponseCache
+from settings import NAV_TABS, SESSION_STATE_KEY
+from snapshot_store import DEFAULT_SNAPSHOT_DIR, SnapshotRecorder, SnapshotStore
+from strategy_details import DETAILS_TTL, details_key, details_request, snapshot_id
+from term_structure import EXPIRIES_ENDPOINT, ChainBook, ExpiryAnalyticsCache, chain_request, expiry_dates
+from trade_log import DEFAULT_FIELDS as TRADE_FIELDS, TRADES_ENDPOINT, TradeLogStore, TradeQuery
+from wire_format import accept_header, decode as decode_payload, records
+
+LOCAL_STORE_PATH = os.environ.get("VOLUGUARD_STORE_PATH", DEFAULT_STORE_PATH)
+SNAPSHOT_DIR = os.environ.get("VOLUGUARD_SNAPSHOT_DIR", DEFAULT_SNAPSHOT_DIR)
+RECORD_SNAPSHOTS = os.environ.get("VOLUGUARD_RECORD_SNAPSHOTS", "1") != "0"
+POLL_MARKET_STATE = os.environ.get("VOLUGUARD_POLL_MARKET_STATE", "1") != "0"
+ALERT_WEBHOOK_URL = os.environ.get("VOLUGUARD_ALERT_WEBHOOK")
+JOURNALS_ENDPOINT = "/fetch/journals"
+LIVE_ENDPOINT = "/live/dashboard"
+FANOUT_WORKERS = 8
+
+
+@st.cache_resource
+def get_request_executor() -> ThreadPoolExecutor:
+    """Returns the process-wide worker pool used to fan out independent API calls."""
+    return ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="api-fanout")
+
+
+@st.cache_resource
+def get_response_cache() -> ResponseCache:
+    """Returns the process-wide response cache shared by all sessions."""
+    return ResponseCache()
+
+
+@st.cache_resource
+def get_market_state() -> MarketStateService:
+    """Returns the process-wide market-state service: one poller for the market-wide endpoints, shared by all sessions."""
+    return MarketStateService(lambda token, endpoint: _fetch(token, endpoint), poll=POLL_MARKET_STATE)
+
+
+@st.cache_resource
+def get_local_store() -> LocalStore:
+    """Returns the process-wide SQLite mirror of trades and journals."""
+    return LocalStore(LOCAL_STORE_PATH)
+
+
+@st.cache_resource
+def get_journal_index() -> JournalIndex:
+    """Returns the process-wide search index over the locally mirrored journal."""
+    return JournalIndex(get_local_store())
+
+
+@st.cache_resource
+def get_trade_log_store() -> TradeLogStore:
+    """Returns the process-wide incremental trade log cache, persisted to the local store."""
+    return TradeLogStore(store=get_local_store())
+
+
+@st.cache_resource
+def get_snapshot_store() -> SnapshotStore:
+    """Returns the process-wide Parquet store of recorded dashboard and chain snapshots."""
+    store = SnapshotStore(SNAPSHOT_DIR)
+    # the recorder is a daemon thread, so buffered samples are written out when the process exits
+    atexit.register(store.flush)
+    return store
+
+
+@st.cache_resource
+def get_snapshot_recorder() -> SnapshotRecorder:
+    """Returns the process-wide background recorder sampling the market endpoints into the snapshot store."""
+    return SnapshotRecorder(get_snapshot_store(), lambda token, endpoint: _send_request(token, endpoint),
+                            get_market_state().live_tokens)
+
+
+def _send_request(token: str, endpoint: str, method: str = "GET", params: dict = None, json_data: dict = None):
+    """Sends one API request for the given token, serving cacheable GETs from the response cache.
+
+    Market-wide endpoints are answered from the shared market state instead.
+    Safe to call from worker threads.
+    """
+    market = get_market_state()
+    if market.handles(endpoint, method, params):
+        return market.get(endpoint, token)
+    cache = get_response_cache()
+    if cache.is_cacheable(endpoint, method):
+        key = cache.make_key(endpoint, token, params)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached, None
+        data, error = _fetch(token, endpoint, method=method, params=params)
+        if error is None:
+            cache.put(key, data)
+        return data, error
+    data, error = _fetch(token, endpoint, method=method, params=params, json_data=json_data)
+    if error is None and method != "GET":
+        cache.invalidate_after_write(endpoint)
+        if TRADES_ENDPOINT in cache.invalidations.get(endpoint, ()):
+            get_trade_log_store().invalidate()
+    return data, error
+
+
+def _fetch(token: str, endpoint: str, method: str = "GET", params: dict = None, json_data: dict = None):
+    """Performs the HTTP round trip and maps failures to the (data, error) contract.
+
+    Latency, payload size and decode time are recorded in the metrics registry.
+    """
+    params = dict(params or {})
+    params["access_token"] = token
+    client = get_api_client()
+    metrics = get_metrics()
+    start = time.perf_counter()
+    response = None
+    try:
+        accept = accept_header(endpoint)
+        headers = {"Accept": accept} if accept else None
+        if method == "GET":
+            response = client.get(endpoint, params=params, headers=headers)
+        elif method == "POST":
+            response = client.post(endpoint, params=params, json_data=json_data, headers=headers)
+        else:
+            return None, f"Unsupported method: {method}"
+        latency = time.perf_counter() - start
+        response.raise_for_status()
+        decode_start = time.perf_counter()
+        data = decode_payload(response.headers.get("Content-Type"), response.content)
+        metrics.record_request(endpoint, method, response.status_code, latency, len(response.content),
+                               time.perf_counter() - decode_start)
+        return data, None
+    except requests.HTTPError as e:
+        metrics.record_request(endpoint, method, e.response.status_code, latency, len(e.response.content), error=True)
+        return None, f"API Error: {e.response.status_code} - {e.response.text}"
+    except requests.RequestException as e:
+        metrics.record_request(endpoint, method, None, time.perf_counter() - start, error=True)
+        return None, f"Network Error: {str(e)}"
+    except ValueError as e:
+        metrics.record_request(endpoint, method, response.status_code, latency, len(response.content), error=True)
+        return None, f"Decode Error: {str(e)}"
+
+
+def api_request(endpoint: str, method: str = "GET", params: dict = None, json_data: dict = None):
+    """Makes an API request with the access token."""
+    token = st.session_state.get(SESSION_STATE_KEY)
+    if not token:
+        return None, "Please enter a valid access token."
+    return _send_request(token, endpoint, method=method, params=params, json_data=json_data)
+
+
+def api_request_many(calls: list) -> list:
+    """Runs independent API requests concurrently.
+
+    Each call is an endpoint string or a dict of ``api_request`` keyword arguments.
+    Returns one ``(data, error)`` tuple per call, in order; a failing call never
+    affects the others.
+    """
+    token = st.session_state.get(SESSION_STATE_KEY)
+    if not token:
+        return [(None, "Please enter a valid access token.")] * len(calls)
+    specs = [{"endpoint": call} if isinstance(call, str) else call for call in calls]
+    if len(specs) == 1:
+        return [_send_request(token, **specs[0])]
+    futures = [get_request_executor().submit(_send_request, token, **spec) for spec in specs]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append((None, f"Client Error: {str(e)}"))
+    return results
+
+
+def fetch_trade_page(token: str, params: dict = None):
+    """Fetches one ``/fetch/trades`` page for ``TradeLogStore`` syncs, bypassing the response cache.
+
+    The trade log store keeps its own watermarks and pages, so a cached page would only hide new rows.
+    """
+    return _fetch(token, TRADES_ENDPOINT, params=params)
+
+
+def get_strategy_details(strategies: list, snapshot: str) -> dict:
+    """Returns 1-lot ``(details, error)`` per strategy, fetching uncached ones concurrently."""
+    cache = get_response_cache()
+    results = {}
+    for strategy in strategies:
+        cached = cache.get(details_key(strategy, snapshot))
+        if cached is not None:
+            results[strategy] = (cached, None)
+    missing = [strategy for strategy in strategies if strategy not in results]
+    responses = api_request_many([details_request(strategy) for strategy in missing]) if missing else []
+    for strategy, (details, error) in zip(missing, responses):
+        if error is None and details:
+            cache.put(details_key(strategy, snapshot), details, ttl=DETAILS_TTL)
+        results[strategy] = (details, error)
+    return results
+
+
+def strategy_templates() -> dict:
+    """Leg structures of the strategies seen on the suggestions page, keyed by name, for backtests."""
+    return get_local_store().setting(TEMPLATES_SETTING, {})
+
+
+def remember_strategy_templates(strategy_leg_frames: dict, option_chain):
+    """Stores each resolved strategy's leg structure against the chain's ATM strike; writes only on change."""
+    strikes, spot = option_chain["strike"].dropna(), float(option_chain["spot"].iloc[0])
+    if strikes.empty or not spot > 0:
+        return
+    atm = float(strikes.iloc[(strikes - spot).abs().argmin()])
+    fresh = {name: strategy_template(legs, atm) for name, legs in strategy_leg_frames.items() if not legs.empty}
+    store = get_local_store()
+    templates = store.setting(TEMPLATES_SETTING, {})
+    if any(templates.get(name) != legs for name, legs in fresh.items()):
+        store.set_setting(TEMPLATES_SETTING, {**templates, **fresh})
+
+
+def backtest_recorded(start: date = None, end: date = None, suggested_only: bool = True, progress=None) -> dict:
+    """Backtests the remembered strategies over the recorded snapshots (see ``backtest.backtest_store``)."""
+    store = get_snapshot_store()
+    store.flush()  # worker processes read only flushed partitions
+    return backtest_store(store.root, strategy_templates(), start, end, suggested_only, progress=progress)
+
+
+@st.cache_resource
+def get_expiry_analytics() -> ExpiryAnalyticsCache:
+    """Returns the process-wide memo of per-expiry chain analytics, shared by all sessions."""
+    return ExpiryAnalyticsCache()
+
+
+def available_expiries():
+    """Returns ``(expiries, error)`` from ``/expiries``, nearest first."""
+    data, error = api_request(EXPIRIES_ENDPOINT)
+    return expiry_dates(data), error
+
+
+def load_chain_book(expiries: list):
+    """Fetches the chains for ``expiries`` concurrently; returns ``(book, errors)``.
+
+    Expiries that failed are missing from the book and listed in ``errors``.
+    """
+    responses = api_request_many([chain_request(expiry) for expiry in expiries])
+    errors = [f"{expiry}: {error}" for expiry, (_, error) in zip(expiries, responses) if error]
+    loaded = [(expiry, data) for expiry, (data, error) in zip(expiries, responses) if not error]
+    return ChainBook.from_responses([e for e, _ in loaded], [d for _, d in loaded]), errors
+
+
+@st.cache_resource
+def get_feed_manager() -> FeedManager:
+    """Returns the process-wide streaming feed manager; the market feed uses the newest live session's token."""
+    return FeedManager(_send_request, tokens=get_market_state().live_tokens)
+
+
+@st.cache_resource
+def get_idempotency_registry() -> IdempotencyRegistry:
+    """Returns the process-wide registry that suppresses duplicate order submissions."""
+    return IdempotencyRegistry()
+
+
+def get_order_pipeline() -> OrderPipeline:
+    """Builds an order pipeline bound to the current session's token."""
+    return OrderPipeline(
+        lambda endpoint, method, json_data: api_request(endpoint, method=method, json_data=json_data),
+        api_request_many,
+        get_idempotency_registry(),
+    )
+
+
+def available_funds():
+    """Free funds from the live portfolio, or None when unavailable."""
+    data, error = api_request("/live/dashboard")
+    if error or not data:
+        return None
+    portfolio = data.get("portfolio", {})
+    return portfolio.get("total_funds", 0) - portfolio.get("capital_deployed", 0)
+
+
+@st.cache_resource
+def get_reconcilers() -> dict:
+    """Returns the process-wide order-book reconcilers, keyed by ``owner_key`` of the token."""
+    return {}
+
+
+def get_reconciler() -> Reconciler:
+    """Returns the reconciler for this session's token, creating it on first use.
+
+    Every session of a token shares it, so a fill is posted at most once per process.
+    """
+    reconcilers = get_reconcilers()
+    key = owner_key(st.session_state[SESSION_STATE_KEY])
+    if key not in reconcilers:
+        # sessions that expired without logging out leave their reconcilers behind
+        live = {owner_key(token) for token in get_market_state().live_tokens()}
+        for stale in [k for k in reconcilers if k not in live]:
+            reconcilers.pop(stale, None)
+    return reconcilers.setdefault(key, Reconciler())
+
+
+def release_reconciler(token: str):
+    """Drops ``token``'s reconciler on logout unless another live session still uses the token."""
+    if token not in get_market_state().live_tokens():
+        get_reconcilers().pop(owner_key(token), None)
+
+
+def reconcile_trades(force: bool = False, auto_post: bool = False):
+    """Polls the order book and day trades and reconciles them against today's logged trades.
+
+    Returns ``(report, error)``. The report is the last one computed, so a throttled
+    poll re-serves it without any request. With ``auto_post`` unlogged fills are
+    sent to ``/log/trade`` and the report gains a ``post`` entry.
+    """
+    reconciler = get_reconciler()
+    if force:
+        get_response_cache().invalidate(ORDER_BOOK_ENDPOINT, DAY_TRADES_ENDPOINT)
+    polled, error = reconciler.poll(api_request_many, force=force)
+    if error or not (polled or reconciler.report is None):
+        return reconciler.report, error
+    token = st.session_state[SESSION_STATE_KEY]
+    fetch_trades = lambda params: fetch_trade_page(token, params)
+    today = get_trade_log_store().for_query(TradeQuery(start_date=date.today()))
+    held = get_trade_log_store().for_query(TradeQuery(status="open", fields=TRADE_FIELDS))
+    recent = get_trade_log_store().for_query(TradeQuery(fields=TRADE_FIELDS))  # shared with the Trade Log tab
+    for trade_cache in (today, held, recent):
+        error = trade_cache.sync_new(fetch_trades, force=force)
+        if error:
+            return reconciler.report, error
+    error = today.backfill(fetch_trades, date.today().isoformat())
+    if error:
+        return reconciler.report, error
+    # older rows that today's fills closed carry their order-id tags too
+    closed = [row for row in records(recent.frame()) if row.get("status") == "closed"
+              and str(row.get("timestamp_exit") or "").startswith(date.today().isoformat())]
+    report = reconciler.reconcile(records(today.frame()), records(held.frame()) + closed)
+    if auto_post and report["unlogged"]:
+        report["post"] = reconciler.post_unlogged(api_request_many, report["unlogged"])
+    return report, None
+
+
+def collect_alert_inputs(token: str, state: dict, cache: ResponseCache, market: MarketStateService,
+                         feed: FeedManager) -> dict:
+    """Alert inputs for ``token`` from the feed and already-cached snapshots; never fetches.
+
+    The last ``/live/dashboard`` and ``/fetch/option-chain`` seen are kept in
+    ``state`` so positions outlive the 5 s cache entry, and risk flags are
+    recomputed only when either changes. Safe to call from worker threads.
+    """
+    live = cache.peek(cache.make_key(LIVE_ENDPOINT, token))
+    chain = cache.peek(cache.make_key("/fetch/option-chain", token))
+    changed = (live is not None and live is not state.get("live")) or (chain is not None and chain is not state.get("chain"))
+    state["live"] = live if live is not None else state.get("live")
+    state["chain"] = chain if chain is not None else state.get("chain")
+    if changed and state["live"] is not None:
+        state["flags"] = risk_flags(state["live"], state["chain"])
+    return alert_inputs(
+        state.get("live"), market.peek("/option-seller-dashboard"), market.peek("/predict/volatility"),
+        feed.snapshot(token), state.get("flags"),
+    )
+
+
+def _alert_settings(store: LocalStore, token: str) -> tuple:
+    owner = owner_key(token)
+    rules = [AlertRule.from_dict(rule) for rule in store.setting(f"{RULES_SETTING}:{owner}", [])]
+    return rules, store.setting(f"{WEBHOOK_SETTING}:{owner}")
+
+
+@st.cache_resource
+def get_alert_service() -> AlertService:
+    """Returns the process-wide alert monitor; each token's rules and webhook are loaded from the local store."""
+    store = get_local_store()
+    # resources are bound here because the monitor thread has no script context
+    cache, market, feed = get_response_cache(), get_market_state(), get_feed_manager()
+    return AlertService(
+        lambda token, state: collect_alert_inputs(token, state, cache, market, feed),
+        lambda token: _alert_settings(store, token),
+        default_webhook=ALERT_WEBHOOK_URL,
+    )
+
+
+def save_alert_settings(token: str, rules: list, webhook_url: str = None):
+    """Applies and persists ``token``'s alert rules and webhook URL; raises ``ValueError`` for a non-local webhook."""
+    get_alert_service().set_rules(token, rules, webhook_url)
+    owner = owner_key(token)
+    store = get_local_store()
+    store.set_setting(f"{RULES_SETTING}:{owner}", [rule.to_dict() for rule in rules])
+    store.set_setting(f"{WEBHOOK_SETTING}:{owner}", webhook_url or None)
+
+
+def sync_journals(token: str):
+    """Mirrors journal entries newer than the local watermark into the local store.
+
+    Returns an error string when the backend is unreachable; reads keep working
+    from the local store either way. Safe to call from worker threads.
+    """
+    store = get_local_store()
+    watermark = store.watermark("journals")
+    data, error = _send_request(token, JOURNALS_ENDPOINT, params={"since": watermark} if watermark else None)
+    if error:
+        return error
+    # entries sharing the watermark's timestamp may arrive in a later sync; the upsert dedups on key
+    fresh = [j for j in (data or {}).get("journals", []) if (j.get("timestamp") or "") >= (watermark or "")]
+    if fresh:
+        store.upsert_journals(fresh)
+        new_watermark = max(j.get("timestamp") or "" for j in fresh)
+        store.set_watermark("journals", new_watermark)
+        # nothing is newer than what was just received, so the next sync can be answered locally until the entry
+        # expires; later entries stamped with the watermark itself are picked up then
+        cache = get_response_cache()
+        cache.put(cache.make_key(JOURNALS_ENDPOINT, token, {"since": new_watermark}), {"journals": []})
+    return None
+
+
+def search_journals(text: str = None, mood: str = None, tag: str = None, start: date = None,
+                    end: date = None) -> JournalResults:
+    """Searches the local journal mirror, first indexing any entries written since the last search."""
+    index = get_journal_index()
+    index.refresh()
+    return index.search(text, mood=mood, tag=tag, start=start, end=end)
+
+
+def import_journals(entries: list, progress=None) -> dict:
+    """Logs ``entries`` through ``/log/journal`` in batches and shows the accepted ones as pending."""
+    result = post_journals(api_request_many, entries, progress=progress)
+    if result["accepted"]:
+        get_local_store().add_pending_journals(result["accepted"])
+    return result
+
+
+def journal_export(results: JournalResults, fmt: str):
+    """Returns a no-argument callable building the export of ``results``.
+
+    The store is bound here because Streamlit runs download callables off the script thread.
+    """
+    store = get_local_store()
+    pages = lambda: (store.journal_payloads(results.keys(offset, EXPORT_BATCH_SIZE))
+                     for offset in range(0, results.total, EXPORT_BATCH_SIZE))
+    return lambda: export_journals(pages(), fmt)
+
+
+@st.cache_resource
+def get_prefetch_limiter() -> RateLimiter:
+    """Returns the process-wide rate limit shared by every session's prefetcher."""
+    return RateLimiter()
+
+
+def _prefetch_ttl(endpoint: str) -> float:
+    market = get_market_state()
+    if market.handles(endpoint):
+        return market.intervals[endpoint]
+    return get_response_cache().policies.get(endpoint, (0, None))[0]
+
+
+def _prefetch_endpoint(token: str, endpoint: str, acquire):
+    market = get_market_state()
+    if market.handles(endpoint):
+        if market.peek(endpoint) is not None or not acquire():
+            return None
+        return market.get(endpoint, token)[1]
+    cache = get_response_cache()
+    if cache.peek(cache.make_key(endpoint, token)) is not None or not acquire():
+        return None
+    return _send_request(token, endpoint)[1]
+
+
+def prefetch_loaders(token: str) -> dict:
+    """Background loaders per tab, matching the data each tab reads on render.
+
+    Each loader charges the rate limit once per backend request it sends.
+    Endpoints cached for less than ``MIN_PREFETCH_TTL_SECONDS`` are left out.
+    """
+    def endpoints(*names):
+        return [(name, lambda acquire, name=name: _prefetch_endpoint(token, name, acquire))
+                for name in names if _prefetch_ttl(name) >= MIN_PREFETCH_TTL_SECONDS]
+
+    def strategy_details(acquire):
+        error = _prefetch_endpoint(token, "/suggest/strategy", acquire)
+        cache = get_response_cache()
+        suggestion = cache.peek(cache.make_key("/suggest/strategy", token))
+        if error or not suggestion:
+            return error
+        snapshot = snapshot_id(suggestion)
+        for strategy in suggestion.get("strategies", []):
+            if cache.peek(details_key(strategy, snapshot)) is None:
+                if not acquire():
+                    return None
+                details, error = _send_request(token, **details_request(strategy))
+                if error:
+                    return error
+                cache.put(details_key(strategy, snapshot), details, ttl=DETAILS_TTL)
+        return None
+
+    def sync_trades(acquire):
+        # the Trade Log tab opens on the unfiltered query with the default columns
+        trade_cache = get_trade_log_store().for_query(TradeQuery(fields=TRADE_FIELDS))
+        return trade_cache.sync_new(
+            lambda params: fetch_trade_page(token, params) if acquire() else (None, "Prefetch cancelled")
+        )
+
+    # /live/dashboard (5 s) would expire before the Live Dashboard or Risk Evaluation tab is opened
+    return {
+        "Live Dashboard": endpoints("/live/dashboard", "/predict/volatility"),
+        "Market Dashboard": endpoints("/option-seller-dashboard", "/predict/volatility"),
+        "Strategy Suggestions": [("/strategy/details", strategy_details)]
+                                + endpoints("/predict/volatility", "/fetch/option-chain"),
+        "Risk Evaluation": endpoints("/live/dashboard", "/fetch/option-chain"),
+        "Option Chain": endpoints("/full-chain-table", "/fetch/option-chain"),
+        "Trade Log": [(TRADES_ENDPOINT, sync_trades)],
+        "Journal": [(JOURNALS_ENDPOINT, lambda acquire: sync_journals(token) if acquire() else None)],
+    }
+
+
+def get_prefetcher() -> PrefetchScheduler:
+    """Returns this session's prefetch scheduler, creating it on first use."""
+    if "prefetcher" not in st.session_state:
+        st.session_state["prefetcher"] = PrefetchScheduler(
+            prefetch_loaders(st.session_state[SESSION_STATE_KEY]), get_prefetch_limiter(), default_order=NAV_TABS
+        )
+    return st.session_state["prefetcher"]
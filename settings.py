@@ -0,0 +1,14 @@
+"""Deployment settings and session-state keys shared by the app shell and its pages.
+
+Kept free of heavy imports: the login screen needs this module and nothing
+from the data layer.
+"""
+import os
+
+BASE_API_URL = os.environ.get("VOLUGUARD_API_URL", "https://golu-8xwd.onrender.com")  # Real API URL
+# Optional failover backends, comma-separated, tried after the primary when it is unhealthy or slower
+SECONDARY_API_URLS = [url.strip() for url in os.environ.get("VOLUGUARD_API_SECONDARY_URLS", "").split(",") if url.strip()]
+SESSION_STATE_KEY = "access_token"
+MARKET_SESSION_KEY = "market_session"  # this session's id in the shared market-state service
+NAV_TABS = ["Live Dashboard", "Market Dashboard", "Strategy Suggestions", "Risk Evaluation", "Option Chain", "Trade Log", "Journal"]
+NAV_TAB_KEY = "nav_tab"  # optional session-state override of the initial tab
@@ -0,0 +1,349 @@
+"""Recorder and time-series store for dashboard, forecast and chain snapshots.
+
+``SnapshotRecorder`` samples ``/option-seller-dashboard`` and
+``/predict/volatility`` (the ``metrics`` dataset, one flat row per sample) and
+``/full-chain-table`` (the ``chain`` dataset, one row per strike per sample) on
+a schedule during market hours. ``/suggest/strategy`` is sampled with the chain
+(the ``suggestions`` dataset: regime, score and the suggested strategies), so
+suggestions can be backtested later.
+
+``SnapshotStore`` keeps each dataset append-only as zstd-compressed Parquet,
+partitioned by IST trading date::
+
+    <root>/<dataset>/date=YYYY-MM-DD/part-<HHMMSS>-<n>.parquet
+
+Samples are buffered and flushed as small part files (and once more when the
+app exits), and finished days are compacted into a single file. A range query therefore reads one file per day
+and only the requested columns. ``resample`` and ``downsample`` shrink long
+histories to what a chart can show.
+"""
+import glob
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from backend_router import IST, in_market_hours
+from market_state import AUTH_STATUSES
+from wire_format import as_frame
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow ships with streamlit
+    pa = pq = None
+
+DEFAULT_SNAPSHOT_DIR = os.path.join(os.path.expanduser("~"), ".voluguard", "snapshots")
+METRICS = "metrics"
+CHAIN = "chain"
+SUGGESTIONS = "suggestions"
+DATASETS = (METRICS, CHAIN, SUGGESTIONS)
+STRATEGY_SEPARATOR = "|"
+METRICS_INTERVAL_SECONDS = 60
+CHAIN_INTERVAL_SECONDS = 300
+FLUSH_INTERVAL_SECONDS = 300  # buffered samples are written at least this often, and at exit
+COMPRESSION = "zstd"
+CHART_POINTS = 600
+VOLATILITY_PREFIX = "vol_"
+
+
+def _numeric_fields(payload: dict, prefix: str = "") -> dict:
+    """Top-level numeric scalars of a payload (nested objects and strings are skipped)."""
+    return {
+        f"{prefix}{key}": float(value)
+        for key, value in (payload or {}).items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+
+
+def metrics_row(dashboard: dict, volatility: dict, ts: datetime) -> dict:
+    """One ``metrics`` sample; forecast inputs are prefixed so they never clash with dashboard fields."""
+    row = {"ts": ts}
+    row.update(_numeric_fields(dashboard))
+    row.update(_numeric_fields(volatility, VOLATILITY_PREFIX))
+    return row
+
+
+def suggestion_row(suggestion: dict, ts: datetime) -> dict:
+    """One ``suggestions`` sample; the strategy list is stored as one ``|``-separated string."""
+    score = suggestion.get("score")
+    return {
+        "ts": ts,
+        "regime": str(suggestion.get("regime") or ""),
+        "score": float(score) if isinstance(score, (int, float)) and not isinstance(score, bool) else np.nan,
+        "strategies": STRATEGY_SEPARATOR.join(str(s) for s in suggestion.get("strategies") or []),
+    }
+
+
+def chain_rows(table, ts: datetime) -> pd.DataFrame:
+    """One ``chain`` sample from a ``/full-chain-table`` payload (row dicts or a columnar frame)."""
+    df = as_frame(table).copy()
+    df.insert(0, "ts", pd.Timestamp(ts))
+    return df
+
+
+class SnapshotStore:
+    """Append-only, date-partitioned Parquet store with buffered writes."""
+
+    def __init__(self, root: str = DEFAULT_SNAPSHOT_DIR, flush_interval: float = FLUSH_INTERVAL_SECONDS):
+        if pq is None:
+            raise RuntimeError("pyarrow is required for the snapshot store")
+        self.root = root
+        self.flush_interval = flush_interval
+        self._buffers = {}
+        self._last_flush = time.monotonic()
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    # --- Writes ---
+    def append(self, dataset: str, rows: pd.DataFrame):
+        """Buffers rows (with a tz-aware ``ts`` column); flushes when the buffer is old enough."""
+        if rows is None or rows.empty:
+            return
+        with self._lock:
+            self._buffers.setdefault(dataset, []).append(rows)
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Writes buffered rows as one part file per dataset and trading date."""
+        with self._lock:
+            buffers, self._buffers = self._buffers, {}
+            self._last_flush = time.monotonic()
+        for dataset, frames in buffers.items():
+            df = pd.concat(frames, ignore_index=True)
+            trading_date = df["ts"].dt.tz_convert(IST).dt.date
+            for day, part in df.groupby(trading_date):
+                self._write(dataset, day, part)
+
+    def _write(self, dataset: str, day: date, df: pd.DataFrame, name: str = None):
+        folder = self._partition(dataset, day)
+        os.makedirs(folder, exist_ok=True)
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+        name = name or f"part-{datetime.now(IST):%H%M%S}-{os.getpid()}-{seq}.parquet"
+        path = os.path.join(folder, name)
+        tmp = f"{path}.tmp"
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp, compression=COMPRESSION)
+        os.replace(tmp, path)  # readers never see a half-written file
+
+    def _partition(self, dataset: str, day: date) -> str:
+        return os.path.join(self.root, dataset, f"date={day.isoformat()}")
+
+    def compact(self, dataset: str, day: date) -> bool:
+        """Merges a day's part files, and its earlier day file if any, into one; returns True when anything was merged.
+
+        Parts can land in an already compacted day (a restart flushing late rows,
+        or a second process), so the existing day file is part of the merge input.
+        """
+        folder = self._partition(dataset, day)
+        parts = sorted(glob.glob(os.path.join(folder, "part-*.parquet")))
+        merged = sorted(glob.glob(os.path.join(folder, "day-*.parquet")))
+        if not parts or len(parts) + len(merged) < 2:
+            return False
+        name = f"day-{day.isoformat()}.parquet"
+        df = self._read_files(merged + parts, None).sort_values("ts", kind="stable")
+        self._write(dataset, day, df, name=name)
+        for path in parts + merged:
+            if os.path.basename(path) != name:
+                os.remove(path)
+        return True
+
+    def compact_before(self, day: date) -> int:
+        """Compacts every finished trading day older than ``day`` in every dataset."""
+        merged = 0
+        for dataset in DATASETS:
+            for folder in glob.glob(os.path.join(self.root, dataset, "date=*")):
+                folder_day = date.fromisoformat(folder.rsplit("=", 1)[1])
+                if folder_day < day and self.compact(dataset, folder_day):
+                    merged += 1
+        return merged
+
+    # --- Reads ---
+    def _read_files(self, files: list, columns: list) -> pd.DataFrame:
+        tables = []
+        for path in files:
+            wanted = None
+            if columns:
+                available = set(pq.read_schema(path).names)
+                wanted = ["ts"] + [c for c in columns if c in available and c != "ts"]
+            tables.append(pq.read_table(path, columns=wanted))
+        if not tables:
+            return pd.DataFrame()
+        # fields come and go as the backend evolves; missing columns read back as nulls
+        return pa.concat_tables(tables, promote_options="permissive").to_pandas()
+
+    def days(self, dataset: str, start: date = None, end: date = None) -> list:
+        """Trading dates with flushed data in ``dataset``, oldest first, optionally within ``[start, end]``."""
+        found = sorted(
+            date.fromisoformat(folder.rsplit("=", 1)[1])
+            for folder in glob.glob(os.path.join(self.root, dataset, "date=*"))
+            if glob.glob(os.path.join(folder, "*.parquet"))
+        )
+        return [day for day in found if (start is None or day >= start) and (end is None or day <= end)]
+
+    def query(self, dataset: str, start: datetime, end: datetime, columns: list = None) -> pd.DataFrame:
+        """Rows with ``start <= ts <= end`` (flushed and still-buffered), sorted and indexed by ``ts``."""
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        start = start.tz_localize(IST) if start.tzinfo is None else start
+        end = end.tz_localize(IST) if end.tzinfo is None else end
+        files = []
+        day = start.tz_convert(IST).date()
+        while day <= end.tz_convert(IST).date():
+            files += sorted(glob.glob(os.path.join(self._partition(dataset, day), "*.parquet")))
+            day += timedelta(days=1)
+        df = self._read_files(files, columns)
+        with self._lock:
+            pending = list(self._buffers.get(dataset, []))
+        if pending:
+            buffered = pd.concat(pending, ignore_index=True)
+            if columns:
+                buffered = buffered[["ts"] + [c for c in columns if c in buffered and c != "ts"]]
+            df = pd.concat([df, buffered], ignore_index=True) if not df.empty else buffered
+        if df.empty:
+            return df
+        df = df[(df["ts"] >= start) & (df["ts"] <= end)]
+        return df.sort_values("ts", kind="stable").set_index("ts")
+
+    def resample(self, start: datetime, end: datetime, rule: str = "15min", how: str = "mean",
+                 columns: list = None, dataset: str = METRICS) -> pd.DataFrame:
+        """Regular time buckets (``rule`` is a pandas offset alias) aggregated with ``how``."""
+        df = self.query(dataset, start, end, columns)
+        if df.empty:
+            return df
+        return df.select_dtypes("number").resample(rule).agg(how).dropna(how="all")
+
+    def chain_at(self, ts: datetime, lookback: timedelta = timedelta(days=1)) -> pd.DataFrame:
+        """The most recent recorded chain at or before ``ts``."""
+        ts = pd.Timestamp(ts)
+        ts = ts.tz_localize(IST) if ts.tzinfo is None else ts
+        df = self.query(CHAIN, ts - lookback, ts)
+        if df.empty:
+            return df
+        return df.loc[[df.index.max()]].reset_index()
+
+
+def downsample(df: pd.DataFrame, max_points: int = CHART_POINTS) -> pd.DataFrame:
+    """Shrinks a time-indexed frame to at most ``max_points`` rows of equal-width bucket means."""
+    if len(df) <= max_points:
+        return df
+    ts = df.index.asi8
+    buckets = np.minimum(((ts - ts[0]) * max_points) // (ts[-1] - ts[0] + 1), max_points - 1)
+    out = df.select_dtypes("number").groupby(buckets).mean()
+    # each bucket is plotted at the mean time of its samples, so gaps (nights, weekends) stay gaps
+    centers = pd.Series(ts).groupby(buckets).mean().round().astype("int64").to_numpy()
+    out.index = pd.DatetimeIndex(centers.astype(f"datetime64[{df.index.unit}]"), name=df.index.name)
+    out.index = out.index.tz_localize("UTC").tz_convert(df.index.tz)
+    return out
+
+
+def realized_volatility(spot: pd.Series, window: int = 7) -> pd.Series:
+    """Annualized close-to-close volatility (%) of daily last prices over ``window`` trading days."""
+    closes = spot.dropna().resample("1D").last().dropna()
+    returns = np.log(closes).diff()
+    return returns.rolling(window).std() * np.sqrt(252) * 100
+
+
+def forecast_vs_realized(metrics: pd.DataFrame, horizon: int = 7) -> pd.DataFrame:
+    """Each day's last ``vol_predicted_volatility`` next to the volatility realized over the next ``horizon`` days.
+
+    ``realized`` is NaN until ``horizon`` further trading days have been recorded.
+    """
+    forecast = metrics["vol_predicted_volatility"].dropna().resample("1D").last().dropna()
+    realized = realized_volatility(metrics["nifty_spot"], horizon).shift(-horizon)
+    out = pd.DataFrame({"forecast": forecast, "realized": realized.reindex(forecast.index)})
+    out["error"] = out["forecast"] - out["realized"]
+    return out
+
+
+class SnapshotRecorder:
+    """Background sampler feeding a ``SnapshotStore``.
+
+    ``fetch(token, endpoint)`` returns ``(data, error)``. ``tokens()`` returns
+    the live session tokens, most recent first (normally
+    ``MarketStateService.live_tokens``), so a token stops being used once its
+    sessions log out or expire. Each fetch uses the newest one. A token
+    answered with 401/403 is dropped for good, and the next one is tried.
+    Nothing is recorded while no live token is left, nor outside market
+    hours unless ``market_hours_only`` is False.
+    """
+
+    def __init__(self, store: SnapshotStore, fetch, tokens, metrics_interval: float = METRICS_INTERVAL_SECONDS,
+                 chain_interval: float = CHAIN_INTERVAL_SECONDS, market_hours_only: bool = True):
+        self.store = store
+        self.fetch = fetch
+        self.tokens = tokens
+        self.metrics_interval = metrics_interval
+        self.chain_interval = chain_interval
+        self.market_hours_only = market_hours_only
+        self.samples = 0
+        self.last_error = None
+        self.last_sample = None
+        self._last_chain = 0.0
+        self._compacted = None
+        self._rejected = set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def live_tokens(self) -> list:
+        return [token for token in self.tokens() if token not in self._rejected]
+
+    def start(self):
+        """Starts the sampler thread once; later calls are no-ops."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="snapshot-recorder", daemon=True)
+            self._thread.start()
+
+    def _fetch(self, endpoint: str):
+        error = "No live session token to record with"
+        for token in self.live_tokens():
+            data, error = self.fetch(token, endpoint)
+            if error is None or not any(status in error for status in AUTH_STATUSES):
+                return data, error
+            self._rejected.add(token)
+        return None, error
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.live_tokens() and (not self.market_hours_only or in_market_hours()):
+                self.sample()
+            today = datetime.now(IST).date()
+            if self._compacted != today:
+                self.store.flush()
+                self.store.compact_before(today)
+                self._compacted = today
+            self._stop.wait(self.metrics_interval)
+        self.store.flush()
+
+    def sample(self):
+        """Takes one metrics sample (and a chain and suggestion sample when due)."""
+        now = datetime.now(IST)
+        dashboard, error = self._fetch("/option-seller-dashboard")
+        volatility, vol_error = self._fetch("/predict/volatility")
+        if error and vol_error:
+            self.last_error = error
+        else:
+            self.store.append(METRICS, pd.DataFrame([metrics_row(dashboard or {}, volatility or {}, now)]))
+            self.samples += 1
+            self.last_sample = now
+            self.last_error = error or vol_error
+        if time.monotonic() - self._last_chain >= self.chain_interval:
+            table, chain_error = self._fetch("/full-chain-table")
+            if chain_error:
+                self.last_error = chain_error
+            elif table:
+                self.store.append(CHAIN, chain_rows(table.get("data", []), now))
+                self._last_chain = time.monotonic()
+                suggestion, suggest_error = self._fetch("/suggest/strategy")
+                if suggest_error:
+                    self.last_error = suggest_error
+                elif suggestion:
+                    self.store.append(SUGGESTIONS, pd.DataFrame([suggestion_row(suggestion, now)]))
+
+    def stop(self):
+        self._stop.set()
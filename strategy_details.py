@@ -0,0 +1,43 @@
+"""Helpers for memoizing ``/strategy/details`` and scaling it locally by lot count.
+
+The backend prices every strategy linearly in lots, so the app fetches each
+strategy once at 1 lot per market snapshot and derives other lot sizes here.
+"""
+import copy
+import hashlib
+import json
+
+DETAILS_ENDPOINT = "/strategy/details"
+DETAILS_TTL = 60
+_SCALED_FIELDS = ("premium_total", "max_profit", "max_loss")
+
+
+def snapshot_id(suggestion: dict) -> str:
+    """Fingerprints a ``/suggest/strategy`` response so details are tied to that market snapshot."""
+    payload = json.dumps(suggestion or {}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def details_key(strategy: str, snapshot: str, lots: int = 1) -> tuple:
+    """Builds a response-cache key for one strategy's details."""
+    return DETAILS_ENDPOINT, None, (("lots", str(lots)), ("snapshot", snapshot), ("strategy", strategy))
+
+
+def details_request(strategy: str) -> dict:
+    """Returns the ``api_request_many`` spec for a strategy's 1-lot details."""
+    return {"endpoint": DETAILS_ENDPOINT, "method": "POST", "json_data": {"strategy": strategy, "lots": 1}}
+
+
+def scale_details(details: dict, lots: int) -> dict:
+    """Scales 1-lot strategy details to ``lots`` without another backend call."""
+    if lots == 1 or not details:
+        return details
+    scaled = copy.deepcopy(details)
+    for field in _SCALED_FIELDS:
+        value = scaled.get(field)
+        if isinstance(value, (int, float)) and value != float("inf"):
+            scaled[field] = value * lots
+    for order in scaled.get("orders", []):
+        if isinstance(order.get("quantity"), (int, float)):
+            order["quantity"] = int(order["quantity"] * lots)
+    return scaled
@@ -0,0 +1,251 @@
+"""Multi-expiry option chains: a shared strike index and memoized per-expiry analytics.
+
+Chains for several expiries are fetched concurrently: one
+``/fetch/option-chain`` call per expiry, each with an ``expiry_date``
+parameter. The results are packed into a ``ChainBook``. All expiries share one
+sorted strike array. Each expiry keeps int32 positions into it plus float32
+quote columns, so N expiries cost a handful of small arrays each instead of N
+DataFrames. Rows are also filtered by expiry locally, so a backend that ignores
+the parameter and returns every expiry still works.
+
+Per-expiry analytics (ATM IV, straddle, PCR, max pain, skew) are memoized by
+expiry and snapshot id, a fingerprint of that expiry's quotes. An expiry whose
+quotes did not change is not re-solved when another one ticks. The summaries
+feed the IV term structure and the forward vols and calendar spreads between
+consecutive expiries.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from chain_analytics import CHAIN_COLUMNS, analyze_chain, chain_rows
+
+EXPIRIES_ENDPOINT = "/expiries"
+CHAIN_ENDPOINT = "/fetch/option-chain"
+EXPIRY_PARAM = "expiry_date"
+MAX_EXPIRIES = 8
+DEFAULT_EXPIRIES = 4
+MAX_CACHED_ANALYTICS = 32
+ANALYTICS_TTL = 60  # seconds; time to expiry keeps moving even when quotes do not
+QUOTE_COLUMNS = ["call_ltp", "call_oi", "call_volume", "call_feed_iv", "put_ltp", "put_oi", "put_volume", "put_feed_iv"]
+_QUOTE_FIELDS = {
+    "ltp": ("market_data", "ltp"), "oi": ("market_data", "oi"),
+    "volume": ("market_data", "volume"), "feed_iv": ("option_greeks", "iv"),
+}
+
+
+def expiry_dates(payload) -> list:
+    """Sorted unique ISO expiry dates found anywhere in an ``/expiries`` response.
+
+    The response lists weekly and monthly expiries; their exact nesting does not
+    matter here.
+    """
+    found = set()
+
+    def walk(value):
+        if isinstance(value, dict):
+            for item in value.values():
+                walk(item)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                walk(item)
+        elif isinstance(value, str):
+            try:
+                found.add(date.fromisoformat(value[:10]).isoformat())
+            except ValueError:
+                pass
+
+    walk(payload)
+    return sorted(found)
+
+
+def chain_request(expiry: str) -> dict:
+    """Returns the ``api_request_many`` spec for one expiry's chain."""
+    return {"endpoint": CHAIN_ENDPOINT, "params": {EXPIRY_PARAM: expiry}}
+
+
+def _quote(option: dict, field: str) -> float:
+    group, key = _QUOTE_FIELDS[field]
+    value = (option.get(group) or {}).get(key)
+    return np.nan if value is None else value
+
+
+def _key_array(rows: list, side: str) -> np.ndarray:
+    return np.array([((row.get(side) or {}).get("instrument_key") or "").encode("utf-8") for row in rows], dtype=np.bytes_)
+
+
+class ExpirySlice:
+    """One expiry's quotes, aligned to positions in the book's shared strike index."""
+
+    __slots__ = ("expiry", "spot", "positions", "quotes", "call_keys", "put_keys", "snapshot")
+
+    def __init__(self, expiry: str, spot: float, positions: np.ndarray, quotes: np.ndarray, call_keys, put_keys):
+        self.expiry = expiry
+        self.spot = spot
+        self.positions = positions  # int32, into ChainBook.strikes
+        self.quotes = quotes  # float32, shape (strikes, len(QUOTE_COLUMNS)); ample for prices, PCR and max pain
+        self.call_keys = call_keys  # fixed-width bytes, b"" when missing
+        self.put_keys = put_keys
+        digest = hashlib.sha1(quotes.tobytes())
+        digest.update(np.float64(spot).tobytes())
+        self.snapshot = digest.hexdigest()[:12]
+
+    @property
+    def nbytes(self) -> int:
+        return self.positions.nbytes + self.quotes.nbytes + self.call_keys.nbytes + self.put_keys.nbytes
+
+
+class ChainBook:
+    """Chains for several expiries over one shared, sorted strike index."""
+
+    def __init__(self):
+        self.strikes = np.empty(0, dtype=np.float64)
+        self.slices = {}
+
+    @classmethod
+    def from_responses(cls, expiries: list, responses: list) -> "ChainBook":
+        """Builds a book from one ``/fetch/option-chain`` response per expiry."""
+        book = cls()
+        for expiry, payload in zip(expiries, responses):
+            book.add(expiry, [row for row in chain_rows(payload) if str(row.get("expiry"))[:10] == expiry])
+        return book
+
+    def add(self, expiry: str, rows: list):
+        """Adds (or replaces) one expiry from raw chain rows."""
+        by_strike = {float(row["strike_price"]): row for row in rows if row.get("strike_price") is not None}
+        rows = [by_strike[strike] for strike in sorted(by_strike)]
+        strikes = np.array([row["strike_price"] for row in rows], dtype=np.float64)
+        missing = np.setdiff1d(strikes, self.strikes, assume_unique=True)
+        if missing.size:
+            merged = np.union1d(self.strikes, missing)
+            for piece in self.slices.values():
+                piece.positions = np.searchsorted(merged, self.strikes[piece.positions]).astype(np.int32)
+            self.strikes = merged
+        quotes = np.empty((len(rows), len(QUOTE_COLUMNS)), dtype=np.float32)
+        for i, row in enumerate(rows):
+            call, put = row.get("call_options") or {}, row.get("put_options") or {}
+            quotes[i] = [_quote(call, "ltp"), _quote(call, "oi"), _quote(call, "volume"), _quote(call, "feed_iv"),
+                         _quote(put, "ltp"), _quote(put, "oi"), _quote(put, "volume"), _quote(put, "feed_iv")]
+        spot = float(rows[0].get("underlying_spot_price") or np.nan) if rows else np.nan
+        self.slices[expiry] = ExpirySlice(
+            expiry, spot, np.searchsorted(self.strikes, strikes).astype(np.int32), quotes,
+            _key_array(rows, "call_options"), _key_array(rows, "put_options"),
+        )
+
+    @property
+    def expiries(self) -> list:
+        return sorted(self.slices)
+
+    def frame(self, expiry: str) -> pd.DataFrame:
+        """One expiry as a ``chain_frame``-shaped DataFrame, for ``analyze_chain``."""
+        piece = self.slices[expiry]
+        df = pd.DataFrame(piece.quotes.astype(np.float64), columns=QUOTE_COLUMNS)
+        df["expiry"] = expiry
+        df["strike"] = self.strikes[piece.positions]
+        df["spot"] = piece.spot
+        for side, keys in (("call_key", piece.call_keys), ("put_key", piece.put_keys)):
+            decoded = np.char.decode(keys, "utf-8").astype(object)
+            decoded[keys == b""] = None
+            df[side] = decoded
+        return df[CHAIN_COLUMNS]
+
+    def quote(self, expiry: str, column: str, strike: float) -> float:
+        """One quote at ``strike`` for ``expiry`` (NaN when that expiry does not list the strike)."""
+        piece = self.slices.get(expiry)
+        index = np.searchsorted(self.strikes, strike)
+        if piece is None or index >= self.strikes.size or self.strikes[index] != strike:
+            return np.nan
+        row = np.searchsorted(piece.positions, index)
+        if row >= piece.positions.size or piece.positions[row] != index:
+            return np.nan
+        return float(piece.quotes[row, QUOTE_COLUMNS.index(column)])
+
+    @property
+    def nbytes(self) -> int:
+        return self.strikes.nbytes + sum(piece.nbytes for piece in self.slices.values())
+
+
+class ExpiryAnalyticsCache:
+    """Process-wide LRU of per-expiry analytics keyed by ``(expiry, snapshot)``."""
+
+    def __init__(self, max_entries: int = MAX_CACHED_ANALYTICS, ttl: float = ANALYTICS_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def analytics(self, book: ChainBook, expiry: str, now: datetime = None) -> dict:
+        """``{"summary": {...}, "iv": float32 array}`` for one expiry, solved only on a miss.
+
+        ``iv`` is the mean of call and put IV per strike, aligned with the slice positions.
+        """
+        piece = book.slices[expiry]
+        key = (expiry, piece.snapshot)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        strikes_df, summary_df = analyze_chain(book.frame(expiry), now)
+        result = {
+            "summary": summary_df.iloc[0].to_dict() if not summary_df.empty else {"expiry": expiry},
+            "iv": strikes_df[["call_iv", "put_iv"]].mean(axis=1).to_numpy(dtype=np.float32),
+        }
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def forward_vol(iv_near: float, t_near: float, iv_far: float, t_far: float) -> float:
+    """Forward volatility (%) between two expiries; NaN when total variance is not increasing."""
+    if not t_far > t_near:
+        return float("nan")
+    variance = ((iv_far / 100.0) ** 2 * t_far - (iv_near / 100.0) ** 2 * t_near) / (t_far - t_near)
+    return float(np.sqrt(variance) * 100.0) if variance > 0 else float("nan")
+
+
+def term_structure(summaries: list) -> pd.DataFrame:
+    """One row per expiry (nearest first) with ATM IV and the forward vol from the previous expiry."""
+    df = pd.DataFrame(summaries)
+    if df.empty:
+        return df
+    df = df.sort_values("days_to_expiry", ignore_index=True)
+    years = df["days_to_expiry"].to_numpy() / 365.0
+    iv = df["atm_iv"].to_numpy()
+    df["forward_vol"] = [np.nan] + [forward_vol(iv[i - 1], years[i - 1], iv[i], years[i]) for i in range(1, len(df))]
+    return df
+
+
+def calendar_spreads(book: ChainBook, structure: pd.DataFrame) -> pd.DataFrame:
+    """Calendar spreads between consecutive expiries at the near expiry's ATM strike.
+
+    Debits are far minus near premium; the strike is read from both expiries
+    through the shared strike index.
+    """
+    rows = []
+    for near, far in zip(structure.itertuples(), structure.iloc[1:].itertuples()):
+        strike = near.atm_strike
+        call = book.quote(far.expiry, "call_ltp", strike) - book.quote(near.expiry, "call_ltp", strike)
+        put = book.quote(far.expiry, "put_ltp", strike) - book.quote(near.expiry, "put_ltp", strike)
+        rows.append({
+            "near": near.expiry, "far": far.expiry, "strike": strike,
+            "near_iv": near.atm_iv, "far_iv": far.atm_iv, "iv_spread": far.atm_iv - near.atm_iv,
+            "forward_vol": far.forward_vol, "call_calendar": call, "put_calendar": put, "straddle_calendar": call + put,
+        })
+    return pd.DataFrame(rows)
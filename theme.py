@@ -0,0 +1,25 @@
+"""Static look of the app: the global stylesheet and the navigation menu styles.
+
+The stylesheet lives in ``assets/style.css`` and is read once per process. It
+is still emitted on every run, because Streamlit rebuilds the page from each
+run's output.
+"""
+import os
+
+import streamlit as st
+
+STYLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "style.css")
+NAV_ICONS = ["speedometer2", "graph-up", "lightbulb", "shield-check", "table", "book", "journal-text"]
+NAV_STYLES = {
+    "container": {"background-color": "#1E1E1E"},
+    "icon": {"color": "#00FF00", "font-size": "20px"},
+    "nav-link": {"color": "#E0E0E0", "--hover-color": "#00FF00", "font-size": "16px"},
+    "nav-link-selected": {"background": "linear-gradient(45deg, #00FF00, #00CC00)", "color": "#0A0A0A"},
+}
+
+with open(STYLE_PATH, encoding="utf-8") as _f:
+    STYLESHEET = f"<style>\n{_f.read()}</style>"
+
+
+def apply_stylesheet():
+    st.markdown(STYLESHEET, unsafe_allow_html=True)
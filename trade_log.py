@@ -0,0 +1,237 @@
+"""Paginated, incrementally synced trade log for the Trade Log tab.
+
+``/fetch/trades`` is queried with cursor pagination, date-range/strategy
+filters and column projection. Trades are merged into a local cache keyed by
+trade identity, and later refreshes ask only for rows newer than the last-seen
+timestamp. Filters are also applied locally, so the table stays correct against
+a backend that ignores the extra parameters and returns every row.
+
+When a ``LocalStore`` is supplied, merged trades and watermarks are persisted
+there and reads are served from its indexed tables instead of memory.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from wire_format import records
+
+TRADES_ENDPOINT = "/fetch/trades"
+PAGE_LIMIT = 500
+MAX_PAGES_PER_SYNC = 20
+SYNC_INTERVAL_SECONDS = 30
+MAX_CACHED_QUERIES = 8
+TIMESTAMP_FIELDS = ("updated_at", "timestamp_exit", "timestamp_entry")
+# always requested so projected rows can still be keyed and watermarked
+IDENTITY_FIELDS = ("id", "instrument_token", "strategy") + TIMESTAMP_FIELDS
+DEFAULT_FIELDS = [
+    "timestamp_entry", "timestamp_exit", "strategy", "instrument_token", "status",
+    "entry_price", "quantity", "realized_pnl", "unrealized_pnl", "capital_used",
+    "potential_loss", "vega", "sl_hit", "regime_score", "notes",
+]
+
+
+def trade_key(trade: dict) -> tuple:
+    """Stable identity for a trade row: its id, else entry time + instrument + strategy."""
+    if trade.get("id") is not None:
+        return ("id", trade["id"])
+    return (trade.get("timestamp_entry"), trade.get("instrument_token"), trade.get("strategy"))
+
+
+def trade_timestamp(trade: dict):
+    """Most recent timestamp on a trade, used as the sync watermark."""
+    stamps = [trade[f] for f in TIMESTAMP_FIELDS if trade.get(f)]
+    return max(stamps) if stamps else None
+
+
+class TradeQuery:
+    """Server-side filters and projection for ``/fetch/trades``."""
+
+    def __init__(self, status: str = None, strategy: str = None, start_date=None, end_date=None, fields: list = None):
+        self.status = status
+        self.strategy = strategy
+        self.start_date = start_date
+        self.end_date = end_date
+        self.fields = list(fields) if fields else None
+
+    def cache_key(self) -> tuple:
+        return self.status, self.strategy, str(self.start_date), str(self.end_date), tuple(self.fields or ())
+
+    def to_params(self, cursor=None, updated_since=None, limit: int = PAGE_LIMIT) -> dict:
+        params = {"limit": limit}
+        if self.status:
+            params["status"] = self.status
+        if self.strategy:
+            params["strategy"] = self.strategy
+        if self.start_date:
+            params["start_date"] = str(self.start_date)
+        if self.end_date:
+            params["end_date"] = str(self.end_date)
+        if self.fields:
+            extra = [f for f in IDENTITY_FIELDS if f not in self.fields]
+            params["fields"] = ",".join(self.fields + extra)
+        if cursor:
+            params["cursor"] = cursor
+        if updated_since:
+            params["updated_since"] = updated_since
+        return params
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Applies the same filters locally; a no-op when the backend already did."""
+        if df.empty:
+            return df
+        mask = pd.Series(True, index=df.index)
+        if self.status and "status" in df:
+            mask &= df["status"] == self.status
+        if self.strategy and "strategy" in df:
+            mask &= df["strategy"] == self.strategy
+        if (self.start_date or self.end_date) and "timestamp_entry" in df:
+            entry = pd.to_datetime(df["timestamp_entry"], errors="coerce").dt.date
+            if self.start_date:
+                mask &= entry >= self.start_date
+            if self.end_date:
+                mask &= entry <= self.end_date
+        df = df[mask]
+        if self.fields:
+            df = df[[c for c in self.fields if c in df.columns]]
+        return df
+
+
+class TradeLogCache:
+    """Trades for one query, merged by identity and synced by timestamp watermark."""
+
+    def __init__(self, query: TradeQuery, store=None):
+        self.query = query
+        self.store = store
+        self.stream = f"trades:{query.cache_key()}"
+        self.trades = {}
+        self.watermark = store.watermark(self.stream) if store is not None else None
+        self.older_cursor = None
+        self.oldest_entry = None
+        self.exhausted = False
+        self.last_sync = 0.0
+        self.requests = 0
+        self._frame = None
+        self._lock = threading.Lock()
+
+    def _merge(self, trades: list) -> int:
+        keyed = [(trade_key(trade), trade) for trade in trades]
+        if self.store is not None:
+            self.store.upsert_trades(keyed)
+        else:
+            self.trades.update(keyed)
+        for trade in trades:
+            stamp = trade_timestamp(trade)
+            if stamp and (self.watermark is None or stamp > self.watermark):
+                self.watermark = stamp
+            entry = trade.get("timestamp_entry")
+            if entry and (self.oldest_entry is None or entry < self.oldest_entry):
+                self.oldest_entry = entry
+        if trades:
+            self._frame = None
+            if self.store is not None:
+                self.store.set_watermark(self.stream, self.watermark)
+        return len(trades)
+
+    def _fetch(self, fetch, **page_args):
+        self.requests += 1
+        data, error = fetch(self.query.to_params(**page_args))
+        if error:
+            return None, None, error
+        data = data or {}
+        # rows are keyed and mirrored one by one, so a columnar page is unpacked here
+        return records(data.get("trades", [])), data.get("next_cursor"), None
+
+    def load_more(self, fetch) -> str:
+        """Fetches the next (older) page; returns an error string or None."""
+        with self._lock:
+            if self.exhausted:
+                return None
+            trades, cursor, error = self._fetch(fetch, cursor=self.older_cursor)
+            if error:
+                return error
+            self._merge(trades)
+            self.older_cursor = cursor
+            self.exhausted = not cursor
+            self.last_sync = time.time()
+            return None
+
+    def backfill(self, fetch, since: str) -> str:
+        """Loads older pages until every trade entered at or after ``since`` is cached."""
+        while not self.exhausted and (self.oldest_entry is None or self.oldest_entry >= since):
+            error = self.load_more(fetch)
+            if error:
+                return error
+        return None
+
+    def sync_new(self, fetch, force: bool = False) -> str:
+        """Pulls only trades newer than the watermark; throttled unless ``force``."""
+        with self._lock:
+            if not force and time.time() - self.last_sync < SYNC_INTERVAL_SECONDS:
+                return None
+            initial = self.watermark is None
+            cursor = None
+            for _ in range(MAX_PAGES_PER_SYNC):
+                trades, cursor, error = self._fetch(
+                    fetch, cursor=cursor, updated_since=None if initial else self.watermark
+                )
+                if error:
+                    return error
+                self._merge(trades)
+                if initial:
+                    # the first sync doubles as the first page of history
+                    self.older_cursor = cursor
+                    self.exhausted = not cursor
+                    break
+                if not cursor:
+                    break
+            self.last_sync = time.time()
+            return None
+
+    def frame(self) -> pd.DataFrame:
+        """All cached trades (filtered and projected), newest first."""
+        with self._lock:
+            if self._frame is None:
+                if self.store is not None:
+                    q = self.query
+                    df = self.store.query_trades(q.status, q.strategy, q.start_date, q.end_date)
+                else:
+                    df = pd.DataFrame(list(self.trades.values()))
+                    if "timestamp_entry" in df:
+                        df = df.sort_values("timestamp_entry", ascending=False, ignore_index=True)
+                self._frame = self.query.apply(df).reset_index(drop=True)
+            return self._frame
+
+
+class TradeLogStore:
+    """Process-wide LRU of ``TradeLogCache`` objects, one per distinct query."""
+
+    def __init__(self, max_queries: int = MAX_CACHED_QUERIES, store=None):
+        self.max_queries = max_queries
+        self.store = store
+        self._caches = OrderedDict()
+        self._lock = threading.Lock()
+
+    def for_query(self, query: TradeQuery) -> TradeLogCache:
+        key = query.cache_key()
+        with self._lock:
+            cache = self._caches.get(key)
+            if cache is None:
+                cache = self._caches[key] = TradeLogCache(query, store=self.store)
+            self._caches.move_to_end(key)
+            while len(self._caches) > self.max_queries:
+                self._caches.popitem(last=False)
+            return cache
+
+    def invalidate(self):
+        """Forces every cached query to resync on its next render."""
+        with self._lock:
+            for cache in self._caches.values():
+                cache.last_sync = 0.0
+
+
+def page_slice(df: pd.DataFrame, page: int, page_size: int) -> pd.DataFrame:
+    """Returns one page (1-based) of a frame; only this slice is rendered."""
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
@@ -0,0 +1,20 @@
+"""Dashboard pages, one module per navigation tab, imported on first use.
+
+Each page module exposes ``render(selected)``. Only the selected page is
+imported, once per process, so a rerun executes the app shell plus one page.
+"""
+import importlib
+
+PAGES = {
+    "Live Dashboard": "views.live",
+    "Market Dashboard": "views.market",
+    "Strategy Suggestions": "views.strategies",
+    "Risk Evaluation": "views.risk",
+    "Option Chain": "views.chain",
+    "Trade Log": "views.trades",
+    "Journal": "views.journal",
+}
+
+
+def render(tab: str):
+    importlib.import_module(PAGES[tab]).render(tab)
@@ -0,0 +1,69 @@
+"""Sidebar alert controls: rule editor, webhook, recent alerts and the toast drain."""
+
+import time
+
+import streamlit as st
+
+from alerts import ALERT_INPUTS, CHANGE, FLAG, RULE_KINDS, THRESHOLD, AlertRule
+from services import get_alert_service, save_alert_settings
+
+TOAST_SECONDS = 2.0
+SEEN_KEY = "alerts_seen"
+TOAST_ICONS = {THRESHOLD: "🚨", CHANGE: "📈", FLAG: "⚠️"}
+
+
+@st.fragment(run_every=TOAST_SECONDS)
+def render_toasts(token: str):
+    """Shows alerts published since this session last looked, without a full rerun."""
+    alerts_queue = get_alert_service().queue(token)
+    seen = st.session_state.setdefault(SEEN_KEY, alerts_queue.last_seq)
+    for alert in alerts_queue.since(seen):
+        st.toast(alert["message"], icon=TOAST_ICONS.get(alert["kind"]))
+        st.session_state[SEEN_KEY] = alert["seq"]
+
+
+def render_rule_form(token: str, rules: list, webhook_url: str):
+    with st.form("alert_rule_form", clear_on_submit=True):
+        kind = st.selectbox("Rule", RULE_KINDS, format_func=str.title)
+        name = st.selectbox("Input", ALERT_INPUTS, help="pnl:* applies the rule to every position's P&L")
+        col1, col2 = st.columns(2)
+        level = col1.number_input("Level (value, or % for change)", value=0.0, step=1.0)
+        above = col2.selectbox("Direction", ["Above", "Below"]) == "Above"
+        window = col1.number_input("Change window (min)", min_value=1, value=5)
+        cooldown = col2.number_input("Cooldown (min)", min_value=0, value=5)
+        pattern = st.text_input("Flag contains", help="Empty matches any non-✅ flag")
+        if st.form_submit_button("Add rule"):
+            if kind == FLAG and name != "risk_flags":
+                st.error("Flag rules watch the risk_flags input.")
+                return
+            rule = AlertRule(kind, name, level=level, above=above, window=window * 60.0, pattern=pattern,
+                             cooldown=cooldown * 60.0)
+            save_alert_settings(token, rules + [rule], webhook_url)
+
+
+def render_sidebar(token: str):
+    service = get_alert_service()
+    rules, webhook_url = service.settings(token)
+    if rules:
+        service.watch(token)
+        render_toasts(token)
+    with st.expander("🔔 Alerts"):
+        render_rule_form(token, rules, webhook_url)
+        for rule in rules:
+            col1, col2 = st.columns([4, 1])
+            col1.write(rule.describe())
+            if col2.button("✖", key=f"remove_alert_{rule.rule_id}"):
+                save_alert_settings(token, [r for r in rules if r.rule_id != rule.rule_id], webhook_url)
+                st.rerun()
+        webhook = st.text_input("Webhook URL (localhost only)", value=webhook_url or "",
+                                placeholder=service.default_webhook or "http://localhost:9000/alerts")
+        if webhook.strip() != (webhook_url or ""):
+            try:
+                save_alert_settings(token, rules, webhook.strip())
+            except ValueError as e:
+                st.error(str(e))
+        stats = service.stats(token)
+        st.caption(f"Evaluations: {stats['evaluations']} | Suppressed: {stats['suppressed']} | "
+                   f"Webhook: {stats['webhook_sent']} sent, {stats['webhook_failed']} failed")
+        for alert in service.queue(token).recent(10):
+            st.write(f"{time.strftime('%H:%M:%S', time.localtime(alert['at']))} {alert['message']}")
@@ -0,0 +1,73 @@
+"""Backtest section of the Strategy Suggestions page: suggestions replayed over recorded or imported history."""
+
+import time
+
+import streamlit as st
+
+from backtest import HISTORY_TYPES, backtest_frame, equity_curves, read_history
+from services import backtest_recorded, strategy_templates
+
+RECORDED, IMPORTED = "Recorded snapshots", "Imported file"
+RESULT_KEY = "backtest_result"
+MONEY_COLUMNS = ["Total P&L", "Avg P&L", "Avg Credit", "Worst Trade", "Max Drawdown"]
+COLUMN_CONFIG = {
+    "Hit Rate": st.column_config.NumberColumn("Hit Rate", format="%.1f%%"),
+    **{name: st.column_config.NumberColumn(name, format="₹%.0f") for name in MONEY_COLUMNS},
+}
+
+
+def render_result(result: dict):
+    trades = result["trades"]
+    st.caption(
+        f"{result['days']:,} entry days | {len(trades):,} trades ({result['open']:,} still open) | "
+        f"{result['chunks']} chunk(s) on {result['workers']} process(es) in {result['elapsed_s']:.1f} s | P&L per lot"
+    )
+    if result["by_regime"].empty:
+        st.info("No settled trades. Trades settle at expiry, so the history must reach past the first expiry.")
+        return
+    st.markdown("**By regime**")
+    st.dataframe(result["by_regime"], column_config=COLUMN_CONFIG, hide_index=True)
+    st.markdown("**By regime and strategy**")
+    st.dataframe(result["by_strategy"], column_config=COLUMN_CONFIG, hide_index=True)
+    st.line_chart(equity_curves(trades), height=260)
+
+
+def render():
+    # the controls are only built when asked for, so the page's regular reruns do not pay for them
+    if st.toggle("🧪 Backtest suggestions over history", key="backtest_enabled"):
+        templates = strategy_templates()
+        if not templates:
+            st.info("Open the suggested strategies above once; backtests reuse their leg structures.")
+            return
+        st.caption(f"Leg structures known for: {', '.join(sorted(templates))}")
+        source = st.radio("History", [RECORDED, IMPORTED], horizontal=True, key="backtest_source")
+        dates, upload = (), None
+        if source == RECORDED:
+            dates = st.date_input("Date range", value=(), key="backtest_dates")
+        else:
+            upload = st.file_uploader(
+                "History file", type=HISTORY_TYPES,
+                help="One row per strike per sample: ts, strike, call_iv/put_iv or call_ltp/put_ltp, spot, "
+                     "days_to_expiry or expiry, and optionally regime, score and strategies (|-separated)",
+            )
+        suggested_only = st.checkbox("Only trade each day's suggested strategies", value=True, key="backtest_suggested")
+        if st.button("Run Backtest", key="backtest_run", disabled=source == IMPORTED and upload is None):
+            bar = st.progress(0.0, text="Backtesting…")
+            progress = lambda done, total: bar.progress(done / total, text=f"Chunk {done} of {total}")
+            started = time.perf_counter()
+            try:
+                if source == RECORDED:
+                    result = backtest_recorded(dates[0] if len(dates) > 0 else None, dates[1] if len(dates) > 1 else None,
+                                               suggested_only, progress=progress)
+                else:
+                    result = backtest_frame(read_history(upload.name, upload.getvalue()), templates, suggested_only,
+                                            progress=progress)
+            except ValueError as e:
+                st.error(f"Backtest failed: {e}")
+            else:
+                result["elapsed_s"] = time.perf_counter() - started
+                st.session_state[RESULT_KEY] = result
+            bar.empty()
+        result = st.session_state.get(RESULT_KEY)
+        if result:
+            render_result(result)
@@ -0,0 +1,148 @@
+"""Option Chain page: the full chain table, IV skew and locally computed chain analytics."""
+
+import time
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from chain_analytics import analyze_chain, apply_ltps, chain_frame
+from chain_view import CHAIN_COLUMN_CONFIG, ChainTable, update_skew_figure
+from resources import get_metrics
+from services import api_request_many, available_expiries, get_expiry_analytics, get_feed_manager, load_chain_book
+from settings import SESSION_STATE_KEY
+from term_structure import DEFAULT_EXPIRIES, MAX_EXPIRIES, calendar_spreads, term_structure
+from views.figures import TEMPLATE
+
+TERM_COLUMNS = ["expiry", "days_to_expiry", "atm_strike", "atm_iv", "forward_vol", "straddle", "pcr", "max_pain", "skew_slope"]
+TERM_COLUMN_CONFIG = {
+    "days_to_expiry": st.column_config.NumberColumn("Days", format="%.1f"),
+    "atm_strike": st.column_config.NumberColumn("ATM Strike", format="₹%.0f"),
+    "atm_iv": st.column_config.NumberColumn("ATM IV", format="%.2f%%"),
+    "forward_vol": st.column_config.NumberColumn("Forward Vol", format="%.2f%%"),
+    "straddle": st.column_config.NumberColumn("Straddle", format="₹%.2f"),
+    "pcr": st.column_config.NumberColumn("PCR", format="%.2f"),
+    "max_pain": st.column_config.NumberColumn("Max Pain", format="₹%.0f"),
+    "skew_slope": st.column_config.NumberColumn("Skew Slope", format="%.2f"),
+}
+CALENDAR_COLUMN_CONFIG = {
+    "strike": st.column_config.NumberColumn("Strike", format="₹%.0f"),
+    "near_iv": st.column_config.NumberColumn("Near IV", format="%.2f%%"),
+    "far_iv": st.column_config.NumberColumn("Far IV", format="%.2f%%"),
+    "iv_spread": st.column_config.NumberColumn("IV Spread", format="%.2f"),
+    "forward_vol": st.column_config.NumberColumn("Forward Vol", format="%.2f%%"),
+    "call_calendar": st.column_config.NumberColumn("Call Calendar", format="₹%.2f"),
+    "put_calendar": st.column_config.NumberColumn("Put Calendar", format="₹%.2f"),
+    "straddle_calendar": st.column_config.NumberColumn("Straddle Calendar", format="₹%.2f"),
+}
+
+
+def render_term_structure(selected: str):
+    """IV term structure, per-expiry metrics and calendar spreads across several expiries."""
+    expiries, error = available_expiries()
+    if error:
+        st.error(error)
+        return
+    if not expiries:
+        st.info("No expiries available.")
+        return
+    chosen = st.multiselect("Expiries", expiries, default=expiries[:DEFAULT_EXPIRIES],
+                            max_selections=MAX_EXPIRIES, key="term_expiries")
+    if not chosen:
+        return
+    with get_metrics().timer(selected, "fetch"):
+        book, errors = load_chain_book(sorted(chosen))
+    for load_error in errors:
+        st.warning(f"Failed to load chain for {load_error}")
+    memo = get_expiry_analytics()
+    start = time.perf_counter()
+    results = {expiry: memo.analytics(book, expiry) for expiry in book.expiries if book.slices[expiry].positions.size}
+    structure = term_structure([result["summary"] for result in results.values()])
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if structure.empty:
+        st.info("No option chain data for the selected expiries.")
+        return
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=structure["days_to_expiry"], y=structure["atm_iv"], mode="lines+markers",
+                             name="ATM IV", text=structure["expiry"], line=dict(color="#00FF00")))
+    fig.add_trace(go.Scatter(x=structure["days_to_expiry"], y=structure["forward_vol"], mode="lines+markers",
+                             name="Forward Vol", text=structure["expiry"], line=dict(color="#FFA500", dash="dash")))
+    fig.update_layout(title="IV Term Structure", xaxis_title="Days to Expiry", yaxis_title="IV (%)", template=TEMPLATE)
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(structure[TERM_COLUMNS], column_config=TERM_COLUMN_CONFIG, hide_index=True)
+
+    smile = go.Figure()
+    for expiry, result in results.items():
+        smile.add_trace(go.Scatter(x=book.strikes[book.slices[expiry].positions], y=result["iv"], mode="lines", name=expiry))
+    smile.update_layout(title="IV Smile by Expiry", xaxis_title="Strike", yaxis_title="IV (%)", template=TEMPLATE)
+    st.plotly_chart(smile, use_container_width=True)
+
+    calendars = calendar_spreads(book, structure)
+    if not calendars.empty:
+        st.markdown("**Calendar Spreads** (far minus near, at the near expiry's ATM strike)")
+        st.dataframe(calendars, column_config=CALENDAR_COLUMN_CONFIG, hide_index=True)
+    stats = memo.stats()
+    st.caption(
+        f"{len(book.slices)} expiries over {book.strikes.size} shared strikes in {book.nbytes / 1024:.0f} KB | "
+        f"Analytics in {elapsed_ms:.1f} ms (memo: {stats['hits']} hits, {stats['misses']} solves)"
+    )
+
+
+def render(selected: str):
+    st.header("Option Chain Analysis")
+    with get_metrics().timer(selected, "fetch"):
+        (data, error), (raw_chain, raw_error) = api_request_many([
+            "/full-chain-table",
+            "/fetch/option-chain",
+        ])
+    
+    if error:
+        st.error(error)
+    elif data:
+        table = st.session_state.setdefault("chain_table", ChainTable())
+        with get_metrics().timer(selected, "dataframe"):
+            delta = table.update(data.get("data", []))
+            chain_df = table.frame()
+        if not chain_df.empty:
+            st.caption(
+                f"{delta['changed_rows']} strikes changed, {delta['added']} added, {delta['removed']} removed "
+                f"| columns: {', '.join(map(str, delta['changed_columns'])) or 'none'}"
+            )
+            with get_metrics().timer(selected, "table"):
+                st.dataframe(chain_df, column_config=CHAIN_COLUMN_CONFIG, hide_index=True)
+            # IV Skew Plot (trace updated in place across reruns)
+            with get_metrics().timer(selected, "plotly"):
+                fig = update_skew_figure(st.session_state.get("chain_skew_fig"), table)
+                st.session_state["chain_skew_fig"] = fig
+                st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No option chain data available.")
+
+    st.subheader("Local Chain Analytics")
+    if raw_error:
+        st.error(raw_error)
+    elif raw_chain:
+        local_df = chain_frame(raw_chain)
+        if local_df.empty:
+            st.info("No raw option chain available for local analytics.")
+        else:
+            if st.session_state.get("live_stream"):
+                snap = get_feed_manager().snapshot(st.session_state[SESSION_STATE_KEY])
+                local_df = apply_ltps(local_df, snap["ltps"], snap["spot"])
+            start = time.perf_counter()
+            strikes_df, summary_df = analyze_chain(local_df)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            get_metrics().record_phase(selected, "analytics", elapsed_ms / 1000)
+            st.caption(f"IV, Greeks, PCR, max pain and skew for {len(strikes_df)} strikes computed locally in {elapsed_ms:.1f} ms")
+            for _, summary in summary_df.iterrows():
+                st.markdown(f"**Expiry {summary['expiry']}** ({summary['days_to_expiry']:.1f} days)")
+                col1, col2, col3, col4, col5 = st.columns(5)
+                col1.metric("ATM IV", f"{summary['atm_iv']:.2f}%")
+                col2.metric("Straddle", f"₹{summary['straddle']:.2f}")
+                col3.metric("PCR", f"{summary['pcr']:.2f}")
+                col4.metric("Max Pain", f"₹{summary['max_pain']:.0f}")
+                col5.metric("Skew Slope", f"{summary['skew_slope']:.2f}")
+
+    st.subheader("IV Term Structure")
+    if st.toggle("Multi-expiry mode", key="multi_expiry"):
+        render_term_structure(selected)
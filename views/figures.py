@@ -0,0 +1,51 @@
+"""Plotly building blocks shared by the pages.
+
+The dark theme is registered once per process as the ``voluguard`` template, so
+a figure names it instead of re-validating the same five layout properties
+every run. The forecast gauge appears on two pages with identical config; it is
+built once per session and only its value is updated afterwards.
+"""
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+
+TEMPLATE = "voluguard"
+GAUGE_KEY = "forecast_gauge_fig"
+
+pio.templates[TEMPLATE] = go.layout.Template(pio.templates["plotly_dark"])
+pio.templates[TEMPLATE].layout.update(
+    plot_bgcolor="#0A0A0A",
+    paper_bgcolor="#0A0A0A",
+    font_color="#E0E0E0",
+    hoverlabel=dict(bgcolor="#1E1E1E", font_color="#E0E0E0"),
+)
+
+
+def forecast_gauge(predicted_vol: float) -> go.Figure:
+    """The XGBoost forecast gauge, reused from this session and updated in place."""
+    fig = st.session_state.get(GAUGE_KEY)
+    if fig is None:
+        fig = go.Figure(go.Indicator(
+            mode="gauge+number",
+            value=predicted_vol,
+            title={'text': "XGBoost Volatility Forecast (%)"},
+            gauge={
+                'axis': {'range': [0, 50], 'tickwidth': 1, 'tickcolor': "#E0E0E0"},
+                'bar': {'color': "#00FF00"},
+                'steps': [
+                    {'range': [0, 15], 'color': "#1E1E1E"},
+                    {'range': [15, 30], 'color': "#252526"},
+                    {'range': [30, 50], 'color': "#FF4D4D"}
+                ],
+                'threshold': {
+                    'line': {'color': "#00CC00", 'width': 4},
+                    'thickness': 0.75,
+                    'value': predicted_vol
+                }
+            }
+        ))
+        fig.update_layout(template=TEMPLATE, height=300)
+        st.session_state[GAUGE_KEY] = fig
+    else:
+        fig.data[0].update(value=predicted_vol, gauge={'threshold': {'value': predicted_vol}})
+    return fig
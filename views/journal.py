@@ -0,0 +1,110 @@
+"""Journal page: logging entries and searching the locally mirrored journal."""
+
+import math
+
+import streamlit as st
+
+from journal_io import EXPORT_FORMATS, IMPORT_TYPES, parse_journals
+from services import api_request, get_local_store, import_journals, journal_export, search_journals, sync_journals
+from settings import SESSION_STATE_KEY
+
+PAGE_SIZE = 20
+MOODS = ["Positive", "Neutral", "Negative"]
+MONTH_BARS = 24
+
+
+def render_import_export(results):
+    with st.expander("📦 Import / Export"):
+        upload = st.file_uploader("Import entries", type=IMPORT_TYPES, help="JSON Lines, JSON or CSV with title, content, mood, tags")
+        if upload is not None and st.button("Import", key="journal_import"):
+            entries, errors = parse_journals(upload.name, upload.getvalue())
+            if entries:
+                bar = st.progress(0.0, text=f"Logging {len(entries)} entries…")
+                result = import_journals(entries, progress=lambda done, total: bar.progress(done / total))
+                st.success(f"✅ Imported {result['posted']} of {len(entries)} entries.")
+                errors += result["errors"]
+            for error in errors[:20]:
+                st.warning(error)
+        fmt = st.radio("Export format", list(EXPORT_FORMATS), horizontal=True, key="journal_export_format")
+        st.download_button(
+            f"Export {results.total:,} entries", journal_export(results, fmt), file_name=f"voluguard_journal.{fmt}",
+            mime=EXPORT_FORMATS[fmt], disabled=not results.total,
+        )
+
+
+def render(selected: str):
+    st.header("Trading Journal")
+    with st.form("journal_form"):
+        title = st.text_input("Title", placeholder="Enter journal title")
+        content = st.text_area("Content", placeholder="Describe your trading day or insights")
+        mood = st.selectbox("Mood", MOODS)
+        tags = st.text_input("Tags (comma-separated)", placeholder="e.g., volatility, strategy, learning")
+        submit = st.form_submit_button("Add Journal Entry")
+
+        if submit:
+            if not title or not content:
+                st.error("Title and Content are required.")
+            else:
+                journal_data = {"title": title, "content": content, "mood": mood, "tags": tags}
+                data, error = api_request("/log/journal", method="POST", json_data=journal_data)
+                if error:
+                    st.error(f"Failed to save journal: {error}")
+                    st.markdown("**Debug Info**: Verify Supabase `journals` table schema and API logs on Render.")
+                else:
+                    # Show the entry immediately; the backend copy replaces it on the next sync
+                    get_local_store().add_pending_journal(journal_data)
+                    st.success("✅ Journal entry saved successfully!")
+
+    error = sync_journals(st.session_state[SESSION_STATE_KEY])
+    if error:
+        st.warning(f"Failed to sync journals, showing local copy: {error}")
+        st.markdown("**Debug Info**: Check Supabase configuration or Render logs for API errors.")
+
+    # the filters are read before their widgets are drawn so the menus can show facet counts
+    state = st.session_state
+    dates = state.get("journal_dates") or ()
+    filters = {
+        "text": state.get("journal_search") or None,
+        "mood": None if state.get("journal_mood", "All") == "All" else state["journal_mood"],
+        "tag": None if state.get("journal_tag", "All") == "All" else state["journal_tag"],
+        "start": dates[0] if len(dates) > 0 else None,
+        "end": dates[1] if len(dates) > 1 else None,
+    }
+    results = search_journals(**filters)
+    facets = results.facets
+    if state.get("journal_filters") != filters:
+        state["journal_filters"] = filters
+        state["journal_page"] = 1
+
+    st.text_input("Search", key="journal_search", placeholder="Words or prefixes, e.g. iron fly adjust")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        moods = ["All"] + MOODS + sorted((set(facets["mood"]) | {filters["mood"]}) - set(MOODS) - {None})
+        st.selectbox("Filter by Mood", moods, key="journal_mood",
+                     format_func=lambda m: m if m == "All" else f"{m} ({facets['mood'].get(m, 0)})")
+    with col2:
+        tags = ["All"] + list(dict.fromkeys(list(facets["tags"]) + ([filters["tag"]] if filters["tag"] else [])))
+        st.selectbox("Filter by Tag", tags, key="journal_tag",
+                     format_func=lambda t: t if t == "All" else f"{t} ({facets['tags'].get(t, 0)})")
+    with col3:
+        st.date_input("Date range", value=(), key="journal_dates")
+
+    if not results.total:
+        st.info("No journal entries found. Add entries to start tracking your trading insights.")
+        render_import_export(results)
+        return
+    months = dict(list(facets["month"].items())[:MONTH_BARS])
+    if len(months) > 1:
+        st.bar_chart({"entries": dict(reversed(months.items()))}, height=160)
+    pages = math.ceil(results.total / PAGE_SIZE)
+    page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key="journal_page")
+    st.caption(f"{results.total:,} entries | showing {(page - 1) * PAGE_SIZE + 1:,}–{min(page * PAGE_SIZE, results.total):,}")
+    journals_df = get_local_store().journals_by_key(results.keys((page - 1) * PAGE_SIZE, PAGE_SIZE))
+    for _, journal in journals_df.iterrows():
+        pending = " ⏳" if journal.get("pending") else ""
+        with st.expander(f"{journal.get('title') or 'Untitled'}{pending}"):
+            st.write(f"**Mood**: {journal.get('mood', 'N/A')}")
+            st.write(f"**Content**: {journal.get('content', 'N/A')}")
+            st.write(f"**Tags**: {journal.get('tags', 'N/A')}")
+            st.write(f"**Timestamp**: {journal.get('timestamp', 'N/A')}")
+    render_import_export(results)
@@ -0,0 +1,153 @@
+"""Live Dashboard page: portfolio snapshot, volatility forecast, positions and streamed P&L."""
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from resources import get_metrics
+from services import api_request_many, get_feed_manager, get_response_cache
+from settings import SESSION_STATE_KEY
+from views.figures import TEMPLATE, forecast_gauge
+from wire_format import as_frame, is_empty
+
+FEED_FRAME_SECONDS = 1.0
+
+
+@st.fragment(run_every=FEED_FRAME_SECONDS)
+def render_live_feed(token: str, positions: list):
+    """Redraws streamed prices and live P&L at a throttled frame rate without a full rerun."""
+    snap = get_feed_manager().snapshot(token)
+    status = "🟢 Streaming" if snap["connected"] else f"🟠 Connecting… {snap['last_error'] or ''}"
+    st.caption(f"{status} | Ticks: {snap['messages']}")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Nifty Spot (live)", f"₹{snap['spot']:.2f}" if snap["spot"] is not None else "—")
+    with col2:
+        st.metric("India VIX (live)", f"{snap['vix']:.2f}" if snap["vix"] is not None else "—")
+    if is_empty(positions):
+        return
+    live_df = as_frame(positions).copy()
+    if "instrument_key" in live_df:
+        ltp = live_df["instrument_key"].map(snap["ltps"])
+        has_ltp = ltp.notna()
+        live_df.loc[has_ltp, "current_price"] = ltp[has_ltp]
+        live_df.loc[has_ltp, "unrealized_pnl"] = (ltp[has_ltp] - live_df.loc[has_ltp, "entry_price"]) * live_df.loc[has_ltp, "quantity"]
+    labels = live_df.get("strategy", live_df.get("instrument_key", []))
+    fig = go.Figure(data=[
+        go.Bar(name="Realized P&L", x=labels, y=live_df["realized_pnl"], marker_color='#00FF00'),
+        go.Bar(name="Unrealized P&L (live)", x=labels, y=live_df["unrealized_pnl"], marker_color='#00CC00')
+    ])
+    fig.update_layout(
+        title="Live P&L by Position",
+        barmode="group",
+        template=TEMPLATE,
+        height=400
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def render(selected: str):
+    st.header("Live Dashboard")
+    if st.button("🔄 Refresh Live Dashboard"):
+        get_response_cache().invalidate("/live/dashboard")
+        st.rerun()
+    live_stream = st.toggle("⚡ Stream live prices", key="live_stream")
+    with get_metrics().timer(selected, "fetch"):
+        (data, error), (volatility_data, vol_error) = api_request_many([
+            "/live/dashboard",
+            "/predict/volatility",
+        ])
+    
+    if error:
+        st.error(error)
+    elif data:
+        st.subheader("Portfolio Snapshot")
+        portfolio = data.get("portfolio", {})
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+            st.metric("Total Funds", f"₹{portfolio.get('total_funds', 0):.2f}")
+            st.markdown("</div>", unsafe_allow_html=True)
+        with col2:
+            st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+            st.metric("Capital Deployed", f"₹{portfolio.get('capital_deployed', 0):.2f}")
+            st.markdown("</div>", unsafe_allow_html=True)
+        with col3:
+            st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+            st.metric("Total P&L", f"₹{portfolio.get('total_pnl', 0):.2f}")
+            st.markdown("</div>", unsafe_allow_html=True)
+        with col4:
+            st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+            st.metric("Exposure", f"{portfolio.get('exposure_percent', 0):.2f}%")
+            st.markdown("</div>", unsafe_allow_html=True)
+        
+        st.subheader("Volatility Prediction (XGBoost)")
+        if vol_error:
+            st.error(vol_error)
+        elif volatility_data:
+            predicted_vol = volatility_data.get("predicted_volatility", 0)
+            st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+            st.metric("Predicted 7-Day Volatility", f"{predicted_vol:.2f}%")
+            st.markdown("**Input Metrics**:")
+            st.write(f"- ATM IV: {volatility_data.get('atm_iv', 0):.2f}%")
+            st.write(f"- Historical Volatility (HV): {volatility_data.get('hv', 0):.2f}%")
+            st.write(f"- Implied Volatility Percentile (IVP): {volatility_data.get('ivp', 0):.2f}%")
+            st.write(f"- Put-Call Ratio (PCR): {volatility_data.get('pcr', 0):.2f}")
+            st.write(f"- India VIX: {volatility_data.get('vix', 0):.2f}")
+            st.write(f"- Days to Expiry: {volatility_data.get('days_to_expiry', 0)}")
+            fig = forecast_gauge(predicted_vol)
+            with get_metrics().timer(selected, "plotly"):
+                st.plotly_chart(fig, use_container_width=True)
+            st.markdown("</div>", unsafe_allow_html=True)
+        
+        if live_stream:
+            st.subheader("Live Stream")
+            positions = as_frame(data.get("positions", []))
+            get_feed_manager().start(
+                st.session_state[SESSION_STATE_KEY],
+                positions["instrument_key"].dropna().tolist() if "instrument_key" in positions else []
+            )
+            render_live_feed(st.session_state[SESSION_STATE_KEY], positions)
+
+        st.subheader("Current Positions")
+        with get_metrics().timer(selected, "dataframe"):
+            positions_df = as_frame(data.get("positions", []))
+        if not positions_df.empty:
+            with get_metrics().timer(selected, "styler"):
+                st.dataframe(positions_df.style.format({
+                    "entry_price": "₹{:.2f}",
+                    "current_price": "₹{:.2f}",
+                    "quantity": "{:.0f}",
+                    "realized_pnl": "₹{:.2f}",
+                    "unrealized_pnl": "₹{:.2f}",
+                    "vega": "{:.2f}",
+                    "theta": "{:.2f}"
+                }))
+            # P&L Visualization
+            fig = go.Figure(data=[
+                go.Bar(name="Realized P&L", x=positions_df.get("strategy", positions_df.get("instrument_key", [])), y=positions_df["realized_pnl"], marker_color='#00FF00'),
+                go.Bar(name="Unrealized P&L", x=positions_df.get("strategy", positions_df.get("instrument_key", [])), y=positions_df["unrealized_pnl"], marker_color='#00CC00')
+            ])
+            fig.update_layout(
+                title="P&L by Position",
+                barmode="group",
+                template=TEMPLATE,
+                height=400
+            )
+            with get_metrics().timer(selected, "plotly"):
+                st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No current positions found. Place trades to populate this section.")
+        
+        st.subheader("Market Snapshot")
+        market_data = data.get("market_data", {})
+        col5, col6 = st.columns(2)
+        with col5:
+            st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+            st.metric("Nifty Spot", f"₹{market_data.get('nifty_spot', 0):.2f}")
+            st.metric("India VIX", f"{market_data.get('india_vix', 0):.2f}")
+            st.markdown("</div>", unsafe_allow_html=True)
+        with col6:
+            st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+            st.metric("ATM IV", f"{market_data.get('avg_iv', 0):.2f}%")
+            st.metric("Straddle Price", f"₹{market_data.get('straddle_price', 0):.2f}")
+            st.markdown("</div>", unsafe_allow_html=True)
@@ -0,0 +1,150 @@
+"""Market Dashboard page: market-wide metrics, the volatility forecast and recorded history."""
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from backend_router import IST
+from resources import get_metrics
+from services import api_request_many, get_snapshot_store
+from snapshot_store import CHART_POINTS, METRICS_INTERVAL_SECONDS, downsample, forecast_vs_realized
+from views.figures import TEMPLATE, forecast_gauge
+
+# history range -> (lookback, resample rule applied before charting)
+HISTORY_RANGES = {
+    "1D": (pd.Timedelta(days=1), None),
+    "1W": (pd.Timedelta(weeks=1), "5min"),
+    "1M": (pd.Timedelta(days=31), "30min"),
+    "3M": (pd.Timedelta(days=92), "1h"),
+    "6M": (pd.Timedelta(days=183), "1D"),
+}
+HISTORY_SERIES = {
+    "avg_iv": "ATM IV",
+    "india_vix": "India VIX",
+    "vol_predicted_volatility": "XGBoost Forecast",
+    "garch_7_day": "GARCH 7-Day",
+    "hv_7_day": "7-Day HV",
+}
+FORECAST_WARMUP_DAYS = 14  # extra history so realized vol is defined at the start of a range
+
+
+@st.cache_data(ttl=METRICS_INTERVAL_SECONDS, show_spinner=False)
+def load_history(range_label: str) -> pd.DataFrame:
+    """Recorded volatility metrics for a ``HISTORY_RANGES`` entry, resampled and downsampled for charting."""
+    lookback, rule = HISTORY_RANGES[range_label]
+    end = pd.Timestamp.now(tz=IST)
+    columns = list(HISTORY_SERIES)
+    store = get_snapshot_store()
+    if rule:
+        history = store.resample(end - lookback, end, rule=rule, columns=columns)
+    else:
+        history = store.query("metrics", end - lookback, end, columns=columns)
+    return downsample(history, CHART_POINTS) if not history.empty else history
+
+
+@st.cache_data(ttl=METRICS_INTERVAL_SECONDS, show_spinner=False)
+def load_forecast_check(range_label: str) -> pd.DataFrame:
+    """Daily XGBoost forecasts against the volatility Nifty actually realized over the following week."""
+    lookback, _ = HISTORY_RANGES[range_label]
+    end = pd.Timestamp.now(tz=IST)
+    history = get_snapshot_store().query(
+        "metrics", end - lookback - pd.Timedelta(days=FORECAST_WARMUP_DAYS), end,
+        columns=["nifty_spot", "vol_predicted_volatility"],
+    )
+    if history.empty or "vol_predicted_volatility" not in history:
+        return pd.DataFrame()
+    return forecast_vs_realized(history).loc[lambda df: df.index >= (end - lookback).normalize()]
+
+
+def render(selected: str):
+    st.header("Market Dashboard")
+    (data, error), (volatility_data, vol_error) = api_request_many([
+        "/option-seller-dashboard",
+        "/predict/volatility",
+    ])
+    
+    if error:
+        st.error(error)
+    elif data:
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.markdown("### Market Overview")
+            st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+            st.metric("Nifty Spot", f"₹{data.get('nifty_spot', 0):.2f}")
+            st.metric("India VIX", f"{data.get('india_vix', 0):.2f}")
+            st.metric("Days to Expiry", f"{data.get('days_to_expiry', 0)}")
+            st.markdown("</div>", unsafe_allow_html=True)
+        
+        with col2:
+            st.markdown("### ATM Metrics")
+            st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+            st.metric("ATM Strike", f"₹{data.get('atm_strike', 0):.2f}")
+            st.metric("Straddle Price", f"₹{data.get('straddle_price', 0):.2f}")
+            st.metric("Average IV", f"{data.get('avg_iv', 0):.2f}%")
+            st.markdown("</div>", unsafe_allow_html=True)
+        
+        with col3:
+            st.markdown("### Greeks & Volatility")
+            st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+            st.metric("Theta", f"{data.get('theta', 0):.2f}")
+            st.metric("Vega", f"{data.get('vega', 0):.2f}")
+            st.metric("7-Day HV", f"{data.get('hv_7_day', 0):.2f}%")
+            st.metric("GARCH 7-Day", f"{data.get('garch_7_day', 0):.2f}%")
+            st.markdown("</div>", unsafe_allow_html=True)
+        
+        st.subheader("Volatility Prediction (XGBoost)")
+        if vol_error:
+            st.error(vol_error)
+        elif volatility_data:
+            predicted_vol = volatility_data.get("predicted_volatility", 0)
+            st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+            st.metric("Predicted 7-Day Volatility", f"{predicted_vol:.2f}%")
+            st.markdown("**Input Metrics**:")
+            st.write(f"- ATM IV: {volatility_data.get('atm_iv', 0):.2f}%")
+            st.write(f"- Historical Volatility (HV): {volatility_data.get('hv', 0):.2f}%")
+            st.write(f"- Implied Volatility Percentile (IVP): {volatility_data.get('ivp', 0):.2f}%")
+            st.write(f"- Put-Call Ratio (PCR): {volatility_data.get('pcr', 0):.2f}")
+            st.write(f"- India VIX: {volatility_data.get('vix', 0):.2f}")
+            st.write(f"- Days to Expiry: {volatility_data.get('days_to_expiry', 0)}")
+            fig = forecast_gauge(predicted_vol)
+            st.plotly_chart(fig, use_container_width=True)
+            st.markdown("</div>", unsafe_allow_html=True)
+        
+        st.subheader("Market Metrics")
+        col4, col5 = st.columns(2)
+        with col4:
+            st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+            st.metric("Put-Call Ratio (PCR)", f"{data.get('pcr', 0):.2f}")
+            st.metric("Max Pain", f"₹{data.get('max_pain', 0):.2f}")
+            st.markdown("</div>", unsafe_allow_html=True)
+        
+        with col5:
+            st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+            st.metric("IV-RV Spread", f"{data.get('iv_rv_spread', 0):.2f}%")
+            st.metric("Probability of Profit (POP)", f"{data.get('pop', 0):.2f}%")
+            st.markdown("</div>", unsafe_allow_html=True)
+
+    st.subheader("Volatility History")
+    history_range = st.radio("Range", list(HISTORY_RANGES), index=1, horizontal=True, key="history_range")
+    with get_metrics().timer(selected, "history"):
+        history = load_history(history_range)
+    if history.empty:
+        st.info("No snapshots recorded for this range yet. Snapshots are taken every minute during market hours.")
+    else:
+        fig = go.Figure()
+        for column, label in HISTORY_SERIES.items():
+            if column in history:
+                fig.add_trace(go.Scattergl(x=history.index, y=history[column], mode="lines", name=label, connectgaps=False))
+        fig.update_layout(
+            template=TEMPLATE,
+            height=400,
+            yaxis_title="Volatility (%)",
+            hovermode="x unified",
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        forecast_check = load_forecast_check(history_range)
+        if not forecast_check.empty and forecast_check["realized"].notna().any():
+            st.markdown("**XGBoost Forecast vs Realized 7-Day Volatility**")
+            st.metric("Mean Absolute Error", f"{forecast_check['error'].abs().mean():.2f} pts")
+            st.line_chart(forecast_check[["forecast", "realized"]])
@@ -0,0 +1,113 @@
+"""Risk Evaluation page: per-strategy capital use, limits and the spot/IV scenario grid."""
+
+import time
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from chain_analytics import analyze_chain, chain_frame
+from risk_engine import IV_SHOCKS, SPOT_SHOCKS, evaluate as evaluate_risk, position_frame
+from services import api_request_many, get_feed_manager
+from settings import SESSION_STATE_KEY
+from views.figures import TEMPLATE
+from wire_format import records
+
+UNMODELLED_COLUMNS = ["instrument_key", "trading_symbol", "strategy", "quantity", "current_price", "unrealized_pnl"]
+
+
+def render(selected: str):
+    st.header("Portfolio Risk Evaluation")
+    (data, error), (raw_chain, chain_error) = api_request_many([
+        "/live/dashboard",
+        "/fetch/option-chain",
+    ])
+    days_forward = st.slider("Scenario horizon (days)", min_value=0, max_value=7, value=0)
+    
+    if error:
+        st.error(error)
+    elif data:
+        positions = data.get("positions", [])
+        spot = data.get("market_data", {}).get("nifty_spot")
+        if st.session_state.get("live_stream"):
+            snap = get_feed_manager().snapshot(st.session_state[SESSION_STATE_KEY])
+            spot = snap["spot"] or spot
+            positions = [dict(p, current_price=snap["ltps"].get(p.get("instrument_key"), p.get("current_price"))) for p in records(positions)]
+        chain_df = None
+        if not chain_error and raw_chain:
+            chain_df, _ = analyze_chain(chain_frame(raw_chain))
+            spot = spot or (float(chain_df["spot"].iloc[0]) if not chain_df.empty else None)
+        start = time.perf_counter()
+        positions_df = position_frame(positions, chain_df, spot)
+        portfolio, summary_df, grid = evaluate_risk(
+            positions_df, data.get("portfolio", {}).get("total_funds", 0), spot, days=days_forward
+        )
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        st.caption(f"Risk computed locally over {grid.size:,} spot × IV scenarios in {elapsed_ms:.1f} ms")
+        st.subheader("Portfolio Summary")
+        st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+        st.metric("Total Funds", f"₹{portfolio.get('Total Funds', 0):.2f}")
+        st.metric("Capital Deployed", f"₹{portfolio.get('Capital Deployed', 0):.2f}")
+        st.metric("Exposure", f"{portfolio.get('Exposure Percent', 0):.2f}%")
+        st.metric("Risk on Table", f"₹{portfolio.get('Risk on Table', 0):.2f}")
+        st.metric("Total Vega", f"{portfolio.get('Total Vega Exposure', 0):.2f}")
+        st.metric("Total Delta", f"{portfolio.get('Total Delta', 0):.2f}")
+        st.metric("Total Theta", f"{portfolio.get('Total Theta', 0):.2f}")
+        st.markdown("</div>", unsafe_allow_html=True)
+        
+        st.subheader("Flags")
+        for flag in portfolio.get("Flags", []):
+            if "❌" in flag or "⚠️" in flag:
+                st.error(flag)
+            else:
+                st.success(flag)
+
+        if portfolio.get("Unmodelled Positions"):
+            st.subheader("Unmodelled Positions")
+            st.caption("No chain match, no parsable trading symbol and no reported delta/gamma: "
+                       "these positions are not in the scenario grid or Potential Risk.")
+            unmodelled = positions_df[positions_df["unmodelled"]]
+            st.dataframe(unmodelled[[c for c in UNMODELLED_COLUMNS if c in unmodelled]], hide_index=True)
+        
+        st.subheader("Strategy Breakdown")
+        if not summary_df.empty:
+            st.dataframe(summary_df.style.format({
+                "Capital Used": "₹{:.2f}",
+                "Cap Limit": "₹{:.2f}",
+                "% Used": "{:.2f}%",
+                "Potential Risk": "₹{:.2f}",
+                "Risk Limit": "₹{:.2f}",
+                "Realized P&L": "₹{:.2f}",
+                "Unrealized P&L": "₹{:.2f}",
+                "Vega": "{:.2f}"
+            }))
+            # Risk Visualization
+            fig = go.Figure(data=[
+                go.Bar(name="Capital Used", x=summary_df["Strategy"], y=summary_df["Capital Used"], marker_color='#00FF00'),
+                go.Bar(name="Cap Limit", x=summary_df["Strategy"], y=summary_df["Cap Limit"], marker_color='#00CC00')
+            ])
+            fig.update_layout(
+                title="Capital Utilization by Strategy",
+                barmode="group",
+                template=TEMPLATE,
+                height=400
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            # Scenario Grid Heatmap
+            fig = go.Figure(go.Heatmap(
+                x=IV_SHOCKS,
+                y=SPOT_SHOCKS * 100,
+                z=grid,
+                colorscale=[[0, "#FF4D4D"], [0.5, "#1E1E1E"], [1, "#00FF00"]],
+                zmid=0,
+                colorbar=dict(title="P&L (₹)")
+            ))
+            fig.update_layout(
+                title="Scenario P&L (Spot Move % × IV Shift pts)",
+                xaxis_title="IV Shift (vol pts)",
+                yaxis_title="Spot Move (%)",
+                template=TEMPLATE,
+                height=450
+            )
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No risk data available. Ensure active trades are present.")
@@ -0,0 +1,164 @@
+"""Strategy Suggestions page: regime-based strategies, payoff analysis and order placement."""
+
+import time
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from chain_analytics import chain_frame
+from order_pipeline import DEFAULT_STOP_LOSS_PCT, MAX_LONG_STOP_LOSS_PCT, MAX_STOP_LOSS_PCT
+from payoff import (
+    DEFAULT_PATHS, breakevens, chain_lookup, expiry_payoff, horizon_payoff, payoff_grid, simulate_strategies, strategy_legs,
+)
+from services import api_request_many, available_funds, get_order_pipeline, get_strategy_details, remember_strategy_templates
+from settings import SESSION_STATE_KEY
+from strategy_details import scale_details, snapshot_id
+from views.backtest import render as render_backtest
+from views.figures import TEMPLATE
+
+
+def render(selected: str):
+    st.header("Strategy Suggestions")
+    (data, error), (volatility_data, vol_error), (raw_chain, chain_error) = api_request_many([
+        "/suggest/strategy",
+        "/predict/volatility",
+        "/fetch/option-chain",
+    ])
+    
+    if error:
+        st.error(error)
+    elif data:
+        st.markdown(f"**Market Regime**: {data.get('regime', 'N/A')} (Score: {data.get('score', 0)})")
+        st.markdown(f"**Note**: {data.get('note', 'N/A')}")
+        st.markdown(f"**Explanation**: {data.get('explanation', 'N/A')}")
+        if data.get("event_warning"):
+            st.warning(f"⚠️ {data['event_warning']}")
+        
+        st.subheader("Recommended Strategies")
+        strategies = data.get("strategies", [])
+        all_details = get_strategy_details(strategies, snapshot_id(data))
+        option_chain = chain_frame(raw_chain) if raw_chain and not chain_error else None
+        leg_lookup = chain_lookup(option_chain)
+        strategy_leg_frames = {}
+        for strategy in strategies:
+            with st.expander(f"📊 {strategy}", expanded=False):
+                st.write(f"**Rationale**: {data.get('rationale', 'N/A')}")
+                lots = st.number_input(f"Number of Lots for {strategy}", min_value=1, max_value=10, value=1, step=1, key=f"lots_{strategy}")
+                details, details_error = all_details[strategy]
+                details = scale_details(details, int(lots))
+                if details_error:
+                    st.error(details_error)
+                elif details:
+                    st.write(f"**Premium**: ₹{details.get('premium_total', 0):.2f}")
+                    st.write(f"**Max Profit**: ₹{details.get('max_profit', 0):.2f}")
+                    max_loss = details.get('max_loss', float('inf'))
+                    st.write(f"**Max Loss**: {'Unlimited' if max_loss == float('inf') else f'₹{max_loss:.2f}'}")
+                    st.write("**Strikes**:")
+                    for strike in details.get("strikes", []):
+                        st.write(f"- ₹{strike:.2f}")
+                    st.write("**Orders**:")
+                    orders_df = pd.DataFrame([
+                        {
+                            "Instrument": order.get("instrument_key", "N/A"),
+                            "Type": order.get("transaction_type", "N/A"),
+                            "Quantity": order.get("quantity", 0),
+                            "Price": f"₹{order.get('price', 0):.2f}",
+                            "Current Price": f"₹{order.get('current_price', 0):.2f}"
+                        } for order in details.get("orders", [])
+                    ])
+                    st.table(orders_df)
+                    legs_df, unresolved = strategy_legs(details, leg_lookup)
+                    strategy_leg_frames[strategy] = legs_df
+                    if not legs_df.empty:
+                        grid_spots = payoff_grid(float(legs_df["strike"].mean()))
+                        points = breakevens(grid_spots, expiry_payoff(legs_df, grid_spots))
+                        st.write(f"**Breakevens**: {', '.join(f'₹{p:.2f}' for p in points) or 'None in range'}")
+                    if unresolved:
+                        st.caption(f"{len(unresolved)} leg(s) could not be mapped to a strike and were left out of the payoff.")
+                    attach_sl = st.checkbox("Attach stop-loss GTT", key=f"sl_{strategy}")
+                    has_long_leg = any(str(o.get("transaction_type", "")).upper() == "BUY" for o in details.get("orders", []))
+                    stop_loss_pct = st.number_input(
+                        "Stop-loss (% of premium)", min_value=5.0,
+                        max_value=MAX_LONG_STOP_LOSS_PCT if has_long_leg else MAX_STOP_LOSS_PCT,
+                        value=DEFAULT_STOP_LOSS_PCT, step=5.0, key=f"sl_pct_{strategy}", disabled=not attach_sl
+                    )
+                    # Execute Strategy Button
+                    if st.button(f"Execute {strategy}", key=f"execute_{strategy}"):
+                        result = get_order_pipeline().execute(
+                            st.session_state[SESSION_STATE_KEY],
+                            strategy,
+                            details.get("orders", []),
+                            available_funds=available_funds(),
+                            stop_loss_pct=stop_loss_pct if attach_sl else None,
+                        )
+                        margin = result.get("margin")
+                        if margin:
+                            st.write(f"**Required Margin**: ₹{margin['total_margin']:.2f} across {len(margin['leg_margins'])} legs")
+                        if result.get("duplicate"):
+                            st.warning("⚠️ This order was already submitted; showing the original result.")
+                        if result.get("status") == "submitted":
+                            st.success(f"✅ {strategy} executed successfully! Order ID: {(result.get('order') or {}).get('order_id', 'N/A')}")
+                            if result.get("gtt_error"):
+                                st.error(f"Stop-loss GTT failed: {result['gtt_error']}")
+                            elif "gtt" in result:
+                                st.success("✅ Stop-loss GTT attached.")
+                        elif result.get("status") == "in_flight":
+                            st.info("⏳ This order is already being submitted.")
+                        else:
+                            st.error(f"Execution failed: {result.get('error', 'Unknown error')}")
+                        timings = result.get("timings_ms", {})
+                        if timings:
+                            st.caption(" | ".join(f"{stage}: {ms:.0f} ms" for stage, ms in timings.items()))
+
+        if strategy_leg_frames:
+            st.subheader("Payoff & Probability of Profit")
+            spot = None
+            if option_chain is not None and not option_chain.empty:
+                spot = float(option_chain["spot"].iloc[0])
+                remember_strategy_templates(strategy_leg_frames, option_chain)
+            spot = spot or float(pd.concat(strategy_leg_frames.values())["strike"].mean())
+            vol_source = volatility_data if volatility_data and not vol_error else {}
+            sigma = (vol_source.get("predicted_volatility") or vol_source.get("atm_iv") or 15.0) / 100
+            days = vol_source.get("days_to_expiry") or 7
+            start = time.perf_counter()
+            pop_df = simulate_strategies(strategy_leg_frames, spot, sigma, days / 365)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            st.caption(f"Monte Carlo over {DEFAULT_PATHS:,} paths at {sigma * 100:.2f}% vol, {days} days, in {elapsed_ms:.0f} ms")
+            st.dataframe(pop_df, column_config={
+                "POP": st.column_config.NumberColumn("POP", format="%.2f%%"),
+                "Expected P&L": st.column_config.NumberColumn("Expected P&L", format="₹%.2f"),
+                "P5 P&L": st.column_config.NumberColumn("P5 P&L", format="₹%.2f"),
+                "P95 P&L": st.column_config.NumberColumn("P95 P&L", format="₹%.2f"),
+            }, hide_index=True)
+            grid_spots = payoff_grid(spot)
+            fig = go.Figure([
+                go.Scatter(x=grid_spots, y=expiry_payoff(legs_df, grid_spots), mode="lines", name=name)
+                for name, legs_df in strategy_leg_frames.items() if not legs_df.empty
+            ])
+            col1, col2 = st.columns(2)
+            with col1:
+                horizon_strategy = st.selectbox("Show T+n curve for", list(strategy_leg_frames))
+            with col2:
+                horizon_days = st.slider("T+n (days)", min_value=0, max_value=max(int(days), 1), value=0)
+            horizon_legs = strategy_leg_frames[horizon_strategy]
+            if not horizon_legs.empty:
+                fig.add_trace(go.Scatter(
+                    x=grid_spots,
+                    y=horizon_payoff(horizon_legs, grid_spots, (days - horizon_days) / 365, sigma),
+                    mode="lines",
+                    line=dict(dash="dot"),
+                    name=f"{horizon_strategy} (T+{horizon_days})"
+                ))
+            fig.add_vline(x=spot, line_dash="dash", line_color="#E0E0E0")
+            fig.update_layout(
+                title="Payoff at Expiry and T+n",
+                xaxis_title="Nifty at Expiry",
+                yaxis_title="P&L (₹)",
+                template=TEMPLATE,
+                height=400
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+    # offline: runs on recorded history even when the backend is unreachable
+    render_backtest()
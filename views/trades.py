@@ -0,0 +1,128 @@
+"""Trade Log page: the incrementally synced, filterable and paginated trade history."""
+
+import pandas as pd
+import streamlit as st
+
+from services import fetch_trade_page, get_reconciler, get_trade_log_store, reconcile_trades
+from settings import SESSION_STATE_KEY
+from trade_log import DEFAULT_FIELDS as TRADE_FIELDS, TradeQuery, page_slice
+
+TRADE_PAGE_SIZES = [50, 100, 250]
+TRADE_COLUMN_CONFIG = {
+    "entry_price": st.column_config.NumberColumn("entry_price", format="₹%.2f"),
+    "quantity": st.column_config.NumberColumn("quantity", format="%.0f"),
+    "realized_pnl": st.column_config.NumberColumn("realized_pnl", format="₹%.2f"),
+    "unrealized_pnl": st.column_config.NumberColumn("unrealized_pnl", format="₹%.2f"),
+    "capital_used": st.column_config.NumberColumn("capital_used", format="₹%.2f"),
+    "potential_loss": st.column_config.NumberColumn("potential_loss", format="₹%.2f"),
+    "vega": st.column_config.NumberColumn("vega", format="%.2f"),
+}
+FILL_COLUMNS = ["order_id", "instrument_token", "transaction_type", "quantity", "timestamp"]
+UPDATE_COLUMNS = [
+    "instrument_token", "id", "strategy", "timestamp_entry", "quantity", "new_quantity", "entry_price",
+    "realized_pnl", "status", "timestamp_exit", "notes_tag",
+]
+ORDER_COLUMNS = ["order_id", "instrument_token", "transaction_type", "order_type", "status", "quantity", "trigger_price"]
+
+
+def render_reconciliation():
+    """Broker fills vs logged trades: unlogged fills, quantity mismatches and orphan GTTs."""
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        refresh = st.button("🔄 Reconcile Now")
+    with col2:
+        post_now = st.button("📝 Log Unlogged Fills")
+    with col3:
+        auto_post = st.checkbox("Auto-log unlogged fills", key="reconcile_auto_post")
+    report, error = reconcile_trades(force=refresh or post_now, auto_post=auto_post or post_now)
+    if error:
+        st.warning(f"Reconciliation failed, showing the last result: {error}")
+    if report is None:
+        return
+    post = report.pop("post", None)
+    if post:
+        if post["posted"]:
+            st.success(f"Logged {post['posted']} unlogged fill(s) via /log/trade.")
+        for post_error in post["errors"]:
+            st.error(f"Failed to log {post_error}")
+    posted = get_reconciler().posted
+    unlogged = [fill for fill in report["unlogged"] if fill["order_id"] not in posted]
+    col4, col5, col6, col7, col8 = st.columns(5)
+    col4.metric("Orders Today", report["orders"], delta=f"{report['changed']} changed", delta_color="off")
+    col5.metric("Unlogged Fills", len(unlogged))
+    col6.metric("Needs Manual Update", len(report["needs_update"]))
+    col7.metric("Quantity Mismatches", len(report["mismatches"]))
+    col8.metric("Orphan GTTs", len(report["orphan_gtts"]))
+    if unlogged:
+        st.markdown("**Unlogged Fills**")
+        st.dataframe(pd.DataFrame(unlogged).reindex(columns=FILL_COLUMNS), hide_index=True)
+    if report["needs_update"]:
+        st.markdown("**Needs Manual Update** (fills that close or reduce a logged open row)")
+        st.caption("/log/trade only adds rows. Edit these rows by hand and add the notes tag so the fills match.")
+        st.dataframe(pd.DataFrame(report["needs_update"]).reindex(columns=UPDATE_COLUMNS), hide_index=True)
+    if report["mismatches"]:
+        st.markdown("**Quantity Mismatches**")
+        st.dataframe(pd.DataFrame(report["mismatches"]), hide_index=True)
+    if report["orphan_gtts"]:
+        st.markdown("**Orphan GTTs** (no open position on the instrument)")
+        st.dataframe(pd.DataFrame(report["orphan_gtts"]).reindex(columns=ORDER_COLUMNS), hide_index=True)
+    if not (unlogged or report["needs_update"] or report["mismatches"] or report["orphan_gtts"]):
+        st.success("Order book, day trades and the trade log agree.")
+    st.caption(f"{report['fills']} filled orders | Reconciled in {report['reconcile_ms']:.1f} ms")
+
+
+def render(selected: str):
+    st.header("Trade Log")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        status_filter = st.selectbox("Filter by Status", ["All", "open", "closed"])
+    with col2:
+        strategy_filter = st.text_input("Filter by Strategy", placeholder="e.g., Iron Fly")
+    with col3:
+        date_range = st.date_input("Entry Date Range", value=())
+    columns = st.multiselect("Columns", TRADE_FIELDS, default=TRADE_FIELDS)
+    refresh = st.button("🔄 Refresh Trades")
+    start_date, end_date = (tuple(date_range) + (None, None))[:2]
+    query = TradeQuery(
+        status=None if status_filter == "All" else status_filter,
+        strategy=strategy_filter.strip() or None,
+        start_date=start_date,
+        end_date=end_date,
+        fields=columns,
+    )
+    trade_cache = get_trade_log_store().for_query(query)
+    token = st.session_state[SESSION_STATE_KEY]
+    fetch_trades = lambda params: fetch_trade_page(token, params)
+    error = trade_cache.sync_new(fetch_trades, force=refresh)
+    
+    if error:
+        st.warning(f"Failed to sync trades, showing local copy: {error}")
+        st.markdown("**Debug Info**: Check Supabase `trade_logs` table schema or Render logs for API errors.")
+    col4, col5 = st.columns(2)
+    with col4:
+        page_size = st.selectbox("Rows per page", TRADE_PAGE_SIZES, index=1)
+    with col5:
+        page = st.number_input("Page", min_value=1, value=1, step=1)
+    trades_df = trade_cache.frame()
+    # Stream older pages from the backend only when the requested page isn't cached yet
+    while len(trades_df) < page * page_size and not trade_cache.exhausted:
+        error = trade_cache.load_more(fetch_trades)
+        if error:
+            st.error(f"Failed to fetch older trades: {error}")
+            break
+        trades_df = trade_cache.frame()
+    if not trades_df.empty:
+        st.dataframe(page_slice(trades_df, page, page_size), column_config=TRADE_COLUMN_CONFIG, hide_index=True)
+        first_row = min((page - 1) * page_size + 1, len(trades_df))
+        last_row = min(page * page_size, len(trades_df))
+        more = "" if trade_cache.exhausted else "+"
+        st.caption(
+            f"Rows {first_row}–{last_row} of {len(trades_df)}{more} | "
+            f"Synced up to {trade_cache.watermark or 'N/A'} | Backend requests: {trade_cache.requests}"
+        )
+    else:
+        st.info("No trades found. Place trades via the Strategy Suggestions tab or verify Supabase configuration.")
+
+    st.subheader("Broker Reconciliation")
+    if st.toggle("Reconcile against the broker order book", key="reconcile_enabled"):
+        render_reconciliation()
@@ -0,0 +1,134 @@
+"""Columnar transfer of the large row-list payloads.
+
+``/full-chain-table``, ``/fetch/trades`` and ``/live/dashboard`` carry one big
+list of row objects (``COLUMNAR_FIELDS``). For those endpoints the client
+advertises two columnar encodings besides plain JSON:
+
+* ``application/vnd.apache.arrow.stream``: an Arrow IPC stream holding the
+  rows; the rest of the JSON envelope travels in the schema metadata.
+* ``application/vnd.voluguard.columns+json``: the JSON envelope with the row
+  list replaced by ``{column: [values, ...]}``, listed under ``"__columnar__"``.
+
+Either way the rows decode straight into a DataFrame, with no dict built per row,
+in place of the list, and every other key stays as it was. A backend that
+ignores the ``Accept`` header answers with plain JSON, which decodes as before.
+Compression is negotiated separately via ``Accept-Encoding`` (gzip, plus zstd
+when ``zstandard`` is installed).
+
+The encoders are used by the benchmark stand-in server and document the
+format for the backend.
+"""
+import json
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow ships with streamlit
+    pa = None
+
+JSON = "application/json"
+COLUMNS_JSON = "application/vnd.voluguard.columns+json"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+COLUMNAR_MARKER = "__columnar__"
+_FIELD_META = b"voluguard.field"
+_ENVELOPE_META = b"voluguard.envelope"
+
+# endpoint -> key of the row list that is sent column-wise
+COLUMNAR_FIELDS = {
+    "/full-chain-table": "data",
+    "/fetch/trades": "trades",
+    "/live/dashboard": "positions",
+}
+
+
+def accept_header(endpoint: str):
+    """``Accept`` value for ``endpoint``, or None when it has no columnar form."""
+    if endpoint not in COLUMNAR_FIELDS:
+        return None
+    preferred = [ARROW_STREAM] if pa is not None else []
+    return ", ".join(preferred + [f"{COLUMNS_JSON};q=0.9", f"{JSON};q=0.8"])
+
+
+def media_type(content_type: str) -> str:
+    return (content_type or "").split(";")[0].strip().lower()
+
+
+def decode(content_type: str, body: bytes):
+    """Decodes a response body by its ``Content-Type``; row lists come back as DataFrames."""
+    kind = media_type(content_type)
+    if kind == ARROW_STREAM:
+        if pa is None:
+            raise ValueError("Arrow payload received but pyarrow is not installed")
+        table = pa.ipc.open_stream(body).read_all()
+        meta = table.schema.metadata or {}
+        envelope = json.loads(meta.get(_ENVELOPE_META, b"{}"))
+        envelope[meta.get(_FIELD_META, b"data").decode()] = table.to_pandas(split_blocks=True, self_destruct=True)
+        return envelope
+    payload = json.loads(body)
+    if kind == COLUMNS_JSON and isinstance(payload, dict):
+        for field in payload.pop(COLUMNAR_MARKER, []):
+            payload[field] = pd.DataFrame(payload.get(field) or {})
+    return payload
+
+
+def records(rows) -> list:
+    """Row dicts from either wire form, for code that works row by row."""
+    if isinstance(rows, pd.DataFrame):
+        return rows.astype(object).where(rows.notna(), None).to_dict("records")
+    return list(rows or [])
+
+
+def as_frame(rows) -> pd.DataFrame:
+    """A DataFrame from either wire form, without copying an already-columnar payload."""
+    return rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows or []))
+
+
+def is_empty(rows) -> bool:
+    return rows.empty if isinstance(rows, pd.DataFrame) else not rows
+
+
+# --- Encoders ---
+def encode_columns_json(payload: dict, field: str) -> bytes:
+    rows = payload.get(field) or []
+    columns = {}
+    for row in rows:
+        for key in row:
+            columns.setdefault(key, None)
+    body = dict(payload)
+    body[field] = {key: [row.get(key) for row in rows] for key in columns}
+    body[COLUMNAR_MARKER] = [field]
+    return json.dumps(body).encode("utf-8")
+
+
+def encode_arrow(payload: dict, field: str) -> bytes:
+    if pa is None:
+        raise RuntimeError("pyarrow is required for Arrow encoding")
+    table = pa.Table.from_pylist(payload.get(field) or [])
+    envelope = {key: value for key, value in payload.items() if key != field}
+    table = table.replace_schema_metadata({_FIELD_META: field.encode(), _ENVELOPE_META: json.dumps(envelope).encode()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def negotiate(accept: str, endpoint: str) -> str:
+    """Server side: picks the best encoding ``accept`` allows for ``endpoint``."""
+    if endpoint not in COLUMNAR_FIELDS or not accept:
+        return JSON
+    offered = {media_type(part) for part in accept.split(",")}
+    if ARROW_STREAM in offered and pa is not None:
+        return ARROW_STREAM
+    if COLUMNS_JSON in offered:
+        return COLUMNS_JSON
+    return JSON
+
+
+def encode(payload: dict, endpoint: str, kind: str) -> bytes:
+    field = COLUMNAR_FIELDS.get(endpoint)
+    if kind == ARROW_STREAM and field:
+        return encode_arrow(payload, field)
+    if kind == COLUMNS_JSON and field:
+        return encode_columns_json(payload, field)
+    return json.dumps(payload).encode("utf-8")